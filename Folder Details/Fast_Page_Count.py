@@ -0,0 +1,309 @@
+import re, mmap, zlib
+
+TAIL_SIZE = 4096
+WHITESPACE = b" \t\r\n\f\x00"
+DELIMITERS = b"()<>[]{}/%"
+RE_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+RE_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+RE_NUMBER = re.compile(rb"[+-]?(\d+\.?\d*|\.\d+)")
+RE_REF = re.compile(rb"\s*(\d+)\s+R\b")
+RE_SUBSECTION = re.compile(rb"\s*(\d+)\s+(\d+)")
+RE_XREF_ENTRY = re.compile(rb"\s*(\d+)\s+(\d+)\s+([nf])")
+NAME_END = WHITESPACE + DELIMITERS
+
+
+class FastPathError(Exception):
+    pass
+
+
+def at(data, pos, word):
+    return data[pos : pos + len(word)] == word
+
+
+class Ref:
+    __slots__ = ("num", "gen")
+
+    def __init__(self, num, gen):
+        self.num = num
+        self.gen = gen
+
+
+class Parser:
+    def __init__(self, data):
+        self.data = data
+
+    def skip_ws(self, pos):
+        data = self.data
+        n = len(data)
+        while pos < n:
+            c = data[pos]
+            if c in WHITESPACE:
+                pos += 1
+            elif c == 0x25:
+                while pos < n and data[pos] not in b"\r\n":
+                    pos += 1
+            else:
+                break
+        return pos
+
+    def parse(self, pos):
+        data = self.data
+        pos = self.skip_ws(pos)
+        c = data[pos : pos + 1]
+        if c == b"<":
+            if data[pos + 1 : pos + 2] == b"<":
+                return self.parse_dict(pos + 2)
+            end = data.find(b">", pos)
+            if end < 0:
+                raise FastPathError(f"unterminated hex string at offset {pos}")
+            return data[pos + 1 : end], end + 1
+        if c == b"[":
+            return self.parse_array(pos + 1)
+        if c == b"/":
+            end = pos + 1
+            while end < len(data) and data[end] not in NAME_END:
+                end += 1
+            return data[pos + 1 : end].decode("latin-1"), end
+        if c == b"(":
+            return self.parse_string(pos + 1)
+        m = RE_NUMBER.match(data, pos)
+        if m:
+            text = m.group(0)
+            if b"." in text:
+                return float(text), m.end()
+            value = int(text)
+            ref = RE_REF.match(data, m.end())
+            if ref and text.isdigit():
+                return Ref(value, int(ref.group(1))), ref.end()
+            return value, m.end()
+        for word, value in ((b"true", True), (b"false", False), (b"null", None)):
+            if at(data, pos, word):
+                return value, pos + len(word)
+        raise FastPathError(f"unexpected token at offset {pos}")
+
+    def parse_dict(self, pos):
+        result = {}
+        while True:
+            pos = self.skip_ws(pos)
+            if self.data[pos : pos + 2] == b">>":
+                return result, pos + 2
+            key, pos = self.parse(pos)
+            if not isinstance(key, str):
+                raise FastPathError(f"dictionary key expected at offset {pos}")
+            result[key], pos = self.parse(pos)
+
+    def parse_array(self, pos):
+        result = []
+        while True:
+            pos = self.skip_ws(pos)
+            if self.data[pos : pos + 1] == b"]":
+                return result, pos + 1
+            item, pos = self.parse(pos)
+            result.append(item)
+
+    def parse_string(self, pos):
+        depth = 1
+        start = pos
+        data = self.data
+        while depth:
+            c = data[pos]
+            if c == 0x5C:
+                pos += 1
+            elif c == 0x28:
+                depth += 1
+            elif c == 0x29:
+                depth -= 1
+            pos += 1
+        return data[start : pos - 1], pos
+
+
+def png_unpredict(raw, columns):
+    row_len = columns + 1
+    prev = bytearray(columns)
+    out = bytearray()
+    for i in range(0, len(raw), row_len):
+        ftype = raw[i]
+        row = bytearray(raw[i + 1 : i + row_len])
+        if ftype == 2:
+            for j in range(len(row)):
+                row[j] = (row[j] + prev[j]) & 0xFF
+        elif ftype != 0:
+            raise FastPathError(f"unsupported PNG predictor {ftype}")
+        out += row
+        prev = row
+    return bytes(out)
+
+
+class FastPdf:
+    def __init__(self, data):
+        self.data = data
+        self.parser = Parser(data)
+        self.offsets = {}
+        self.compressed = {}
+        self.trailer = {}
+        self.objstm_cache = {}
+        self.load_xref()
+
+    def load_xref(self):
+        tail = self.data[-TAIL_SIZE:]
+        matches = list(RE_STARTXREF.finditer(tail))
+        if not matches:
+            raise FastPathError("startxref not found")
+        offset = int(matches[-1].group(1))
+        seen = set()
+        while offset is not None:
+            if offset in seen or offset >= len(self.data):
+                raise FastPathError("bad xref offset")
+            seen.add(offset)
+            pos = self.parser.skip_ws(offset)
+            if at(self.data, pos, b"xref"):
+                trailer = self.read_xref_table(pos + 4)
+                if "XRefStm" in trailer:
+                    self.read_xref_stream(trailer["XRefStm"])
+            else:
+                trailer = self.read_xref_stream(offset)
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            offset = trailer.get("Prev")
+
+    def add_entry(self, num, kind, a, b):
+        if num in self.offsets or num in self.compressed:
+            return
+        if kind == 1:
+            self.offsets[num] = a
+        elif kind == 2:
+            self.compressed[num] = (a, b)
+        else:
+            self.offsets[num] = None
+
+    def read_xref_table(self, pos):
+        data = self.data
+        while True:
+            pos = self.parser.skip_ws(pos)
+            if at(data, pos, b"trailer"):
+                trailer, _ = self.parser.parse(pos + 7)
+                return trailer
+            m = RE_SUBSECTION.match(data, pos)
+            if not m:
+                raise FastPathError(f"malformed xref subsection at offset {pos}")
+            start, count = int(m.group(1)), int(m.group(2))
+            pos = m.end()
+            for num in range(start, start + count):
+                entry = RE_XREF_ENTRY.match(data, pos)
+                if not entry:
+                    raise FastPathError(f"malformed xref entry at offset {pos}")
+                kind = 1 if entry.group(3) == b"n" else 0
+                self.add_entry(num, kind, int(entry.group(1)), int(entry.group(2)))
+                pos = entry.end()
+
+    def read_stream(self, pos):
+        obj, pos = self.parser.parse(pos)
+        if not isinstance(obj, dict):
+            raise FastPathError("stream dictionary expected")
+        pos = self.parser.skip_ws(pos)
+        if not at(self.data, pos, b"stream"):
+            raise FastPathError("stream keyword expected")
+        pos += 6
+        if self.data[pos : pos + 2] == b"\r\n":
+            pos += 2
+        elif self.data[pos : pos + 1] in (b"\r", b"\n"):
+            pos += 1
+        length = self.resolve(obj.get("Length"))
+        raw = self.data[pos : pos + length]
+        filters = obj.get("Filter")
+        if filters is None:
+            filters = []
+        elif not isinstance(filters, list):
+            filters = [filters]
+        for name in filters:
+            if name != "FlateDecode":
+                raise FastPathError(f"unsupported filter {name}")
+            raw = zlib.decompress(raw)
+        parms = obj.get("DecodeParms") or {}
+        if isinstance(parms, list):
+            parms = parms[0] or {}
+        predictor = parms.get("Predictor", 1)
+        if predictor >= 10:
+            raw = png_unpredict(raw, parms.get("Columns", 1))
+        elif predictor != 1:
+            raise FastPathError(f"unsupported predictor {predictor}")
+        return obj, raw
+
+    def object_body(self, offset):
+        m = RE_OBJ_HEADER.match(self.data, offset)
+        if not m:
+            raise FastPathError(f"no object at offset {offset}")
+        return m.end()
+
+    def read_xref_stream(self, offset):
+        obj, raw = self.read_stream(self.object_body(offset))
+        if obj.get("Type") != "XRef":
+            raise FastPathError("xref stream expected")
+        widths = obj["W"]
+        index = obj.get("Index", [0, obj["Size"]])
+        pos = 0
+        for start, count in zip(index[::2], index[1::2]):
+            for num in range(start, start + count):
+                fields = []
+                for w in widths:
+                    fields.append(int.from_bytes(raw[pos : pos + w], "big"))
+                    pos += w
+                kind = fields[0] if widths[0] else 1
+                self.add_entry(num, kind, fields[1], fields[2])
+        if pos > len(raw):
+            raise FastPathError("truncated xref stream")
+        return obj
+
+    def get_object(self, num):
+        if num in self.compressed:
+            stm_num, idx = self.compressed[num]
+            return self.object_from_stream(stm_num, idx, num)
+        offset = self.offsets.get(num)
+        if offset is None:
+            raise FastPathError(f"object {num} not in xref")
+        return self.parser.parse(self.object_body(offset))[0]
+
+    def object_from_stream(self, stm_num, idx, num):
+        if stm_num not in self.objstm_cache:
+            offset = self.offsets.get(stm_num)
+            if offset is None:
+                raise FastPathError(f"object stream {stm_num} not in xref")
+            obj, raw = self.read_stream(self.object_body(offset))
+            header = raw[: obj["First"]].split()
+            pairs = [(int(a), int(b)) for a, b in zip(header[::2], header[1::2])]
+            self.objstm_cache[stm_num] = (obj["First"], pairs, Parser(raw))
+        first, pairs, parser = self.objstm_cache[stm_num]
+        obj_num, rel = pairs[idx]
+        if obj_num != num:
+            raise FastPathError(f"object stream {stm_num} index mismatch")
+        return parser.parse(first + rel)[0]
+
+    def resolve(self, value):
+        while isinstance(value, Ref):
+            value = self.get_object(value.num)
+        return value
+
+    def page_count(self):
+        if "Encrypt" in self.trailer:
+            raise FastPathError("encrypted document")
+        root = self.resolve(self.trailer.get("Root"))
+        if not isinstance(root, dict):
+            raise FastPathError("document catalog not found")
+        pages = self.resolve(root.get("Pages"))
+        if not isinstance(pages, dict):
+            raise FastPathError("page tree not found")
+        count = self.resolve(pages.get("Count"))
+        if not isinstance(count, int) or count < 0:
+            raise FastPathError("invalid /Count")
+        return count
+
+
+def fast_pdf_page_count(path):
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return FastPdf(data).page_count()
+        except FastPathError:
+            raise
+        except (ValueError, IndexError, KeyError, TypeError, zlib.error) as e:
+            raise FastPathError(f"{type(e).__name__}: {e}") from e
@@ -1,10 +1,48 @@
-import os, csv, statistics
-from pypdf import PdfReader
-import win32com.client
+import os, sys, json, threading
+from pathlib import Path
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+    FIRST_COMPLETED,
+)
+from multiprocessing.util import Finalize
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "PDF Converter"))
+from Job_Journal import JobJournal
+from Instrumentation import traced
+from Page_Index import PageIndex, default_index_path
+from Fast_Page_Count import fast_pdf_page_count, FastPathError
+from Office_Page_Count import office_metadata_count, LibreOfficeCounter
+from Streaming_Stats import RunningStats
+from Report_Sinks import open_sinks
 
+FOLDER = r"D:\PARTH\MY STUFF\VIT\SEM 6\BCSE301L Software Engineering"
+PDF_COUNT_MODE = "fast"
+OFFICE_COUNT_MODE = "metadata"
+OFFICE_SLOW_PATH = "com" if os.name == "nt" else "libreoffice"
+USE_INDEX = True
+INDEX_USE_HASH = False
+SCAN_WORKERS = os.cpu_count() or 1
+SCAN_EXECUTOR = "process"
+SUPPORTED_EXTS = (".pdf", ".doc", ".docx", ".ppt", ".pptx")
+HIERARCHICAL_ROLLUP = False
+EXTRA_SINKS = ()
+USE_JOURNAL = True
+USE_SERVICE = True
+
+
+@traced("count.pdf", path_arg=0)
 def get_pdf_page_count(path):
+    if PDF_COUNT_MODE == "fast":
+        try:
+            return fast_pdf_page_count(path)
+        except (FastPathError, OSError):
+            pass
     try:
+        from pypdf import PdfReader
+
         reader = PdfReader(path)
         return len(reader.pages)
     except Exception as e:
@@ -12,6 +50,7 @@ def get_pdf_page_count(path):
         return 0
 
 
+@traced("count.word_com", path_arg=1)
 def get_word_page_count(word_app, path):
     try:
         doc = word_app.Documents.Open(path, ReadOnly=True)
@@ -24,6 +63,7 @@ def get_word_page_count(word_app, path):
         return 0
 
 
+@traced("count.ppt_com", path_arg=1)
 def get_ppt_slide_count(ppt_app, path):
     try:
         pres = ppt_app.Presentations.Open(path, WithWindow=False)
@@ -35,61 +75,318 @@ def get_ppt_slide_count(ppt_app, path):
         return 0
 
 
-def get_folder_details_to_csv(parent_folder):
+class OfficeApps:
+    def __init__(self):
+        self.word_app = None
+        self.ppt_app = None
+        self.lo_counter = None
+        self.service_client = None
+
+    def word(self):
+        if self.word_app is None:
+            import pythoncom, win32com.client
+
+            pythoncom.CoInitialize()
+            self.word_app = win32com.client.Dispatch("Word.Application")
+            self.word_app.Visible = False
+        return self.word_app
+
+    def ppt(self):
+        if self.ppt_app is None:
+            import pythoncom, win32com.client
+
+            pythoncom.CoInitialize()
+            self.ppt_app = win32com.client.Dispatch("PowerPoint.Application")
+            self.ppt_app.Visible = True
+        return self.ppt_app
+
+    def libreoffice(self):
+        if self.lo_counter is None:
+            self.lo_counter = LibreOfficeCounter(get_pdf_page_count)
+        return self.lo_counter
+
+    def service(self):
+        if self.service_client is None:
+            from Office_Service import connect
+
+            self.service_client = connect() or False
+        return self.service_client or None
+
+    def quit(self):
+        if self.service_client:
+            self.service_client.close()
+        for app in (self.word_app, self.ppt_app):
+            if app is None:
+                continue
+            try:
+                app.Quit()
+            except Exception:
+                pass
+        if self.lo_counter is not None:
+            self.lo_counter.close()
+
+
+@traced("count.office", path_arg=1)
+def count_office_file(apps, fp, ext):
+    if OFFICE_COUNT_MODE == "metadata":
+        count = office_metadata_count(fp, ext)
+        if count or (count == 0 and ext == ".pptx"):
+            return count
+    service = apps.service() if USE_SERVICE else None
+    if service:
+        try:
+            return service.count(fp)
+        except RuntimeError as e:
+            print(f"Warning: Office service could not count {fp}: {e}")
+            return 0
+        except (EOFError, OSError) as e:
+            print(f"Warning: lost the Office service ({e}), counting locally")
+            apps.service_client = False
+    if OFFICE_SLOW_PATH == "com":
+        if ext in (".doc", ".docx"):
+            return get_word_page_count(apps.word(), fp)
+        return get_ppt_slide_count(apps.ppt(), fp)
+    if OFFICE_SLOW_PATH == "libreoffice":
+        return apps.libreoffice().count(fp)
+    print(f"Warning: no page count available for {fp}")
+    return 0
+
+
+def count_file(apps, fp, ext):
+    if ext == ".pdf":
+        return get_pdf_page_count(fp)
+    if ext in (".doc", ".docx", ".ppt", ".pptx"):
+        return count_office_file(apps, fp, ext)
+    return None
+
+
+_local = threading.local()
+_created_apps = []
+
+
+def _worker_apps():
+    apps = getattr(_local, "apps", None)
+    if apps is None:
+        apps = _local.apps = OfficeApps()
+        _created_apps.append(apps)
+    return apps
+
+
+def _quit_worker_apps():
+    while _created_apps:
+        _created_apps.pop().quit()
+
+
+def _init_process_worker():
+    Finalize(None, _quit_worker_apps, exitpriority=10)
+
+
+def count_path(fp, ext):
+    return count_file(_worker_apps(), fp, ext)
+
+
+def scan_files(path):
+    stack = [path]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError as e:
+            print(f"Warning: could not list {e.filename}: {e}")
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTS:
+                    if entry.is_file():
+                        yield entry
+
+
+def file_identity(entry, st):
+    if not st.st_ino:
+        st = os.stat(entry.path)
+    if st.st_nlink > 1 or entry.is_symlink():
+        return (st.st_dev, st.st_ino)
+    return None
+
+
+def make_executor(workers):
+    if workers <= 1:
+        return None
+    if SCAN_EXECUTOR == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker)
+
+
+class SubfolderAggregate:
+    def __init__(self, name):
+        self.name = name
+        self.dirs = {}
+        self.pending = 0
+        self.scanned = False
+
+    def add(self, dir_key, count):
+        if count and count > 0:
+            stats = self.dirs.get(dir_key)
+            if stats is None:
+                stats = self.dirs[dir_key] = RunningStats()
+            stats.add(count)
+
+    def done(self):
+        return self.scanned and self.pending == 0
+
+    def rolled_up(self, hierarchical):
+        rolled = {self.name: RunningStats()}
+        for dir_key, stats in self.dirs.items():
+            if not hierarchical:
+                rolled[self.name].merge(stats)
+                continue
+            parts = dir_key.split(os.sep)
+            for i in range(1, len(parts) + 1):
+                key = os.sep.join(parts[:i])
+                if key not in rolled:
+                    rolled[key] = RunningStats()
+                rolled[key].merge(stats)
+        return sorted(rolled.items())
+
+
+def resumed_rows(data):
+    try:
+        return json.loads(data)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_folder_details_to_csv(parent_folder, index_path=None, workers=None):
     output_file = os.path.join(parent_folder, "Folder_Details.csv")
-    word_app = win32com.client.Dispatch("Word.Application")
-    word_app.Visible = False
-    ppt_app = win32com.client.Dispatch("PowerPoint.Application")
-    ppt_app.Visible = True
+    workers = workers or SCAN_WORKERS
+    max_in_flight = workers * 4
+    index = None
+    if USE_INDEX:
+        index = PageIndex(
+            index_path or default_index_path(parent_folder), use_hash=INDEX_USE_HASH
+        )
+    journal = None
+    if USE_JOURNAL:
+        journal = JobJournal("folder_details", os.path.abspath(parent_folder))
+    executor = make_executor(workers)
+    in_flight = {}
+    linked_counts = {}
+    linked_waiting = {}
+    sinks = open_sinks(output_file, EXTRA_SINKS)
+    overall = RunningStats()
+
+    def write_row(name, summary):
+        row = {"name": name, **summary}
+        for sink in sinks:
+            sink.write(row)
+
+    def emit(rows, stats):
+        for name, summary in rows:
+            write_row(name, summary)
+        overall.merge(stats)
+
+    def finish(agg):
+        if index:
+            index.commit()
+        rolled = agg.rolled_up(HIERARCHICAL_ROLLUP)
+        rows = [(name, stats.summary()) for name, stats in rolled]
+        stats = dict(rolled)[agg.name]
+        emit(rows, stats)
+        if journal:
+            data = {"rows": rows, "stats": stats.to_dict()}
+            journal.finish(agg.name, data=json.dumps(data))
+        print(f"Finished: {agg.name}")
+
+    def collect(futures):
+        for fut in futures:
+            agg, dir_key, fp, st, ident = in_flight.pop(fut)
+            count = fut.result()
+            if index and count and count > 0:
+                index.record(fp, st, count)
+            waiters = [(agg, dir_key)]
+            if ident is not None:
+                linked_counts[ident] = count
+                waiters += linked_waiting.pop(ident, [])
+            for waiter, waiter_key in waiters:
+                waiter.add(waiter_key, count)
+                waiter.pending -= 1
+                if waiter.done():
+                    finish(waiter)
+
     try:
-        with open(output_file, mode="w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(
-                ["Subfolder Name", "Total Pages/Slides", "File Count", "Median"]
-            )
-            for subfolder in os.listdir(parent_folder):
-                full_path = os.path.join(parent_folder, subfolder)
-                if not os.path.isdir(full_path):
+        for subfolder in os.listdir(parent_folder):
+            full_path = os.path.join(parent_folder, subfolder)
+            if subfolder.startswith(".") or not os.path.isdir(full_path):
+                continue
+            if journal and journal.is_done(subfolder):
+                data = resumed_rows(journal.data(subfolder))
+                if data:
+                    emit(data["rows"], RunningStats.from_dict(data["stats"]))
+                    print(f"Finished in an earlier run: {subfolder}")
+                    continue
+            agg = SubfolderAggregate(subfolder)
+            for entry in scan_files(full_path):
+                fp = os.path.abspath(entry.path)
+                dir_key = os.path.relpath(os.path.dirname(entry.path), parent_folder)
+                ext = os.path.splitext(entry.name)[1].lower()
+                st = entry.stat()
+                ident = file_identity(entry, st)
+                if ident in linked_counts:
+                    agg.add(dir_key, linked_counts[ident])
                     continue
-                page_counts = []
-                for dirpath, _, filenames in os.walk(full_path):
-                    for f in filenames:
-                        fp = os.path.join(dirpath, f)
-                        if not os.path.isfile(fp):
-                            continue
-                        ext = os.path.splitext(f)[1].lower()
-                        if ext == ".pdf":
-                            count = get_pdf_page_count(fp)
-                        elif ext in (".doc", ".docx"):
-                            count = get_word_page_count(word_app, fp)
-                        elif ext in (".ppt", ".pptx"):
-                            count = get_ppt_slide_count(ppt_app, fp)
-                        else:
-                            continue
-                        if count > 0:
-                            page_counts.append(count)
-                if page_counts:
-                    total_pages = sum(page_counts)
-                    file_count = len(page_counts)
-                    median_val = statistics.median(page_counts)
-                else:
-                    total_pages = 0
-                    file_count = 0
-                    median_val = 0
-                writer.writerow([subfolder, total_pages, file_count, median_val])
+                if ident in linked_waiting:
+                    linked_waiting[ident].append((agg, dir_key))
+                    agg.pending += 1
+                    continue
+                count = index.lookup(fp, st) if index else None
+                if count is not None:
+                    if ident is not None:
+                        linked_counts[ident] = count
+                    agg.add(dir_key, count)
+                    continue
+                if executor is None:
+                    count = count_path(fp, ext)
+                    if index and count and count > 0:
+                        index.record(fp, st, count)
+                    if ident is not None:
+                        linked_counts[ident] = count
+                    agg.add(dir_key, count)
+                    continue
+                fut = executor.submit(count_path, fp, ext)
+                in_flight[fut] = (agg, dir_key, fp, st, ident)
+                if ident is not None:
+                    linked_waiting[ident] = []
+                agg.pending += 1
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+            agg.scanned = True
+            if agg.done():
+                finish(agg)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done)
+        if HIERARCHICAL_ROLLUP:
+            write_row(".", overall.summary())
         print(f"Data exported to: {output_file}")
+        if index:
+            print(index.report())
+        if journal:
+            print(journal.report())
+            journal.complete()
     finally:
-        try:
-            word_app.Quit()
-        except Exception:
-            pass
-        try:
-            ppt_app.Quit()
-        except Exception:
-            pass
+        for sink in sinks:
+            sink.close()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if index:
+            index.close()
+        if journal:
+            journal.close()
+        _quit_worker_apps()
 
 
 if __name__ == "__main__":
-    get_folder_details_to_csv(
-        r"D:\PARTH\MY STUFF\VIT\SEM 6\BCSE301L Software Engineering"
-    )
+    get_folder_details_to_csv(sys.argv[1] if len(sys.argv) > 1 else FOLDER)
@@ -0,0 +1,92 @@
+import os, shutil, zipfile, tempfile, subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+NS_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+NS_EP = "{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}"
+LIBREOFFICE_TIMEOUT = 300
+
+
+def _read_app_property(zf, name):
+    try:
+        root = ET.fromstring(zf.read("docProps/app.xml"))
+    except KeyError:
+        return None
+    el = root.find(NS_EP + name)
+    if el is None or not (el.text or "").strip().isdigit():
+        return None
+    return int(el.text.strip())
+
+
+def pptx_slide_count(path):
+    with zipfile.ZipFile(path) as zf:
+        try:
+            root = ET.fromstring(zf.read("ppt/presentation.xml"))
+        except KeyError:
+            return _read_app_property(zf, "Slides")
+        id_list = root.find(NS_P + "sldIdLst")
+        return 0 if id_list is None else len(id_list.findall(NS_P + "sldId"))
+
+
+def docx_page_count(path):
+    with zipfile.ZipFile(path) as zf:
+        return _read_app_property(zf, "Pages")
+
+
+def office_metadata_count(path, ext):
+    try:
+        if ext == ".pptx":
+            return pptx_slide_count(path)
+        if ext == ".docx":
+            return docx_page_count(path)
+    except (zipfile.BadZipFile, ET.ParseError, OSError) as e:
+        print(f"Warning: could not read metadata of {path}: {e}")
+    return None
+
+
+class LibreOfficeCounter:
+    def __init__(self, pdf_counter, soffice=None):
+        self.pdf_counter = pdf_counter
+        self.soffice = soffice or shutil.which("soffice") or shutil.which("libreoffice")
+        self.profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        self.out_dir = tempfile.mkdtemp(prefix="lo_count_")
+
+    def count(self, path):
+        if not self.soffice:
+            print(f"Warning: LibreOffice not found, cannot count {path}")
+            return 0
+        try:
+            subprocess.run(
+                [
+                    self.soffice,
+                    f"-env:UserInstallation={Path(self.profile_dir).as_uri()}",
+                    "--headless",
+                    "--norestore",
+                    "--convert-to",
+                    "pdf",
+                    "--outdir",
+                    self.out_dir,
+                    path,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=LIBREOFFICE_TIMEOUT,
+                check=True,
+            )
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"Warning: LibreOffice could not convert {path}: {e}")
+            return 0
+        pdf_path = os.path.join(
+            self.out_dir, os.path.splitext(os.path.basename(path))[0] + ".pdf"
+        )
+        try:
+            return self.pdf_counter(pdf_path)
+        finally:
+            try:
+                os.remove(pdf_path)
+            except OSError:
+                pass
+
+    def close(self):
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        shutil.rmtree(self.out_dir, ignore_errors=True)
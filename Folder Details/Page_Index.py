@@ -0,0 +1,126 @@
+import os, sys, time, sqlite3, hashlib, argparse
+
+INDEX_NAME = ".folder_details_index.sqlite3"
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PageIndex:
+    def __init__(self, db_path, use_hash=False):
+        self.db_path = db_path
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS counts ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, sha256 TEXT, "
+            "count INTEGER NOT NULL, updated REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def lookup(self, path, st):
+        row = self.db.execute(
+            "SELECT size, mtime_ns, sha256, count FROM counts WHERE path = ?",
+            (path,),
+        ).fetchone()
+        if row is not None:
+            size, mtime_ns, digest, count = row
+            if size == st.st_size and mtime_ns == st.st_mtime_ns:
+                self.hits += 1
+                return count
+            if self.use_hash and digest and size == st.st_size:
+                if file_sha256(path) == digest:
+                    self.db.execute(
+                        "UPDATE counts SET mtime_ns = ? WHERE path = ?",
+                        (st.st_mtime_ns, path),
+                    )
+                    self.hits += 1
+                    return count
+        self.misses += 1
+        return None
+
+    def record(self, path, st, count):
+        digest = file_sha256(path) if self.use_hash else None
+        self.db.execute(
+            "INSERT OR REPLACE INTO counts "
+            "(path, size, mtime_ns, sha256, count, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, digest, count, time.time()),
+        )
+
+    def commit(self):
+        self.db.commit()
+
+    def prune(self, root=None):
+        if root:
+            prefix = os.path.join(os.path.abspath(root), "")
+            rows = self.db.execute(
+                "SELECT path FROM counts WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+        else:
+            rows = self.db.execute("SELECT path FROM counts").fetchall()
+        stale = [(p,) for (p,) in rows if not os.path.isfile(p)]
+        self.db.executemany("DELETE FROM counts WHERE path = ?", stale)
+        self.db.commit()
+        return len(stale)
+
+    def compact(self):
+        self.db.commit()
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.db.execute("VACUUM")
+
+    def entry_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM counts").fetchone()[0]
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"Index: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def default_index_path(parent_folder):
+    return os.path.join(parent_folder, INDEX_NAME)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain a Folder Details index")
+    parser.add_argument("command", choices=["stats", "prune", "compact"])
+    parser.add_argument("folder", help="folder that was scanned (holds the index)")
+    args = parser.parse_args(argv)
+    db_path = default_index_path(args.folder)
+    if not os.path.isfile(db_path):
+        print(f"No index found at {db_path}")
+        return 1
+    index = PageIndex(db_path)
+    try:
+        if args.command == "prune":
+            removed = index.prune(args.folder)
+            print(f"Removed {removed} entries for missing files")
+        elif args.command == "compact":
+            before = os.path.getsize(db_path)
+            index.compact()
+            after = os.path.getsize(db_path)
+            print(f"Compacted {db_path}: {before} -> {after} bytes")
+        print(f"{index.entry_count()} entries in {db_path}")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
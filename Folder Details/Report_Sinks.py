@@ -0,0 +1,99 @@
+import csv, json
+
+COLUMNS = [
+    ("Subfolder Name", "name"),
+    ("Total Pages/Slides", "total"),
+    ("File Count", "count"),
+    ("Median", "median"),
+    ("Min", "min"),
+    ("Max", "max"),
+    ("Mean", "mean"),
+    ("Variance", "variance"),
+    ("P90", "p90"),
+    ("P99", "p99"),
+]
+PARQUET_BATCH_ROWS = 10000
+PARQUET_TYPES = {
+    "name": "string",
+    "total": "int64",
+    "count": "int64",
+    "min": "int64",
+    "max": "int64",
+}
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, mode="w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.f)
+        self.writer.writerow([header for header, _ in COLUMNS])
+
+    def write(self, row):
+        self.writer.writerow([row[key] for _, key in COLUMNS])
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class JsonLinesSink:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, mode="w", encoding="utf-8")
+
+    def write(self, row):
+        self.f.write(json.dumps(row) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    def __init__(self, path, batch_rows=PARQUET_BATCH_ROWS):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.batch_rows = batch_rows
+        self.rows = []
+        self.schema = pa.schema(
+            [
+                (key, pa.type_for_alias(PARQUET_TYPES.get(key, "float64")))
+                for _, key in COLUMNS
+            ]
+        )
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        import pyarrow as pa
+
+        if self.rows:
+            columns = {key: [row[key] for row in self.rows] for _, key in COLUMNS}
+            self.writer.write_table(pa.table(columns, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+SINKS = {"json": (JsonLinesSink, ".jsonl"), "parquet": (ParquetSink, ".parquet")}
+
+
+def open_sinks(csv_path, extra=()):
+    sinks = [CsvSink(csv_path)]
+    base = csv_path.rsplit(".", 1)[0]
+    for name in extra:
+        sink_cls, suffix = SINKS[name]
+        try:
+            sinks.append(sink_cls(base + suffix))
+        except ImportError as e:
+            print(f"Warning: {name} output disabled ({e})")
+    return sinks
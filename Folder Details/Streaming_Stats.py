@@ -0,0 +1,174 @@
+import math
+
+EXACT_LIMIT = 1024
+RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, exact_limit=EXACT_LIMIT):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.exact_limit = exact_limit
+        self.exact = []
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value):
+        self.count += 1
+        if self.exact is not None:
+            self.exact.append(value)
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+        if value <= 0:
+            self.zeros += 1
+        else:
+            key = self._key(value)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.zeros += other.zeros
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        if self.exact is not None and other.exact is not None:
+            self.exact.extend(other.exact)
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+        else:
+            self.exact = None
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "exact_limit": self.exact_limit,
+            "exact": self.exact,
+            "buckets": sorted(self.buckets.items()),
+            "zeros": self.zeros,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"], data["exact_limit"])
+        sketch.exact = data["exact"]
+        sketch.buckets = {key: n for key, n in data["buckets"]}
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        return sketch
+
+    def quantile(self, q):
+        if not self.count:
+            return 0
+        if self.exact is not None:
+            values = sorted(self.exact)
+            pos = q * (len(values) - 1)
+            lo = math.floor(pos)
+            if pos == lo:
+                return values[lo]
+            hi = min(lo + 1, len(values) - 1)
+            return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.buckets))
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.sketch.add(value)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        if not self.count:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "m2": self.m2,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data["count"]
+        stats.total = data["total"]
+        stats.min = data["min"]
+        stats.max = data["max"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        return stats
+
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    def summary(self):
+        if not self.count:
+            return {
+                "total": 0,
+                "count": 0,
+                "median": 0,
+                "min": 0,
+                "max": 0,
+                "mean": 0,
+                "variance": 0,
+                "p90": 0,
+                "p99": 0,
+            }
+        return {
+            "total": self.total,
+            "count": self.count,
+            "median": round(self.sketch.quantile(0.5), 3),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.mean, 3),
+            "variance": round(self.variance(), 3),
+            "p90": round(self.sketch.quantile(0.9), 3),
+            "p99": round(self.sketch.quantile(0.99), 3),
+        }
@@ -0,0 +1,109 @@
+import os, time, shutil, sqlite3, hashlib
+from pathlib import Path
+
+CACHE_VERSION = "1"
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(content_hash, backend_name, options=""):
+    raw = f"{CACHE_VERSION}|{backend_name}|{options}|{content_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def link_or_copy(src, dst):
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ConversionCache:
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(str(self.cache_dir / "cache.sqlite3"))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)"
+        )
+        self.db.commit()
+
+    def _object_path(self, key):
+        return self.objects_dir / key[:2] / f"{key}.pdf"
+
+    def total_bytes(self):
+        row = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return row[0]
+
+    def fetch(self, key, dest):
+        row = self.db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        obj = self._object_path(key)
+        if row is None or not obj.is_file():
+            if row is not None:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.db.commit()
+            self.misses += 1
+            return False
+        link_or_copy(obj, dest)
+        self.db.execute(
+            "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self.db.commit()
+        self.hits += 1
+        return True
+
+    def store(self, key, pdf_path):
+        obj = self._object_path(key)
+        link_or_copy(pdf_path, obj)
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, size, created, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (key, obj.stat().st_size, now, now),
+        )
+        self.db.commit()
+        self.evict()
+
+    def evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        rows = self.db.execute(
+            "SELECT key, size FROM entries ORDER BY last_used ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                self._object_path(key).unlink()
+            except FileNotFoundError:
+                pass
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        self.db.commit()
+        return removed
+
+    def close(self):
+        self.db.close()
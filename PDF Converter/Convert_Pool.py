@@ -0,0 +1,411 @@
+import os, sys, time, uuid, shutil, signal, subprocess, tempfile
+import multiprocessing as mp
+from multiprocessing.connection import wait
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Instrumentation import span, file_bytes
+
+WORD_EXTS = (".doc", ".docx")
+PPT_EXTS = (".ppt", ".pptx")
+JOB_TIMEOUT = 300
+KILL_GRACE = 30
+USE_UNO = True
+SOFFICE_START_TIMEOUT = 60
+SOFFICE_RECYCLE_AFTER = 200
+PDF_FILTERS = {"Word": "writer_pdf_Export", "PowerPoint": "impress_pdf_Export"}
+SOFFICE_CANDIDATES = (
+    "soffice",
+    "libreoffice",
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    "/usr/lib/libreoffice/program/soffice",
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+)
+
+
+def find_soffice():
+    for candidate in SOFFICE_CANDIDATES:
+        found = shutil.which(candidate)
+        if found:
+            return found
+        if os.path.isfile(candidate):
+            return candidate
+    raise FileNotFoundError("LibreOffice 'soffice' executable not found on PATH")
+
+
+def uno_available():
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def own_process_group():
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+
+
+def kill_process_tree(process):
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.kill()
+
+
+class ComBackend:
+    name = "com"
+
+    def __init__(self):
+        self.word_app = None
+        self.ppt_app = None
+
+    def _word(self):
+        if self.word_app is None:
+            import comtypes.client
+
+            self.word_app = comtypes.client.CreateObject("Word.Application")
+            self.word_app.Visible = False
+        return self.word_app
+
+    def _ppt(self):
+        if self.ppt_app is None:
+            import comtypes.client
+
+            self.ppt_app = comtypes.client.CreateObject("Powerpoint.Application")
+            self.ppt_app.Visible = True
+            self.ppt_app.WindowState = 2
+        return self.ppt_app
+
+    def convert(self, src, pdf_path, timeout=None):
+        ext = os.path.splitext(src)[1].lower()
+        if ext in WORD_EXTS:
+            doc = self._word().Documents.Open(src)
+            try:
+                doc.SaveAs(pdf_path, FileFormat=17)
+            finally:
+                doc.Close()
+        elif ext in PPT_EXTS:
+            pres = self._ppt().Presentations.Open(src)
+            try:
+                pres.SaveAs(pdf_path, 32)
+            finally:
+                pres.Close()
+        else:
+            raise ValueError(f"Unsupported file type: {src}")
+
+    def close(self):
+        for app in (self.word_app, self.ppt_app):
+            if app is None:
+                continue
+            try:
+                app.Quit()
+            except Exception:
+                pass
+        self.word_app = None
+        self.ppt_app = None
+
+
+class LibreOfficeBackend:
+    name = "libreoffice"
+
+    def __init__(self, soffice=None):
+        self.soffice = soffice or find_soffice()
+        self.profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        self.out_dir = tempfile.mkdtemp(prefix="lo_out_")
+        self.use_uno = USE_UNO and uno_available()
+        self.pipe_name = f"vit_lo_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self.proc = None
+        self.desktop = None
+        self.converted = 0
+
+    def convert(self, src, pdf_path, timeout=None):
+        if self.use_uno:
+            self._convert_uno(src, pdf_path)
+        else:
+            self._convert_cli(src, pdf_path, timeout)
+
+    def _convert_cli(self, src, pdf_path, timeout):
+        cmd = [
+            self.soffice,
+            f"-env:UserInstallation={Path(self.profile_dir).as_uri()}",
+            "--headless",
+            "--norestore",
+            "--nolockcheck",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            self.out_dir,
+            src,
+        ]
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=timeout,
+        )
+        produced = os.path.join(
+            self.out_dir, os.path.splitext(os.path.basename(src))[0] + ".pdf"
+        )
+        if proc.returncode != 0 or not os.path.isfile(produced):
+            err = proc.stderr.decode(errors="replace").strip()
+            raise RuntimeError(f"soffice exited with {proc.returncode}: {err}")
+        shutil.move(produced, pdf_path)
+
+    def _start(self):
+        import uno
+
+        self.proc = subprocess.Popen(
+            [
+                self.soffice,
+                f"-env:UserInstallation={Path(self.profile_dir).as_uri()}",
+                "--headless",
+                "--invisible",
+                "--norestore",
+                "--nolockcheck",
+                "--nodefault",
+                "--nologo",
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        url = f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+        deadline = time.monotonic() + SOFFICE_START_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if self.proc.poll() is not None or time.monotonic() > deadline:
+                    self._stop()
+                    raise RuntimeError("soffice did not accept UNO connections")
+                time.sleep(0.2)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx
+        )
+        self.converted = 0
+
+    def _stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+        if self.proc is not None:
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait(5)
+            self.proc = None
+
+    def _convert_uno(self, src, pdf_path):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def props(**values):
+            result = []
+            for name, value in values.items():
+                prop = PropertyValue()
+                prop.Name, prop.Value = name, value
+                result.append(prop)
+            return tuple(result)
+
+        if self.converted >= SOFFICE_RECYCLE_AFTER:
+            self._stop()
+        if self.proc is None or self.proc.poll() is not None:
+            self._stop()
+            self._start()
+        try:
+            doc = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(os.path.abspath(src)),
+                "_blank",
+                0,
+                props(Hidden=True, ReadOnly=True),
+            )
+            if doc is None:
+                raise RuntimeError(f"LibreOffice could not open {src}")
+            try:
+                doc.storeToURL(
+                    uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+                    props(FilterName=PDF_FILTERS[kind_label(src)]),
+                )
+            finally:
+                doc.close(True)
+        except Exception:
+            if self.proc.poll() is not None:
+                self._stop()
+            raise
+        self.converted += 1
+
+    def close(self):
+        self._stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+
+
+BACKENDS = {"com": ComBackend, "libreoffice": LibreOfficeBackend}
+
+
+def make_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown conversion backend: {name}") from None
+
+
+def default_backend_name():
+    return "com" if os.name == "nt" else "libreoffice"
+
+
+def pdf_path_for(src):
+    return os.path.splitext(src)[0] + ".pdf"
+
+
+def _worker_main(conn, backend_name, timeout, delete_source):
+    own_process_group()
+    try:
+        backend = make_backend(backend_name)
+    except Exception as e:
+        conn.send(("fatal", None, str(e)))
+        return
+    try:
+        while True:
+            src = conn.recv()
+            if src is None:
+                break
+            pdf_path = pdf_path_for(src)
+            try:
+                kind = "word" if src.lower().endswith(WORD_EXTS) else "ppt"
+                size = file_bytes(src)
+                with span(f"convert.{kind}", path=src, bytes=size, backend=backend_name):
+                    backend.convert(src, pdf_path, timeout=timeout)
+                if delete_source:
+                    os.remove(src)
+                conn.send(("done", src, pdf_path))
+            except Exception as e:
+                conn.send(("error", src, str(e)))
+    finally:
+        backend.close()
+
+
+class _Worker:
+    def __init__(self, backend_name, timeout, delete_source):
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(
+            target=_worker_main,
+            args=(child_conn, backend_name, timeout, delete_source),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.job = None
+        self.started = 0.0
+
+    def assign(self, src):
+        self.conn.send(src)
+        self.job = src
+        self.started = time.monotonic()
+
+    def kill(self):
+        kill_process_tree(self.process)
+        self.process.join(5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(30)
+        if self.process.is_alive():
+            self.kill()
+
+
+def kind_label(src):
+    return "Word" if src.lower().endswith(WORD_EXTS) else "PowerPoint"
+
+
+def convert_all(
+    files,
+    backend_name=None,
+    workers=None,
+    timeout=JOB_TIMEOUT,
+    delete_source=True,
+    on_result=None,
+):
+    backend_name = backend_name or default_backend_name()
+    workers = workers or os.cpu_count() or 1
+    converted, failed = [], []
+    if isinstance(files, (list, tuple)):
+        if not files:
+            return converted, failed
+        workers = max(1, min(workers, len(files)))
+        print(f"Converting {len(files)} files with {workers} {backend_name} workers")
+    else:
+        print(f"Converting with {workers} {backend_name} workers")
+    pending = iter(files)
+    exhausted = False
+
+    def finished(src, pdf_path, detail):
+        if pdf_path:
+            converted.append((src, pdf_path))
+        else:
+            failed.append((src, detail))
+        if on_result is not None:
+            on_result(src, pdf_path, detail)
+
+    pool = [_Worker(backend_name, timeout, delete_source) for _ in range(workers)]
+    try:
+        while not exhausted or any(w.job for w in pool):
+            for w in pool:
+                if w.job is None and not exhausted:
+                    src = next(pending, None)
+                    if src is None:
+                        exhausted = True
+                    else:
+                        w.assign(src)
+            busy = [w for w in pool if w.job]
+            if not busy:
+                continue
+            for conn in wait([w.conn for w in busy], timeout=1.0):
+                w = next(w for w in busy if w.conn is conn)
+                src = w.job
+                try:
+                    status, _, detail = conn.recv()
+                except (EOFError, OSError):
+                    status, detail = "crash", "worker exited unexpectedly"
+                w.job = None
+                if status == "done":
+                    finished(src, detail, None)
+                    print(f"Converted {kind_label(src)}: {src}")
+                    continue
+                finished(src, None, detail)
+                print(f"Error converting {kind_label(src)} {src}: {detail}")
+                if status == "fatal":
+                    raise RuntimeError(f"Backend {backend_name} unavailable: {detail}")
+                if status == "crash":
+                    w.kill()
+                    pool[pool.index(w)] = _Worker(backend_name, timeout, delete_source)
+            now = time.monotonic()
+            for i, w in enumerate(pool):
+                if w.job and now - w.started > timeout + KILL_GRACE:
+                    print(f"Timed out converting {w.job}, restarting worker")
+                    finished(w.job, None, "timeout")
+                    w.kill()
+                    pool[i] = _Worker(backend_name, timeout, delete_source)
+    finally:
+        for w in pool:
+            if w.job:
+                w.kill()
+            else:
+                w.stop()
+    return converted, failed
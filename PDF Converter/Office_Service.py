@@ -0,0 +1,517 @@
+import os, sys, time, heapq, tempfile, argparse, threading, itertools
+import multiprocessing as mp
+from multiprocessing.connection import Listener, Client, wait
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Folder Details"))
+import Convert_Pool as cp
+from Convert_Pool import (
+    ComBackend,
+    WORD_EXTS,
+    make_backend,
+    own_process_group,
+    kill_process_tree,
+    uno_available,
+    default_backend_name,
+    pdf_path_for,
+    kind_label,
+)
+
+SERVICE_DIR = Path.home() / ".vit_pipeline"
+if os.name == "nt":
+    SERVICE_ADDRESS = r"\\.\pipe\vit_office_service"
+else:
+    SERVICE_ADDRESS = str(SERVICE_DIR / "office_service.sock")
+KEY_FILE = SERVICE_DIR / "office_service.key"
+SERVICE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+RECYCLE_AFTER = 200
+JOB_TIMEOUT = cp.JOB_TIMEOUT
+CLIENT_WINDOW = 64
+PRIORITY = {"count": 0, "convert": 10}
+
+
+def count_with_backend(backend, src, timeout):
+    import Folder_Details as fd
+
+    if isinstance(backend, ComBackend):
+        if src.lower().endswith(WORD_EXTS):
+            return fd.get_word_page_count(backend._word(), src)
+        return fd.get_ppt_slide_count(backend._ppt(), src)
+    fd_, tmp = tempfile.mkstemp(suffix=".pdf", prefix="count_")
+    os.close(fd_)
+    try:
+        backend.convert(src, tmp, timeout=timeout)
+        return fd.get_pdf_page_count(tmp)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _service_worker(conn, backend_name, timeout):
+    own_process_group()
+    try:
+        backend = make_backend(backend_name)
+    except Exception as e:
+        conn.send(("fatal", str(e)))
+        return
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            op, src, delete_source = job
+            try:
+                if op == "count":
+                    conn.send(("done", count_with_backend(backend, src, timeout)))
+                    continue
+                pdf_path = pdf_path_for(src)
+                backend.convert(src, pdf_path, timeout=timeout)
+                if delete_source:
+                    os.remove(src)
+                conn.send(("done", pdf_path))
+            except Exception as e:
+                conn.send(("error", str(e)))
+    finally:
+        backend.close()
+
+
+class _ServiceWorker:
+    def __init__(self, backend_name, timeout):
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(
+            target=_service_worker,
+            args=(child_conn, backend_name, timeout),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.job = None
+        self.kind = None
+        self.started = 0.0
+        self.done = 0
+
+    def assign(self, job):
+        self.conn.send((job.op, job.path, job.delete_source))
+        self.job = job
+        self.kind = kind_label(job.path)
+        self.started = time.monotonic()
+
+    def kill(self):
+        kill_process_tree(self.process)
+        self.process.join(5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(30)
+        if self.process.is_alive():
+            self.kill()
+
+
+class _Job:
+    def __init__(self, client, job_id, op, path, priority, delete_source):
+        self.client = client
+        self.id = job_id
+        self.op = op
+        self.path = path
+        self.priority = priority
+        self.delete_source = delete_source
+
+
+class _ClientConn:
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.open = True
+
+    def send(self, message):
+        if not self.open:
+            return
+        with self.lock:
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                self.open = False
+
+
+class OfficeService:
+    def __init__(
+        self,
+        address=SERVICE_ADDRESS,
+        backend_name=None,
+        workers=SERVICE_WORKERS,
+        recycle_after=RECYCLE_AFTER,
+        timeout=JOB_TIMEOUT,
+    ):
+        self.address = address
+        self.backend_name = backend_name or default_backend_name()
+        self.workers = workers
+        self.recycle_after = recycle_after
+        self.timeout = timeout
+        self.queue = []
+        self.seq = itertools.count()
+        self.lock = threading.Lock()
+        self.wake_lock = threading.Lock()
+        self.wake_pending = False
+        self.wake_recv, self.wake_send = mp.Pipe(duplex=False)
+        self.running = True
+        self.started = time.time()
+        self.stats = dict.fromkeys(
+            ("convert", "count", "failed", "recycled", "clients"), 0
+        )
+
+    def wake(self):
+        with self.wake_lock:
+            if not self.wake_pending:
+                self.wake_pending = True
+                self.wake_send.send(None)
+
+    def woken(self):
+        with self.wake_lock:
+            while self.wake_recv.poll():
+                self.wake_recv.recv()
+            self.wake_pending = False
+
+    def enqueue(self, job):
+        with self.lock:
+            heapq.heappush(self.queue, (job.priority, next(self.seq), job))
+        self.wake()
+
+    def serve_client(self, conn):
+        client = _ClientConn(conn)
+        with self.lock:
+            self.stats["clients"] += 1
+        try:
+            while self.running:
+                message = conn.recv()
+                if message[0] == "job":
+                    _, job_id, op, path, priority, delete_source, backend = message
+                    if backend and backend != self.backend_name:
+                        error = f"the service runs {self.backend_name}, not {backend}"
+                        client.send(("result", job_id, False, error))
+                        continue
+                    if priority is None:
+                        priority = PRIORITY.get(op, 10)
+                    job = _Job(client, job_id, op, path, priority, delete_source)
+                    self.enqueue(job)
+                elif message[0] == "stats":
+                    client.send(("stats", self.status()))
+                elif message[0] == "stop":
+                    client.send(("stopping",))
+                    self.running = False
+                    self.wake()
+        except (EOFError, OSError):
+            pass
+        finally:
+            client.open = False
+            conn.close()
+
+    def status(self):
+        with self.lock:
+            queued = len(self.queue)
+        return {
+            "backend": self.backend_name,
+            "workers": self.workers,
+            "queued": queued,
+            "uptime": round(time.time() - self.started, 1),
+            "pid": os.getpid(),
+            **self.stats,
+        }
+
+    def accept_loop(self, listener):
+        while self.running:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, mp.AuthenticationError):
+                continue
+            threading.Thread(
+                target=self.serve_client, args=(conn,), daemon=True
+            ).start()
+
+    def next_job(self, kind):
+        with self.lock:
+            candidates = []
+            while self.queue and len(candidates) < 8:
+                item = heapq.heappop(self.queue)
+                if not item[2].client.open:
+                    continue
+                if candidates and item[0] != candidates[0][0]:
+                    heapq.heappush(self.queue, item)
+                    break
+                candidates.append(item)
+                if kind_label(item[2].path) == kind:
+                    break
+            if not candidates:
+                return None
+            match = candidates[-1]
+            if kind_label(match[2].path) != kind:
+                match = candidates[0]
+            for item in candidates:
+                if item is not match:
+                    heapq.heappush(self.queue, item)
+            return match[2]
+
+    def finish(self, w, status, value):
+        job, w.job = w.job, None
+        w.done += 1
+        if status == "done":
+            self.stats[job.op] += 1
+            job.client.send(("result", job.id, True, value))
+        else:
+            self.stats["failed"] += 1
+            job.client.send(("result", job.id, False, value))
+
+    def replace(self, pool, w, reason, kill=False):
+        print(f"Restarting {self.backend_name} worker ({reason})")
+        if kill:
+            w.kill()
+        else:
+            w.stop()
+        pool[pool.index(w)] = _ServiceWorker(self.backend_name, self.timeout)
+
+    def serve(self):
+        SERVICE_DIR.mkdir(parents=True, exist_ok=True)
+        if os.name != "nt" and os.path.exists(self.address):
+            os.remove(self.address)
+        key = os.urandom(32)
+        KEY_FILE.unlink(missing_ok=True)
+        fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        listener = Listener(self.address, authkey=key)
+        if os.name != "nt":
+            os.chmod(self.address, 0o600)
+        pool = [
+            _ServiceWorker(self.backend_name, self.timeout) for _ in range(self.workers)
+        ]
+        threading.Thread(
+            target=self.accept_loop, args=(listener,), daemon=True
+        ).start()
+        print(
+            f"Office service on {self.address}: {self.workers} {self.backend_name} "
+            f"workers, restarting each after {self.recycle_after} documents"
+        )
+        if self.backend_name == "libreoffice" and not uno_available():
+            print(
+                "LibreOffice's Python bindings (uno) are not importable: every "
+                "document starts its own soffice, only the profiles stay warm"
+            )
+        try:
+            while self.running:
+                for w in pool:
+                    if w.job is None:
+                        job = self.next_job(w.kind)
+                        if job is None:
+                            break
+                        w.assign(job)
+                busy = [w for w in pool if w.job]
+                ready = wait([w.conn for w in busy] + [self.wake_recv], timeout=1.0)
+                for conn in ready:
+                    if conn is self.wake_recv:
+                        self.woken()
+                        continue
+                    w = next(w for w in busy if w.conn is conn)
+                    try:
+                        status, value = conn.recv()
+                    except (EOFError, OSError):
+                        status, value = "crash", "worker exited unexpectedly"
+                    self.finish(w, status, value)
+                    if status == "fatal":
+                        raise RuntimeError(
+                            f"Backend {self.backend_name} unavailable: {value}"
+                        )
+                    if status == "crash":
+                        self.replace(pool, w, "crashed", kill=True)
+                    elif w.done >= self.recycle_after:
+                        self.stats["recycled"] += 1
+                        self.replace(pool, w, f"{w.done} documents")
+                now = time.monotonic()
+                for w in list(pool):
+                    if w.job and now - w.started > self.timeout + cp.KILL_GRACE:
+                        print(f"Timed out on {w.job.path}")
+                        self.finish(w, "error", "timeout")
+                        self.replace(pool, w, "timeout", kill=True)
+        finally:
+            for w in pool:
+                if w.job:
+                    w.kill()
+                else:
+                    w.stop()
+            listener.close()
+            if KEY_FILE.exists():
+                KEY_FILE.unlink()
+            print("Office service stopped")
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class ServiceClient:
+    def __init__(self, address=SERVICE_ADDRESS):
+        try:
+            key = KEY_FILE.read_bytes()
+            self.conn = Client(address, authkey=key)
+        except (OSError, EOFError, mp.AuthenticationError) as e:
+            raise ServiceUnavailable(str(e)) from None
+        self.ids = itertools.count()
+
+    def submit(self, op, path, priority=None, delete_source=False, backend=None):
+        job_id = next(self.ids)
+        self.conn.send(
+            ("job", job_id, op, os.path.abspath(path), priority, delete_source, backend)
+        )
+        return job_id
+
+    def result(self):
+        message = self.conn.recv()
+        return message[1:]
+
+    def count(self, path):
+        self.submit("count", path)
+        _, ok, value = self.result()
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def status(self):
+        self.conn.send(("stats",))
+        return self.conn.recv()[1]
+
+    def stop(self):
+        self.conn.send(("stop",))
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+
+
+def connect(address=SERVICE_ADDRESS):
+    try:
+        return ServiceClient(address)
+    except ServiceUnavailable:
+        return None
+
+
+def convert_all(
+    files,
+    backend_name=None,
+    workers=None,
+    timeout=JOB_TIMEOUT,
+    delete_source=True,
+    on_result=None,
+    client=None,
+):
+    backend_name = backend_name or default_backend_name()
+    client = client or connect()
+    if client is not None:
+        try:
+            running = client.status()["backend"]
+        except (EOFError, OSError):
+            running = None
+        if running != backend_name:
+            print(f"The Office service does not run {backend_name}, converting here")
+            client.close()
+            client = None
+    if client is None:
+        return cp.convert_all(
+            files, backend_name, workers, timeout, delete_source, on_result
+        )
+    print(f"Converting with the Office service at {SERVICE_ADDRESS}")
+    converted, failed = [], []
+
+    def finished(src, pdf_path):
+        converted.append((src, pdf_path))
+        print(f"Converted {kind_label(src)}: {src}")
+        if on_result is not None:
+            on_result(src, pdf_path, None)
+
+    outstanding = {}
+    pending = iter(files)
+    exhausted = False
+    try:
+        while not exhausted or outstanding:
+            while not exhausted and len(outstanding) < CLIENT_WINDOW:
+                src = next(pending, None)
+                if src is None:
+                    exhausted = True
+                else:
+                    job_id = client.submit(
+                        "convert", src, None, delete_source, backend_name
+                    )
+                    outstanding[job_id] = src
+            if not outstanding:
+                break
+            job_id, ok, value = client.result()
+            src = outstanding.pop(job_id)
+            if ok:
+                finished(src, pdf_path_for(src))
+            else:
+                failed.append((src, value))
+                print(f"Error converting {kind_label(src)} {src}: {value}")
+                if on_result is not None:
+                    on_result(src, None, value)
+    except (EOFError, OSError) as e:
+        print(f"Lost the Office service ({e}), converting the rest locally")
+        requeue = []
+        for src in outstanding.values():
+            pdf_path = pdf_path_for(src)
+            if os.path.exists(pdf_path) and not os.path.exists(src):
+                finished(src, pdf_path)
+            else:
+                requeue.append(src)
+        rest = itertools.chain(requeue, pending)
+        more_converted, more_failed = cp.convert_all(
+            rest, backend_name, workers, timeout, delete_source, on_result
+        )
+        converted += more_converted
+        failed += more_failed
+    finally:
+        client.close()
+    return converted, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Keep Office/LibreOffice warm for conversions and page counts"
+    )
+    parser.add_argument("command", choices=("start", "status", "stop"))
+    parser.add_argument("--backend", default=default_backend_name())
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--recycle-after", type=int, default=RECYCLE_AFTER)
+    parser.add_argument("--address", default=SERVICE_ADDRESS)
+    args = parser.parse_args(argv)
+    if args.command == "start":
+        client = connect(args.address)
+        if client:
+            client.close()
+            print(f"Office service already running on {args.address}")
+            return
+        service = OfficeService(
+            args.address, args.backend, args.workers, args.recycle_after
+        )
+        try:
+            service.serve()
+        except KeyboardInterrupt:
+            pass
+        return
+    client = connect(args.address)
+    if client is None:
+        print(f"No Office service running on {args.address}")
+        sys.exit(1)
+    try:
+        if args.command == "status":
+            for key, value in client.status().items():
+                print(f"{key:>10}: {value}")
+        else:
+            client.stop()
+            print("Office service stopping")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
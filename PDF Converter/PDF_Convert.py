@@ -1,40 +1,106 @@
-import os, comtypes.client
+import os, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Instrumentation import span
+from Convert_Pool import convert_all, default_backend_name, kind_label, pdf_path_for
+from Conversion_Cache import ConversionCache, cache_key, file_sha256, link_or_copy
+from Office_Service import convert_all as service_convert_all
 
 FOLDER = r"D:\PARTH\UNFINISHED PROJECTS\Dataset Raw"
+BACKEND = default_backend_name()
+WORKERS = os.cpu_count() or 1
+JOB_TIMEOUT = 300
+USE_CACHE = True
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pdf_convert_cache")
+CACHE_MAX_BYTES = 10 * 1024**3
+CACHE_OPTIONS = "pdf"
+USE_SERVICE = True
+
+
+def convert_files(files, on_result=None, backend=None, workers=None):
+    convert = service_convert_all if USE_SERVICE else convert_all
+    return convert(
+        files,
+        backend or BACKEND,
+        workers or WORKERS,
+        JOB_TIMEOUT,
+        delete_source=True,
+        on_result=on_result,
+    )
 
 
-def convert_docs(word_app, doc_files):
-    for file_path in doc_files:
-        name, _ = os.path.splitext(file_path)
-        pdf_path = name + ".pdf"
-        try:
-            doc = word_app.Documents.Open(file_path)
-            doc.SaveAs(pdf_path, FileFormat=17)
-            doc.Close()
-            os.remove(file_path)
-            print(f"Converted Word: {file_path}")
-        except Exception as e:
-            print(f"Error converting Word {file_path}: {e}")
-
-
-def convert_ppts(ppt_app, ppt_files):
-    for file_path in ppt_files:
-        name, _ = os.path.splitext(file_path)
-        pdf_path = name + ".pdf"
-        try:
-            pres = ppt_app.Presentations.Open(file_path)
-            pres.SaveAs(pdf_path, 32)
-            pres.Close()
-            os.remove(file_path)
-            print(f"Converted PowerPoint: {file_path}")
-        except Exception as e:
-            print(f"Error converting PowerPoint {file_path}: {e}")
+def convert_with_cache(files, on_result=None):
+    cache = ConversionCache(CACHE_DIR, CACHE_MAX_BYTES)
+    try:
+        groups = {}
+        linked_keys = {}
+        unreadable = []
+        for file_path in files:
+            try:
+                st = os.stat(file_path)
+                ident = (st.st_dev, st.st_ino) if st.st_nlink > 1 else None
+                key = linked_keys.get(ident)
+                if key is None:
+                    with span("convert.hash", bytes=st.st_size):
+                        digest = file_sha256(file_path)
+                    key = cache_key(digest, BACKEND, CACHE_OPTIONS)
+                    if ident is not None:
+                        linked_keys[ident] = key
+            except OSError as e:
+                print(f"Error hashing {file_path}: {e}")
+                unreadable.append((file_path, str(e)))
+                if on_result:
+                    on_result(file_path, None, str(e))
+                continue
+            groups.setdefault(key, []).append(file_path)
+        reused = []
+        pending = {}
+        for key, paths in groups.items():
+            if cache.fetch(key, pdf_path_for(paths[0])):
+                for file_path in paths[1:]:
+                    cache.fetch(key, pdf_path_for(file_path))
+                for file_path in paths:
+                    os.remove(file_path)
+                    reused.append((file_path, pdf_path_for(file_path)))
+                    print(f"Reused cached {kind_label(file_path)}: {file_path}")
+                    if on_result:
+                        on_result(file_path, pdf_path_for(file_path), None)
+            else:
+                pending[paths[0]] = key
+        converted, failed = convert_files(list(pending), on_result)
+        duplicates = 0
+        for src, pdf_path in list(converted):
+            key = pending[src]
+            cache.store(key, pdf_path)
+            for dup in groups[key][1:]:
+                link_or_copy(pdf_path, pdf_path_for(dup))
+                os.remove(dup)
+                duplicates += 1
+                converted.append((dup, pdf_path_for(dup)))
+                print(f"Reused converted {kind_label(dup)}: {dup}")
+                if on_result:
+                    on_result(dup, pdf_path_for(dup), None)
+        for src, detail in list(failed):
+            for dup in groups[pending[src]][1:]:
+                failed.append((dup, detail))
+                if on_result:
+                    on_result(dup, None, detail)
+        print(
+            f"Cache: {cache.hits} hits, {cache.misses} misses, "
+            f"{duplicates} duplicates, {len(unreadable)} unreadable, "
+            f"{cache.total_bytes()} bytes stored"
+        )
+        return reused + converted, unreadable + failed
+    finally:
+        cache.close()
 
 
 def main():
     doc_files = []
     ppt_files = []
-    for root, _, files in os.walk(FOLDER):
+    for root, dirs, files in os.walk(FOLDER):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
         for file in files:
             if file.lower().endswith((".doc", ".docx")):
                 doc_files.append(os.path.join(root, file))
@@ -42,19 +108,12 @@ def main():
                 ppt_files.append(os.path.join(root, file))
             elif not file.lower().endswith(".pdf"):
                 print(f"Skipping unsupported file: {os.path.join(root,file)}")
-    word_app = comtypes.client.CreateObject("Word.Application")
-    word_app.Visible = False
-    try:
-        convert_docs(word_app, doc_files)
-    finally:
-        word_app.Quit()
-    ppt_app = comtypes.client.CreateObject("Powerpoint.Application")
-    ppt_app.Visible = True
-    ppt_app.WindowState = 2
-    try:
-        convert_ppts(ppt_app, ppt_files)
-    finally:
-        ppt_app.Quit()
+    files = doc_files + ppt_files
+    if USE_CACHE:
+        converted, failed = convert_with_cache(files)
+    else:
+        converted, failed = convert_files(files)
+    print(f"Done: {len(converted)} converted, {len(failed)} failed")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,314 @@
+import os, re, sys, time, argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pypdf import PdfWriter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Job_Journal import JobJournal
+from Instrumentation import traced
+
+FOLDER = r"D:\PARTH\UNFINISHED PROJECTS\Dataset Raw"
+WORKERS = os.cpu_count() or 1
+IN_FLIGHT_PER_WORKER = 2
+RECYCLE_AFTER = 50
+LARGE_FILE_BYTES = 200 * 1024**2
+DOWNSAMPLE_DPI = None
+DOWNSAMPLE_ABOVE = 1.5
+JPEG_QUALITY = 80
+DOWNSAMPLE_MODES = ("L", "RGB", "CMYK")
+USE_JOURNAL = True
+
+
+def natural_key(path):
+    parts = re.split(r"(\d+)", os.path.basename(path).lower())
+    return [int(p) if p.isdigit() else p for p in parts]
+
+
+def list_pdfs(folder, exclude=None):
+    exclude = os.path.abspath(exclude) if exclude else None
+    paths = [
+        e.path
+        for e in os.scandir(folder)
+        if e.is_file() and e.name.lower().endswith(".pdf")
+        and os.path.abspath(e.path) != exclude
+    ]
+    return sorted(paths, key=natural_key)
+
+
+def find_pdfs(root):
+    pdfs = []
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                pdfs.append(os.path.join(folder, name))
+    return pdfs
+
+
+def pillow_available():
+    try:
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def downsample_images(writer, dpi):
+    from PIL import Image
+
+    seen = set()
+    count = 0
+    for page in writer.pages:
+        width_in = float(page.mediabox.width) / 72
+        height_in = float(page.mediabox.height) / 72
+        try:
+            images = list(page.images)
+        except Exception:
+            continue
+        for img in images:
+            ref = img.indirect_reference
+            if ref is None or ref.idnum in seen:
+                continue
+            seen.add(ref.idnum)
+            try:
+                image = img.image
+                if image is None or image.mode not in DOWNSAMPLE_MODES:
+                    continue
+                image_dpi = max(image.width / width_in, image.height / height_in)
+                if image_dpi <= dpi * DOWNSAMPLE_ABOVE:
+                    continue
+                scale = dpi / image_dpi
+                size = (
+                    max(1, round(image.width * scale)),
+                    max(1, round(image.height * scale)),
+                )
+                img.replace(image.resize(size, Image.LANCZOS), quality=JPEG_QUALITY)
+                count += 1
+            except Exception as e:
+                print(f"Warning: kept image {img.name}: {type(e).__name__}: {e}")
+    return count
+
+
+def shrink(writer, dpi=None):
+    for page in writer.pages:
+        page.compress_content_streams()
+    images = downsample_images(writer, dpi) if dpi else 0
+    writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+    return images
+
+
+def write_if_smaller(writer, target, before):
+    tmp = f"{target}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            writer.write(f)
+        after = os.path.getsize(tmp)
+        if before is not None and after >= before:
+            os.remove(tmp)
+            return before
+        os.replace(tmp, target)
+        return after
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@traced("optimize.file", path_arg=0)
+def optimize_pdf(path, dpi=None):
+    try:
+        before = os.path.getsize(path)
+        writer = PdfWriter(clone_from=path)
+        images = shrink(writer, dpi)
+        after = write_if_smaller(writer, path, before)
+        return path, before, after, images, None
+    except Exception as e:
+        return path, 0, 0, 0, f"{type(e).__name__}: {e}"
+
+
+@traced("optimize.merge", path_arg=1)
+def merge_pdfs(paths, target, dpi=None):
+    try:
+        before = sum(os.path.getsize(p) for p in paths)
+        writer = PdfWriter()
+        pages = 0
+        for path in paths:
+            writer.append(path, outline_item=Path(path).stem)
+            if len(writer.pages) == pages:
+                raise ValueError(f"{path} has no pages")
+            pages = len(writer.pages)
+        images = shrink(writer, dpi)
+        after = write_if_smaller(writer, target, None)
+        return target, before, after, images, None
+    except Exception as e:
+        return target, 0, 0, 0, f"{type(e).__name__}: {e}"
+
+
+def merge_folder(folder, target=None, dpi=None):
+    folder = os.path.abspath(folder)
+    target = os.path.join(folder, target or f"{os.path.basename(folder)}.pdf")
+    paths = list_pdfs(folder, exclude=target)
+    if not paths:
+        return target, 0, 0, 0, "no PDFs to merge"
+    return merge_pdfs(paths, target, dpi)
+
+
+def run_pool(fn, jobs, workers, recycle, on_result):
+    if not jobs:
+        return
+    in_flight = set()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)), max_tasks_per_child=recycle
+    ) as executor:
+        for args in jobs:
+            in_flight.add(executor.submit(fn, *args))
+            if len(in_flight) >= workers * IN_FLIGHT_PER_WORKER:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    on_result(fut.result())
+        for fut in in_flight:
+            on_result(fut.result())
+
+
+def run_jobs(fn, jobs, sizes, workers, on_result):
+    small = [job for job, size in zip(jobs, sizes) if size <= LARGE_FILE_BYTES]
+    large = [job for job, size in zip(jobs, sizes) if size > LARGE_FILE_BYTES]
+    if workers <= 1:
+        for args in small + large:
+            on_result(fn(*args))
+        return
+    run_pool(fn, small, workers, RECYCLE_AFTER, on_result)
+    run_pool(fn, large, 1, 1, on_result)
+
+
+def new_report():
+    return {"files": 0, "shrunk": 0, "failed": 0, "images": 0, "before": 0, "after": 0}
+
+
+def add_result(report, result, verb):
+    path, before, after, images, error = result
+    report["files"] += 1
+    if error:
+        report["failed"] += 1
+        print(f"Error: could not {verb} {path}: {error}")
+        return False
+    report["before"] += before
+    report["after"] += after
+    report["images"] += images
+    if after < before:
+        report["shrunk"] += 1
+    print(f"{verb.capitalize()}d {path}: {mb(before)} -> {mb(after)}")
+    return True
+
+
+def mb(size):
+    if size < 1024**2:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 1024**2:.2f} MB"
+
+
+def print_report(report, seconds):
+    saved = report["before"] - report["after"]
+    pct = 100 * saved / report["before"] if report["before"] else 0
+    print(
+        f"Done in {seconds:.1f}s: {report['files']} files, {report['shrunk']} smaller, "
+        f"{report['failed']} failed, {report['images']} images downsampled"
+    )
+    print(
+        f"{mb(report['before'])} -> {mb(report['after'])}, "
+        f"saved {mb(saved)} ({pct:.1f}%)"
+    )
+
+
+def optimize_tree(root, workers=None, dpi=None):
+    root = os.path.abspath(root)
+    workers = workers or WORKERS
+    paths = find_pdfs(root)
+    journal = JobJournal("pdf_optimize", root) if USE_JOURNAL else None
+    if journal:
+        paths = [p for p in paths if not journal.is_done(p)]
+        if journal.resumed:
+            print(f"Skipping {journal.resumed} PDFs optimized in an earlier run")
+    report = new_report()
+    start = time.perf_counter()
+
+    def on_result(result):
+        ok = add_result(report, result, "optimize")
+        if journal:
+            if ok:
+                journal.finish(result[0])
+            else:
+                journal.fail(result[0], result[4])
+
+    try:
+        sizes = [os.path.getsize(p) for p in paths]
+        run_jobs(optimize_pdf, [(p, dpi) for p in paths], sizes, workers, on_result)
+    finally:
+        if journal:
+            journal.flush()
+    print_report(report, time.perf_counter() - start)
+    if journal:
+        if not report["failed"]:
+            journal.complete()
+        journal.close()
+    return report
+
+
+def merge_subjects(root, workers=None, dpi=None):
+    root = os.path.abspath(root)
+    jobs, sizes = [], []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if entry.is_dir() and not entry.name.startswith("."):
+            target = os.path.join(entry.path, f"{entry.name}.pdf")
+            paths = list_pdfs(entry.path, exclude=target)
+            if paths:
+                jobs.append((entry.path, target, dpi))
+                sizes.append(sum(os.path.getsize(p) for p in paths))
+    report = new_report()
+    start = time.perf_counter()
+
+    def on_result(result):
+        add_result(report, result, "merge")
+
+    run_jobs(merge_folder, jobs, sizes, workers or WORKERS, on_result)
+    print_report(report, time.perf_counter() - start)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge and shrink PDFs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    opt_cmd = sub.add_parser("optimize", help="shrink every PDF under a folder in place")
+    opt_cmd.add_argument("folder", nargs="?", default=FOLDER)
+    opt_cmd.add_argument("--workers", type=int, default=WORKERS)
+    merge_cmd = sub.add_parser("merge", help="merge the PDFs of a folder into one file")
+    merge_cmd.add_argument("folder")
+    merge_cmd.add_argument(
+        "--output", help="merged file, relative to the folder (default: <folder>.pdf)"
+    )
+    merge_cmd.add_argument(
+        "--all", action="store_true", help="merge each subfolder into its own file"
+    )
+    merge_cmd.add_argument("--workers", type=int, default=WORKERS)
+    for cmd in (opt_cmd, merge_cmd):
+        cmd.add_argument(
+            "--downsample", type=int, metavar="DPI", default=DOWNSAMPLE_DPI,
+            help="re-encode images sharper than this as JPEG (needs Pillow)",
+        )
+    args = parser.parse_args(argv)
+    if args.downsample and not pillow_available():
+        print("Pillow is not installed (pip install pillow); images are kept as they are")
+        args.downsample = None
+    if args.command == "optimize":
+        report = optimize_tree(args.folder, args.workers, args.downsample)
+    elif args.all:
+        report = merge_subjects(args.folder, args.workers, args.downsample)
+    else:
+        start = time.perf_counter()
+        report = new_report()
+        add_result(report, merge_folder(args.folder, args.output, args.downsample), "merge")
+        print_report(report, time.perf_counter() - start)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import os, sys, time, hashlib, zipfile, argparse
+from pathlib import Path, PurePosixPath
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Folder Details"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+import PDF_Convert as pc
+from Convert_Pool import WORD_EXTS, PPT_EXTS, pdf_path_for, kind_label
+from Conversion_Cache import ConversionCache, cache_key
+from Folder_Details import get_pdf_page_count
+from Office_Page_Count import office_metadata_count
+from Streaming_Stats import RunningStats
+from Report_Sinks import open_sinks
+from Instrumentation import span
+
+OFFICE_EXTS = WORD_EXTS + PPT_EXTS
+CHUNK_SIZE = 1024 * 1024
+CSV_NAME = "Folder_Details.csv"
+DELETE_ZIPS = False
+
+
+def member_path(name):
+    parts = [
+        p.strip() or "_"
+        for p in PurePosixPath(name.replace("\\", "/")).parts
+        if p not in ("", ".", "..", "/") and not p.endswith(":")
+    ]
+    return Path(*parts) if parts else None
+
+
+def find_zips(src_root):
+    for root, dirs, files in os.walk(src_root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.lower().endswith(".zip"):
+                yield Path(root) / name
+
+
+class ZipPipeline:
+    def __init__(self, src_root, out_root, backend=None, workers=None, use_cache=None):
+        self.src_root = Path(src_root)
+        self.out_root = Path(out_root)
+        self.backend = backend or pc.BACKEND
+        self.workers = workers or pc.WORKERS
+        use_cache = pc.USE_CACHE if use_cache is None else use_cache
+        self.cache = ConversionCache(pc.CACHE_DIR, pc.CACHE_MAX_BYTES) if use_cache else None
+        self.stats = {}
+        self.jobs = {}
+        self.zips = self.members = self.converted = self.reused = self.failed = 0
+        self.bytes_out = 0
+
+    def subfolder_for(self, zip_path):
+        rel = zip_path.relative_to(self.src_root).with_suffix("")
+        return rel.parts[0]
+
+    def add_count(self, subfolder, count):
+        if count and count > 0:
+            stats = self.stats.get(subfolder)
+            if stats is None:
+                stats = self.stats[subfolder] = RunningStats()
+            stats.add(count)
+
+    def write_member(self, zf, info, dest, hashed=False):
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        h = hashlib.sha256() if hashed else None
+        with span("zip.extract", bytes=info.file_size):
+            with zf.open(info) as src, open(dest, "wb") as out:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+                    if h:
+                        h.update(chunk)
+        self.bytes_out += info.file_size
+        return h.hexdigest() if h else None
+
+    def staged_office_files(self):
+        for zip_path in find_zips(self.src_root):
+            subfolder = self.subfolder_for(zip_path)
+            dest_dir = self.out_root / zip_path.relative_to(self.src_root).with_suffix("")
+            print(f"Streaming: {zip_path}")
+            try:
+                zf = zipfile.ZipFile(zip_path)
+            except (zipfile.BadZipFile, OSError) as e:
+                print(f"Error opening {zip_path}: {e}")
+                continue
+            with zf:
+                for info in zf.infolist():
+                    rel = None if info.is_dir() else member_path(info.filename)
+                    if rel is None:
+                        continue
+                    self.members += 1
+                    dest = dest_dir / rel
+                    ext = dest.suffix.lower()
+                    if ext not in OFFICE_EXTS:
+                        self.write_member(zf, info, dest)
+                        if ext == ".pdf":
+                            self.add_count(subfolder, get_pdf_page_count(str(dest)))
+                        continue
+                    digest = self.write_member(zf, info, dest, hashed=True)
+                    key = cache_key(digest, self.backend, pc.CACHE_OPTIONS)
+                    pdf_path = pdf_path_for(str(dest))
+                    if self.cache and self.cache.fetch(key, pdf_path):
+                        os.remove(dest)
+                        self.reused += 1
+                        print(f"Reused cached {kind_label(str(dest))}: {dest}")
+                        self.add_count(subfolder, get_pdf_page_count(pdf_path))
+                        continue
+                    self.jobs[str(dest)] = (subfolder, key)
+                    yield str(dest)
+            self.zips += 1
+            if DELETE_ZIPS:
+                zip_path.unlink()
+
+    def on_result(self, src, pdf_path, detail):
+        subfolder, key = self.jobs.pop(src)
+        if pdf_path:
+            self.converted += 1
+            if self.cache:
+                self.cache.store(key, pdf_path)
+            self.add_count(subfolder, get_pdf_page_count(pdf_path))
+        else:
+            self.failed += 1
+            ext = os.path.splitext(src)[1].lower()
+            self.add_count(subfolder, office_metadata_count(src, ext))
+
+    def run(self, csv_path=None):
+        start = time.perf_counter()
+        self.out_root.mkdir(parents=True, exist_ok=True)
+        csv_path = str(csv_path or self.out_root / CSV_NAME)
+        try:
+            pc.convert_files(
+                self.staged_office_files(), self.on_result, self.backend, self.workers
+            )
+        finally:
+            if self.cache:
+                self.cache.close()
+        sinks = open_sinks(csv_path)
+        try:
+            for name in sorted(self.stats):
+                row = {"name": name, **self.stats[name].summary()}
+                for sink in sinks:
+                    sink.write(row)
+        finally:
+            for sink in sinks:
+                sink.close()
+        print(
+            f"Done: {self.zips} ZIPs, {self.members} files, {self.converted} converted, "
+            f"{self.reused} reused from cache, {self.failed} failed, "
+            f"{self.bytes_out} bytes written in {time.perf_counter() - start:.1f}s"
+        )
+        print(f"Data exported to: {csv_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert the Office files inside ZIPs to PDF and count pages in one pass"
+    )
+    parser.add_argument("zips", help="folder containing the downloaded ZIPs")
+    parser.add_argument("out", help="output folder")
+    parser.add_argument("--backend", default=pc.BACKEND)
+    parser.add_argument("--workers", type=int, default=pc.WORKERS)
+    parser.add_argument("--csv", help=f"defaults to {CSV_NAME} in the output folder")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+    pipeline = ZipPipeline(
+        args.zips, args.out, args.backend, args.workers, not args.no_cache
+    )
+    pipeline.run(args.csv)
+
+
+if __name__ == "__main__":
+    main()
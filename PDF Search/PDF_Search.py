@@ -0,0 +1,163 @@
+import os, sys, time, argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pypdf import PdfReader
+from Search_Index import SearchIndex, page_postings, default_index_path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Instrumentation import span, traced
+
+INDEX_WORKERS = os.cpu_count() or 1
+IN_FLIGHT_PER_WORKER = 4
+COMMIT_EVERY = 200
+SEARCH_LIMIT = 20
+
+
+@traced("search.extract", path_arg=0)
+def extract_file(path):
+    try:
+        reader = PdfReader(path)
+        texts = []
+        for page in reader.pages:
+            try:
+                texts.append(page.extract_text() or "")
+            except Exception:
+                texts.append("")
+        return len(texts), page_postings(texts), None
+    except Exception as e:
+        return 0, {}, f"{type(e).__name__}: {e}"
+
+
+def scan_pdfs(root):
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError as e:
+            print(f"Warning: could not list {e.filename}: {e}")
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                    yield entry
+
+
+def build_index(root, index_path=None, workers=None):
+    root = os.path.abspath(root)
+    workers = workers or INDEX_WORKERS
+    index = SearchIndex(index_path or default_index_path(root))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    in_flight = {}
+    seen = set()
+    totals = {"indexed": 0, "unchanged": 0, "pages": 0, "errors": 0}
+    start = time.perf_counter()
+
+    def record(path, st, result):
+        pages, postings, error = result
+        index.add_file(path, st, pages, postings, error)
+        totals["indexed"] += 1
+        totals["pages"] += pages
+        if error:
+            totals["errors"] += 1
+            print(f"Warning: could not read {path}: {error}")
+        if totals["indexed"] % COMMIT_EVERY == 0:
+            index.commit()
+            print(f"Indexed {totals['indexed']} files ({totals['pages']} pages)")
+
+    def collect(futures):
+        for fut in futures:
+            path, st = in_flight.pop(fut)
+            record(path, st, fut.result())
+
+    try:
+        for entry in scan_pdfs(root):
+            path = os.path.abspath(entry.path)
+            st = entry.stat()
+            seen.add(path)
+            if index.is_current(path, st):
+                totals["unchanged"] += 1
+                continue
+            if executor is None:
+                record(path, st, extract_file(path))
+                continue
+            in_flight[executor.submit(extract_file, path)] = (path, st)
+            if len(in_flight) >= workers * IN_FLIGHT_PER_WORKER:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(list(in_flight))
+        removed = index.prune(root, seen)
+        index.commit()
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        index.close()
+    seconds = time.perf_counter() - start
+    print(
+        f"Indexed {totals['indexed']} files ({totals['pages']} pages) "
+        f"in {seconds:.1f}s, {totals['unchanged']} unchanged, {removed} removed, "
+        f"{totals['errors']} unreadable"
+    )
+    return totals
+
+
+def print_hits(root, query, hits, total, ms):
+    for path, page, score in hits:
+        print(f"{os.path.relpath(path, root)}  p.{page}  ({score})")
+    print(f"{total} pages match {query!r}, showing {len(hits)} ({ms:.1f} ms)")
+
+
+def search(root, queries, index_path=None, limit=SEARCH_LIMIT):
+    root = os.path.abspath(root)
+    db_path = index_path or default_index_path(root)
+    if not os.path.isfile(db_path):
+        print(f"No index found at {db_path}, run the index command first")
+        return 1
+    index = SearchIndex(db_path)
+    try:
+        interactive = not queries
+        while True:
+            if interactive:
+                try:
+                    query = input("search> ").strip()
+                except EOFError:
+                    print()
+                    break
+                if not query:
+                    continue
+            else:
+                query = queries.pop(0)
+            start = time.perf_counter()
+            with span("search.query", query=query):
+                hits, total = index.search(query, limit)
+            print_hits(root, query, hits, total, (time.perf_counter() - start) * 1000)
+            if not interactive and not queries:
+                break
+    finally:
+        index.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over a PDF folder")
+    sub = parser.add_subparsers(dest="command", required=True)
+    index_cmd = sub.add_parser("index", help="index new and changed PDFs")
+    index_cmd.add_argument("folder")
+    index_cmd.add_argument("--workers", type=int, default=INDEX_WORKERS)
+    index_cmd.add_argument("--index", help="index file (default: inside folder)")
+    search_cmd = sub.add_parser("search", help="query the index")
+    search_cmd.add_argument("folder")
+    search_cmd.add_argument("queries", nargs="*", help="prompted for if omitted")
+    search_cmd.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    search_cmd.add_argument("--index", help="index file (default: inside folder)")
+    args = parser.parse_args(argv)
+    if args.command == "index":
+        build_index(args.folder, args.index, args.workers)
+        return 0
+    return search(args.folder, list(args.queries), args.index, args.limit)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
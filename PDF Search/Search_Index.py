@@ -0,0 +1,407 @@
+import os, re, sys, time, zlib, sqlite3, argparse
+from array import array
+from collections import Counter
+from itertools import repeat, accumulate
+from operator import rshift, sub
+
+INDEX_NAME = ".pdf_search_index.sqlite3"
+TOKEN_PATTERN = re.compile(r"\w+")
+QUERY_PATTERN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+MAX_TOKEN_LEN = 40
+PAGE_SHIFT = 16
+PREFIX_LIMIT = 200
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+def tokenize(text):
+    tokens = TOKEN_PATTERN.findall(text.casefold())
+    return [t for t in tokens if len(t) <= MAX_TOKEN_LEN]
+
+
+def encode_values(values):
+    top = max(values)
+    typecode = "B" if top < 1 << 8 else "H" if top < 1 << 16 else "I"
+    if top >= 1 << 32:
+        typecode = "Q"
+    raw = array(typecode, values).tobytes()
+    packed = zlib.compress(raw)
+    if len(packed) < len(raw):
+        return typecode.lower().encode() + packed
+    return typecode.encode() + raw
+
+
+def decode_values(blob):
+    typecode = chr(blob[0])
+    values = array(typecode.upper())
+    if typecode.islower():
+        values.frombytes(zlib.decompress(blob[1:]))
+    else:
+        values.frombytes(blob[1:])
+    return values
+
+
+def decode_pages(blob):
+    values = decode_values(blob)
+    n = len(values) // 2
+    return values[:n], values[n:]
+
+
+def decode_positions(blob):
+    return accumulate(decode_values(blob))
+
+
+def page_postings(page_texts):
+    postings = {}
+    for page, text in enumerate(page_texts, 1):
+        base = page << PAGE_SHIFT
+        for pos, term in enumerate(tokenize(text)):
+            entry = postings.get(term)
+            if entry is None:
+                entry = postings[term] = ([], [], [], [0])
+            pages, counts, gaps, last = entry
+            if pages and pages[-1] == page:
+                counts[-1] += 1
+            else:
+                pages.append(page)
+                counts.append(1)
+            position = base | min(pos, (1 << PAGE_SHIFT) - 1)
+            gaps.append(position - last[0])
+            last[0] = position
+    return {
+        term: (encode_values(pages + counts), encode_values(gaps))
+        for term, (pages, counts, gaps, _) in postings.items()
+    }
+
+
+def parse_query(query):
+    groups = [[]]
+    for m in QUERY_PATTERN.finditer(query):
+        negated, phrase, word = m.groups()
+        if word == "OR":
+            groups.append([])
+            continue
+        if word is not None:
+            negated = word.startswith("-") and len(word) > 1
+            word = word[1:] if negated else word
+            if word.upper() == "AND":
+                continue
+            prefix = word.endswith("*")
+            terms = tokenize(word)
+            if prefix and len(terms) == 1:
+                groups[-1].append((negated, "prefix", terms))
+                continue
+        else:
+            negated = bool(negated)
+            terms = tokenize(phrase)
+        if len(terms) == 1:
+            groups[-1].append((negated, "term", terms))
+        elif terms:
+            groups[-1].append((negated, "phrase", terms))
+    return [g for g in groups if any(not negated for negated, _, _ in g)]
+
+
+def top_hits(hits, limit):
+    if limit <= 0:
+        return []
+    order = sorted((-max(scores.values()), file_id) for file_id, scores in hits.items())
+    best = []
+    for top, file_id in order:
+        floor = -best[-1][0] if len(best) >= limit else 0
+        if -top < floor:
+            break
+        best.extend(
+            (-score, file_id, page)
+            for page, score in hits[file_id].items()
+            if score >= floor
+        )
+        best.sort()
+        del best[limit:]
+    return best
+
+
+class SearchIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+            "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "pages INTEGER NOT NULL, terms BLOB, error TEXT, updated REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS terms ("
+            "id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term_id INTEGER NOT NULL, file_id INTEGER NOT NULL, "
+            "pages BLOB NOT NULL, positions BLOB NOT NULL, "
+            "PRIMARY KEY (term_id, file_id)) WITHOUT ROWID"
+        )
+        self.db.commit()
+        self.term_ids = None
+        self.files = {
+            path: (file_id, size, mtime_ns)
+            for file_id, path, size, mtime_ns in self.db.execute(
+                "SELECT id, path, size, mtime_ns FROM files"
+            )
+        }
+
+    def is_current(self, path, st):
+        entry = self.files.get(path)
+        return entry is not None and entry[1:] == (st.st_size, st.st_mtime_ns)
+
+    def _term_id(self, term):
+        if self.term_ids is None:
+            self.term_ids = dict(self.db.execute("SELECT term, id FROM terms"))
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            cur = self.db.execute("INSERT INTO terms (term) VALUES (?)", (term,))
+            term_id = self.term_ids[term] = cur.lastrowid
+        return term_id
+
+    def _drop_postings(self, file_id):
+        row = self.db.execute(
+            "SELECT terms FROM files WHERE id = ?", (file_id,)
+        ).fetchone()
+        if row and row[0]:
+            term_ids = array("I")
+            term_ids.frombytes(zlib.decompress(row[0]))
+            self.db.executemany(
+                "DELETE FROM postings WHERE term_id = ? AND file_id = ?",
+                [(term_id, file_id) for term_id in term_ids],
+            )
+
+    def add_file(self, path, st, pages, postings, error=None):
+        entry = self.files.get(path)
+        if entry is not None:
+            self._drop_postings(entry[0])
+        rows = [(self._term_id(term), data) for term, data in postings.items()]
+        terms = zlib.compress(array("I", [t for t, _ in rows]).tobytes())
+        cur = self.db.execute(
+            "INSERT OR REPLACE INTO files "
+            "(id, path, size, mtime_ns, pages, terms, error, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry[0] if entry else None,
+                path,
+                st.st_size,
+                st.st_mtime_ns,
+                pages,
+                terms,
+                error,
+                time.time(),
+            ),
+        )
+        file_id = cur.lastrowid
+        self.db.executemany(
+            "INSERT INTO postings (term_id, file_id, pages, positions) "
+            "VALUES (?, ?, ?, ?)",
+            [(term_id, file_id, *data) for term_id, data in rows],
+        )
+        self.files[path] = (file_id, st.st_size, st.st_mtime_ns)
+
+    def remove_file(self, path):
+        entry = self.files.pop(path, None)
+        if entry is not None:
+            self._drop_postings(entry[0])
+            self.db.execute("DELETE FROM files WHERE id = ?", (entry[0],))
+
+    def prune(self, root, seen):
+        prefix = os.path.join(os.path.abspath(root), "")
+        stale = [p for p in self.files if p.startswith(prefix) and p not in seen]
+        for path in stale:
+            self.remove_file(path)
+        return len(stale)
+
+    def commit(self):
+        self.db.commit()
+
+    def compact(self):
+        self.db.execute(
+            "DELETE FROM terms WHERE id NOT IN (SELECT DISTINCT term_id FROM postings)"
+        )
+        self.db.commit()
+        self.term_ids = None
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.db.execute("VACUUM")
+
+    def stats(self):
+        files, pages, errors = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(pages), 0), COUNT(error) FROM files"
+        ).fetchone()
+        terms = self.db.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        postings = self.db.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        return {
+            "files": files,
+            "pages": pages,
+            "errors": errors,
+            "terms": terms,
+            "postings": postings,
+        }
+
+    def _lookup(self, kind, term):
+        if kind != "prefix":
+            row = self.db.execute("SELECT id FROM terms WHERE term = ?", (term,))
+            return [r[0] for r in row]
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        rows = self.db.execute(
+            "SELECT id FROM terms WHERE term >= ? AND term < ? LIMIT ?",
+            (term, upper, PREFIX_LIMIT),
+        )
+        return [r[0] for r in rows]
+
+    def _frequency(self, kind, terms):
+        counts = []
+        for term in terms if kind == "phrase" else terms[:1]:
+            count = 0
+            for term_id in self._lookup(kind, term):
+                count += self.db.execute(
+                    "SELECT COUNT(*) FROM postings WHERE term_id = ?", (term_id,)
+                ).fetchone()[0]
+            counts.append(count)
+        return min(counts)
+
+    def _rows(self, term_ids, column, file_ids):
+        for term_id in term_ids:
+            rows = self.db.execute(
+                f"SELECT file_id, {column} FROM postings WHERE term_id = ?", (term_id,)
+            )
+            for file_id, blob in rows:
+                if file_ids is None or file_id in file_ids:
+                    yield file_id, blob
+
+    def _term_hits(self, kind, term, file_ids=None):
+        hits = {}
+        for file_id, blob in self._rows(self._lookup(kind, term), "pages", file_ids):
+            pages, counts = decode_pages(blob)
+            scores = hits.get(file_id)
+            if scores is None:
+                hits[file_id] = dict(zip(pages, counts))
+            else:
+                for page, count in zip(pages, counts):
+                    scores[page] = scores.get(page, 0) + count
+        return hits
+
+    def _phrase_hits(self, terms, file_ids=None):
+        matches = {}
+        for offset, term in enumerate(terms):
+            found = {}
+            rows = self._rows(self._lookup("term", term), "positions", file_ids)
+            for file_id, blob in rows:
+                positions = decode_positions(blob)
+                if offset:
+                    positions = map(sub, positions, repeat(offset))
+                if offset == 0:
+                    found[file_id] = set(positions)
+                else:
+                    common = matches[file_id].intersection(positions)
+                    if common:
+                        found[file_id] = common
+            matches = found
+            file_ids = set(found)
+            if not file_ids:
+                break
+        return {
+            file_id: Counter(map(rshift, positions, repeat(PAGE_SHIFT)))
+            for file_id, positions in matches.items()
+        }
+
+    def _clause_hits(self, kind, terms, file_ids=None):
+        if kind == "phrase":
+            return self._phrase_hits(terms, file_ids)
+        return self._term_hits(kind, terms[0], file_ids)
+
+    def _group_hits(self, group):
+        positive = [c for c in group if not c[0]]
+        positive.sort(key=lambda c: self._frequency(c[1], c[2]))
+        hits = self._clause_hits(positive[0][1], positive[0][2])
+        for _, kind, terms in positive[1:]:
+            if not hits:
+                return hits
+            other = self._clause_hits(kind, terms, set(hits))
+            narrowed = {}
+            for file_id, scores in hits.items():
+                more = other.get(file_id)
+                if more:
+                    pages = scores.keys() & more.keys()
+                    if pages:
+                        narrowed[file_id] = {p: scores[p] + more[p] for p in pages}
+            hits = narrowed
+        for _, kind, terms in (c for c in group if c[0]):
+            if not hits:
+                return hits
+            excluded = self._clause_hits(kind, terms, set(hits))
+            for file_id, pages in excluded.items():
+                scores = hits[file_id]
+                kept = scores.keys() - pages.keys()
+                if len(kept) < len(scores):
+                    if kept:
+                        hits[file_id] = {p: scores[p] for p in kept}
+                    else:
+                        del hits[file_id]
+        return hits
+
+    def search(self, query, limit=20):
+        hits = {}
+        for group in parse_query(query):
+            for file_id, scores in self._group_hits(group).items():
+                merged = hits.get(file_id)
+                if merged is None:
+                    hits[file_id] = scores
+                else:
+                    hits[file_id] = merged = dict(merged)
+                    for page, score in scores.items():
+                        merged[page] = max(score, merged.get(page, 0))
+        total = sum(len(scores) for scores in hits.values())
+        top = top_hits(hits, limit)
+        ids = sorted({file_id for _, file_id, _ in top})
+        paths = {}
+        if ids:
+            marks = ",".join("?" * len(ids))
+            sql = f"SELECT id, path FROM files WHERE id IN ({marks})"
+            paths = dict(self.db.execute(sql, ids))
+        return [(paths[f], page, -score) for score, f, page in top], total
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def default_index_path(folder):
+    return os.path.join(folder, INDEX_NAME)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain a PDF search index")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("folder", help="folder that was indexed (holds the index)")
+    parser.add_argument("--index", help=f"index file (default: {INDEX_NAME} in folder)")
+    args = parser.parse_args(argv)
+    db_path = args.index or default_index_path(args.folder)
+    if not os.path.isfile(db_path):
+        print(f"No index found at {db_path}")
+        return 1
+    index = SearchIndex(db_path)
+    try:
+        if args.command == "compact":
+            before = os.path.getsize(db_path)
+            index.compact()
+            print(f"Compacted {db_path}: {before} -> {os.path.getsize(db_path)} bytes")
+        stats = index.stats()
+        print(
+            f"{stats['files']} files, {stats['pages']} pages, "
+            f"{stats['terms']} terms, {stats['postings']} postings, "
+            f"{stats['errors']} unreadable files"
+        )
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
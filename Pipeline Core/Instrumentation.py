@@ -0,0 +1,323 @@
+import os, sys, json, time, atexit, shutil, argparse, threading, subprocess
+import functools, inspect, uuid
+
+TRACE_ENV = "VIT_PIPELINE_TRACE"
+PROFILE_ENV = "VIT_PIPELINE_PROFILE"
+RUN_ENV = "VIT_PIPELINE_RUN"
+BUCKETS_MS = (1, 10, 100, 1000, 10000, 60000)
+
+_fd = None
+_run = None
+_path = None
+_profiler = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, **fields):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, stage, fields):
+        self.stage = stage
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.t0) * 1000.0
+        event = {
+            "run": _run,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "stage": self.stage,
+            "start": round(self.start, 6),
+            "ms": round(ms, 3),
+            "ok": exc_type is None,
+        }
+        if exc_type is not None:
+            event["error"] = f"{exc_type.__name__}: {exc}"
+        event.update(self.fields)
+        emit(event)
+        return False
+
+    def add(self, **fields):
+        for key, value in fields.items():
+            if key == "bytes" and value:
+                self.fields["bytes"] = self.fields.get("bytes", 0) + value
+            elif key != "bytes":
+                self.fields[key] = value
+
+
+def emit(event):
+    if _fd is None:
+        return
+    line = json.dumps(event, default=str, separators=(",", ":")) + "\n"
+    os.write(_fd, line.encode("utf-8"))
+
+
+def span(stage, **fields):
+    if _fd is None:
+        return NULL_SPAN
+    return Span(stage, fields)
+
+
+def file_bytes(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def traced(stage, path_arg=None):
+    def decorate(func):
+        def fields(args):
+            if path_arg is None or path_arg >= len(args):
+                return {}
+            return {"path": str(args[path_arg]), "bytes": file_bytes(args[path_arg])}
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _fd is None:
+                    return await func(*args, **kwargs)
+                with Span(stage, fields(args)):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _fd is None:
+                return func(*args, **kwargs)
+            with Span(stage, fields(args)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def enable(path, profile=None):
+    global _fd, _run, _path
+    if _fd is not None:
+        return
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    _path = path
+    child = os.environ.get(RUN_ENV)
+    _run = child or uuid.uuid4().hex[:12]
+    os.environ[TRACE_ENV] = path
+    os.environ[RUN_ENV] = _run
+    if child:
+        return
+    emit(
+        {
+            "run": _run,
+            "pid": os.getpid(),
+            "event": "run_start",
+            "start": time.time(),
+            "argv": sys.argv,
+        }
+    )
+    start_profile(profile or os.environ.get(PROFILE_ENV))
+    atexit.register(finish)
+
+
+def start_profile(target):
+    global _profiler
+    if not target:
+        return
+    if target.endswith(".svg") or target.endswith(".speedscope.json"):
+        py_spy = shutil.which("py-spy")
+        if py_spy:
+            fmt = "flamegraph" if target.endswith(".svg") else "speedscope"
+            _profiler = subprocess.Popen(
+                [
+                    py_spy,
+                    "record",
+                    "--pid",
+                    str(os.getpid()),
+                    "--subprocesses",
+                    "--format",
+                    fmt,
+                    "--output",
+                    target,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            print(f"Profiling with py-spy into {target}")
+            return
+        target = os.path.splitext(target)[0] + ".pstats"
+        print(f"py-spy not found, profiling with cProfile into {target}")
+    import cProfile
+
+    _profiler = cProfile.Profile()
+    _profiler.target = target
+    _profiler.enable()
+
+
+def stop_profile():
+    global _profiler
+    if _profiler is None:
+        return
+    if isinstance(_profiler, subprocess.Popen):
+        _profiler.terminate()
+        try:
+            _profiler.wait(30)
+        except subprocess.TimeoutExpired:
+            _profiler.kill()
+    else:
+        _profiler.disable()
+        _profiler.dump_stats(_profiler.target)
+        print(f"Profile written to: {_profiler.target} (open with pstats or snakeviz)")
+    _profiler = None
+
+
+def finish():
+    global _fd
+    if _fd is None:
+        return
+    stop_profile()
+    fd, _fd = _fd, None
+    os.close(fd)
+    print(format_summary(summarize(read_events(_path, _run))))
+    print(f"Trace written to: {_path}")
+
+
+def read_events(path, run=None):
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if run is None or event.get("run") == run:
+                events.append(event)
+    return events
+
+
+def percentile(sorted_ms, q):
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))]
+
+
+def summarize(events):
+    stages = {}
+    for event in events:
+        if "stage" not in event:
+            continue
+        s = stages.setdefault(
+            event["stage"],
+            {"ms": [], "bytes": 0, "errors": 0, "first": None, "last": None},
+        )
+        s["ms"].append(event["ms"])
+        s["bytes"] += event.get("bytes") or 0
+        s["errors"] += 0 if event.get("ok", True) else 1
+        start = event["start"]
+        end = start + event["ms"] / 1000.0
+        s["first"] = start if s["first"] is None else min(s["first"], start)
+        s["last"] = end if s["last"] is None else max(s["last"], end)
+    summary = {}
+    for stage, s in stages.items():
+        ms = sorted(s["ms"])
+        busy = sum(ms) / 1000.0
+        wall = max(s["last"] - s["first"], 1e-9)
+        histogram = [0] * (len(BUCKETS_MS) + 1)
+        for value in ms:
+            i = 0
+            while i < len(BUCKETS_MS) and value >= BUCKETS_MS[i]:
+                i += 1
+            histogram[i] += 1
+        summary[stage] = {
+            "count": len(ms),
+            "errors": s["errors"],
+            "busy_s": busy,
+            "wall_s": wall,
+            "p50_ms": percentile(ms, 0.50),
+            "p95_ms": percentile(ms, 0.95),
+            "max_ms": ms[-1],
+            "bytes": s["bytes"],
+            "mb_per_s": s["bytes"] / 1e6 / busy if busy else 0.0,
+            "per_s": len(ms) / wall,
+            "histogram": histogram,
+        }
+    return summary
+
+
+def bucket_labels():
+    labels = []
+    for ms in BUCKETS_MS:
+        labels.append(f"<{ms}ms" if ms < 1000 else f"<{ms // 1000}s")
+    labels.append(f">={BUCKETS_MS[-1] // 1000}s")
+    return labels
+
+
+def format_summary(summary):
+    if not summary:
+        return "Trace: no spans recorded"
+    lines = [
+        f"{'Stage':<28}{'Count':>7}{'Err':>5}{'Busy s':>9}{'p50 ms':>9}"
+        f"{'p95 ms':>9}{'Max ms':>9}{'MB':>9}{'MB/s':>8}{'/s':>8}"
+    ]
+    labels = bucket_labels()
+    for stage in sorted(summary, key=lambda k: -summary[k]["busy_s"]):
+        s = summary[stage]
+        lines.append(
+            f"{stage:<28}{s['count']:>7}{s['errors']:>5}{s['busy_s']:>9.2f}"
+            f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['max_ms']:>9.1f}"
+            f"{s['bytes'] / 1e6:>9.1f}{s['mb_per_s']:>8.1f}{s['per_s']:>8.1f}"
+        )
+        buckets = "  ".join(
+            f"{label}:{n}" for label, n in zip(labels, s["histogram"]) if n
+        )
+        lines.append(f"{'':<4}{buckets}")
+    return "\n".join(lines)
+
+
+def _enable_from_env():
+    path = os.environ.get(TRACE_ENV)
+    if path:
+        enable(path)
+
+
+if __name__ != "__main__":
+    _enable_from_env()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise a pipeline trace file")
+    parser.add_argument("trace", help="JSON-lines file written with VIT_PIPELINE_TRACE")
+    parser.add_argument("--run", help="only this run id (default: the last run)")
+    parser.add_argument("--all", action="store_true", help="every run in the file")
+    args = parser.parse_args(argv)
+    events = read_events(args.trace)
+    run = args.run
+    if run is None and not args.all:
+        starts = [e["run"] for e in events if e.get("event") == "run_start"]
+        run = starts[-1] if starts else None
+    if run and not args.all:
+        events = [e for e in events if e.get("run") == run]
+        print(f"Run {run}")
+    print(format_summary(summarize(events)))
+
+
+if __name__ == "__main__":
+    main()
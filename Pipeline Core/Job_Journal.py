@@ -0,0 +1,162 @@
+import os, sys, time, sqlite3, threading
+from pathlib import Path
+
+JOURNAL_PATH = Path(
+    os.environ.get("VIT_PIPELINE_JOURNAL")
+    or Path.home() / ".vit_pipeline" / "journal.sqlite3"
+)
+FLUSH_EVERY = 200
+FLUSH_INTERVAL = 2.0
+STATES = ("pending", "running", "done", "failed")
+
+
+class JobJournal:
+    def __init__(self, tool, run, path=None):
+        self.tool = tool
+        self.run = str(run)
+        self.path = Path(path or JOURNAL_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "tool TEXT NOT NULL, run TEXT NOT NULL, key TEXT NOT NULL, "
+            "state TEXT NOT NULL, output TEXT, detail TEXT, data BLOB, "
+            "attempts INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL, "
+            "PRIMARY KEY (tool, run, key))"
+        )
+        self.db.commit()
+        self.entries = {}
+        rows = self.db.execute(
+            "SELECT key, state, output, detail, data, attempts FROM jobs "
+            "WHERE tool = ? AND run = ?",
+            (self.tool, self.run),
+        )
+        for key, state, output, detail, data, attempts in rows:
+            self.entries[key] = [state, output, detail, data, attempts]
+        self.resumed = sum(1 for e in self.entries.values() if e[0] == "done")
+        self.buffer = {}
+        self.last_flush = time.monotonic()
+
+    def state(self, key):
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def is_done(self, key):
+        return self.state(key) == "done"
+
+    def output(self, key):
+        entry = self.entries.get(key)
+        return entry[1] if entry else None
+
+    def data(self, key):
+        entry = self.entries.get(key)
+        return entry[3] if entry else None
+
+    def mark(self, key, state, output=None, detail=None, data=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            attempts = entry[4] if entry else 0
+            if state == "running":
+                attempts += 1
+            entry = self.entries[key] = [state, output, detail, data, attempts]
+            self.buffer[key] = entry
+            if (
+                len(self.buffer) >= FLUSH_EVERY
+                or time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+            ):
+                self._flush()
+
+    def start(self, key):
+        self.mark(key, "running")
+
+    def finish(self, key, output=None, data=None):
+        self.mark(key, "done", output, data=data)
+
+    def fail(self, key, detail):
+        self.mark(key, "failed", detail=str(detail))
+
+    def _flush(self):
+        if self.buffer:
+            now = time.time()
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (self.tool, self.run, key, *entry, now)
+                        for key, entry in self.buffer.items()
+                    ],
+                )
+            self.buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def counts(self):
+        counts = dict.fromkeys(STATES, 0)
+        for entry in self.entries.values():
+            counts[entry[0]] = counts.get(entry[0], 0) + 1
+        return counts
+
+    def report(self):
+        counts = self.counts()
+        return (
+            f"Journal: {counts['done']} done ({self.resumed} from an earlier run), "
+            f"{counts['failed']} failed, {counts['running'] + counts['pending']} unfinished"
+        )
+
+    def complete(self):
+        with self.lock:
+            self.buffer.clear()
+            with self.db:
+                self.db.execute(
+                    "DELETE FROM jobs WHERE tool = ? AND run = ?", (self.tool, self.run)
+                )
+            self.entries.clear()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+def list_runs(path=None):
+    db = sqlite3.connect(str(path or JOURNAL_PATH))
+    try:
+        return db.execute(
+            "SELECT tool, run, state, COUNT(*), MAX(updated) FROM jobs "
+            "GROUP BY tool, run, state ORDER BY tool, run, state"
+        ).fetchall()
+    finally:
+        db.close()
+
+
+def clear_runs(tool=None, path=None):
+    db = sqlite3.connect(str(path or JOURNAL_PATH))
+    try:
+        with db:
+            if tool:
+                cur = db.execute("DELETE FROM jobs WHERE tool = ?", (tool,))
+            else:
+                cur = db.execute("DELETE FROM jobs")
+        return cur.rowcount
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "clear"):
+        print("Usage: python Job_Journal.py list | clear [tool]")
+        sys.exit(1)
+    if not JOURNAL_PATH.exists():
+        print(f"No journal at {JOURNAL_PATH}")
+    elif sys.argv[1] == "list":
+        for tool, run, state, count, updated in list_runs():
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(updated))
+            print(f"{tool:<15} {state:<8} {count:>7}  {when}  {run}")
+    else:
+        tool = sys.argv[2] if len(sys.argv) > 2 else None
+        print(f"Removed {clear_runs(tool)} journal entries")
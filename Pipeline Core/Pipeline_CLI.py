@@ -0,0 +1,433 @@
+import os, sys, json, time, argparse, threading
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_ENV = "VIT_PIPELINE_CONFIG"
+CONFIG_NAMES = ("vit_pipeline.yaml", "vit_pipeline.yml", "vit_pipeline.json")
+CONFIG_DIRS = (Path.cwd(), Path.home() / ".vit_pipeline")
+STAGES = {
+    "scrape-vtop": {
+        "folder": "VTOP Scraper",
+        "module": "VTOP_Scraper",
+        "section": "vtop",
+        "root": "base_download_root",
+        "after": (),
+    },
+    "scrape-unibud": {
+        "folder": "Unibud Scraper",
+        "module": "Unibud_Scraper",
+        "section": "unibud",
+        "root": None,
+        "after": (),
+    },
+    "convert": {
+        "folder": "PDF Converter",
+        "module": "PDF_Convert",
+        "section": "convert",
+        "root": "folder",
+        "after": ("scrape-vtop",),
+    },
+    "count": {
+        "folder": "Folder Details",
+        "module": "Folder_Details",
+        "section": "count",
+        "root": "folder",
+        "after": ("convert",),
+    },
+}
+STAGE_OPTIONS = ("after", "subject", "zips", "output")
+VTOP_STORE_DIR = ".material_store"
+
+_timings = defaultdict(float)
+_local = threading.local()
+
+
+class _TimedLoader:
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self._timed(spec.name, self.loader.create_module, spec)
+
+    def exec_module(self, module):
+        return self._timed(module.__name__, self.loader.exec_module, module)
+
+    def _timed(self, name, func, arg):
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(arg)
+        finally:
+            total = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            _timings[name.partition(".")[0]] += total - children
+
+
+class _TimingFinder:
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader)
+            return spec
+        return None
+
+
+def track_imports():
+    sys.meta_path.insert(0, _TimingFinder())
+
+
+def print_import_times(limit=15):
+    if not _timings:
+        return
+    rows = sorted(_timings.items(), key=lambda item: -item[1])
+    print("\nImport time by top-level module (self time):")
+    for name, seconds in rows[:limit]:
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms")
+    rest = sum(seconds for _, seconds in rows[limit:])
+    if rest:
+        print(f"  {f'{len(rows) - limit} others':<28} {rest * 1000:8.1f} ms")
+    total = sum(_timings.values())
+    print(f"  {'total':<28} {total * 1000:8.1f} ms")
+
+
+def find_config(path=None):
+    path = path or os.environ.get(CONFIG_ENV)
+    if path:
+        return Path(path)
+    for folder in CONFIG_DIRS:
+        for name in CONFIG_NAMES:
+            if (folder / name).is_file():
+                return folder / name
+    return None
+
+
+def load_config(path):
+    if path is None:
+        return {}
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        import yaml
+
+        data = yaml.safe_load(text) or {}
+    else:
+        data = json.loads(text) if text.strip() else {}
+    if not isinstance(data, dict):
+        raise SystemExit(f"{path}: expected a mapping of settings")
+    return data
+
+
+def stage_settings(config, name):
+    info = STAGES[name]
+    settings = {}
+    if config.get("root") and info["root"]:
+        settings[info["root"]] = config["root"]
+    section = config.get(info["section"]) or {}
+    if not isinstance(section, dict):
+        raise SystemExit(f"Config section {info['section']!r} must be a mapping")
+    settings.update({str(k).lower(): v for k, v in section.items()})
+    return settings
+
+
+def load_stage(name, show_time=False):
+    info = STAGES[name]
+    folder = str(ROOT / info["folder"])
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    start = time.perf_counter()
+    module = __import__(info["module"])
+    if show_time:
+        ms = (time.perf_counter() - start) * 1000
+        print(f"Loaded {info['module']} for {name} in {ms:.1f} ms")
+    return module
+
+
+def apply_settings(module, settings, section):
+    for key, value in settings.items():
+        if key in STAGE_OPTIONS:
+            continue
+        attr = key.upper()
+        if not hasattr(module, attr):
+            raise SystemExit(f"Unknown setting {section}.{key} for {module.__name__}")
+        current = getattr(module, attr)
+        if isinstance(current, Path) and value is not None:
+            value = Path(value)
+        elif isinstance(current, tuple) and isinstance(value, list):
+            value = tuple(value)
+        setattr(module, attr, value)
+
+
+def run_scrape_vtop(module, settings, once):
+    module.main(once=once, driver=settings.get("driver"))
+
+
+def run_scrape_unibud(module, settings, once):
+    module.main(settings.get("subject"))
+
+
+def require_folder(folder):
+    if not os.path.isdir(folder):
+        raise SystemExit(f"Folder not found: {folder}")
+
+
+def from_zips(folder, settings):
+    zips = settings.get("zips")
+    if zips is None:
+        return os.path.isdir(os.path.join(folder, VTOP_STORE_DIR))
+    return bool(zips)
+
+
+def converted_folder(folder, settings):
+    return settings.get("output") or f"{os.path.normpath(folder)} PDFs"
+
+
+def run_convert(module, settings, once):
+    require_folder(module.FOLDER)
+    if not from_zips(module.FOLDER, settings):
+        module.main()
+        return
+    import Zip_Pipeline
+
+    output = converted_folder(module.FOLDER, settings)
+    print(f"Converting the ZIPs in {module.FOLDER} into {output}")
+    Zip_Pipeline.ZipPipeline(module.FOLDER, output).run()
+
+
+def run_count(module, settings, once):
+    require_folder(module.FOLDER)
+    module.get_folder_details_to_csv(module.FOLDER)
+
+
+RUNNERS = {
+    "scrape-vtop": run_scrape_vtop,
+    "scrape-unibud": run_scrape_unibud,
+    "convert": run_convert,
+    "count": run_count,
+}
+
+
+def login_unibud(module, settings):
+    module.check_session()
+
+
+def login_vtop(module, settings):
+    settings["driver"] = module.login()
+
+
+LOGINS = {
+    "scrape-unibud": login_unibud,
+    "scrape-vtop": login_vtop,
+}
+
+
+def login_all(prepared):
+    for name, login in LOGINS.items():
+        if name in prepared:
+            print(f"[run-all] Preparing {name}")
+            login(*prepared[name])
+
+
+def prepare(name, config, overrides, show_time):
+    settings = stage_settings(config, name)
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    module = load_stage(name, show_time)
+    apply_settings(module, settings, STAGES[name]["section"])
+    return module, settings
+
+
+def stage_order(names, config):
+    deps = {}
+    for name in names:
+        after = stage_settings(config, name).get("after", STAGES[name]["after"])
+        if isinstance(after, str):
+            after = [after]
+        unknown = [d for d in after if d not in STAGES]
+        if unknown:
+            raise SystemExit(f"{name}: unknown stages in 'after': {', '.join(unknown)}")
+        deps[name] = {d for d in after if d in names}
+    order, ready = [], [n for n in names if not deps[n]]
+    remaining = {n: set(d) for n, d in deps.items()}
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for other in names:
+            if name in remaining[other]:
+                remaining[other].discard(name)
+                if not remaining[other]:
+                    ready.append(other)
+    if len(order) != len(names):
+        cycle = ", ".join(n for n in names if n not in order)
+        raise SystemExit(f"Stage dependencies form a cycle: {cycle}")
+    return order, deps
+
+
+def run_dag(order, deps, prepared):
+    results = {}
+    running = {}
+
+    def run(name):
+        module, settings = prepared[name]
+        RUNNERS[name](module, settings, True)
+
+    with ThreadPoolExecutor(max_workers=len(order)) as executor:
+        pending = list(order)
+        while pending or running:
+            for name in list(pending):
+                states = [results.get(d, ("pending",))[0] for d in deps[name]]
+                if any(state in ("failed", "skipped") for state in states):
+                    pending.remove(name)
+                    results[name] = ("skipped", 0.0, "an earlier stage failed")
+                elif all(state == "done" for state in states):
+                    pending.remove(name)
+                    print(f"[run-all] Starting {name}")
+                    running[executor.submit(run, name)] = (name, time.perf_counter())
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, start = running.pop(fut)
+                seconds = time.perf_counter() - start
+                try:
+                    fut.result()
+                    results[name] = ("done", seconds, "")
+                    print(f"[run-all] Finished {name}")
+                except BaseException as e:
+                    results[name] = ("failed", seconds, f"{type(e).__name__}: {e}")
+                    print(f"[run-all] {name} failed: {results[name][2]}")
+    return results
+
+
+def print_summary(order, results):
+    print("\nStage            Status    Seconds")
+    for name in order:
+        status, seconds, detail = results[name]
+        line = f"{name:<16} {status:<9} {seconds:7.1f}"
+        print(f"{line}  {detail}" if detail else line)
+
+
+def run_all(config, args):
+    names = args.stages or config.get("stages") or list(STAGES)
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(unknown)}")
+    names = [n for n in STAGES if n in names]
+    if args.root:
+        config = dict(config, root=args.root)
+    order, deps = stage_order(names, config)
+    overrides = {"scrape-unibud": {"subject": args.subject}}
+    prepared = {
+        name: prepare(name, config, overrides.get(name, {}), args.import_time)
+        for name in order
+    }
+    if "convert" in prepared:
+        convert, settings = prepared["convert"]
+        if "scrape-vtop" in prepared:
+            settings.setdefault("zips", True)
+        if "count" in prepared and from_zips(convert.FOLDER, settings):
+            prepared["count"][0].FOLDER = converted_folder(convert.FOLDER, settings)
+    if "scrape-unibud" in prepared and not prepared["scrape-unibud"][1].get("subject"):
+        raise SystemExit(
+            "run-all needs the UniBud subject: set unibud.subject or pass --subject"
+        )
+    login_all(prepared)
+    results = run_dag(order, deps, prepared)
+    print_summary(order, results)
+    return 0 if all(r[0] == "done" for r in results.values()) else 1
+
+
+def run_one(name, config, args):
+    overrides = {}
+    if name == "scrape-vtop":
+        overrides["base_download_root"] = args.root
+    elif name == "scrape-unibud":
+        overrides["subject"] = args.subject
+        overrides["download_dir"] = args.out
+    elif name == "convert":
+        overrides.update(folder=args.folder, backend=args.backend, workers=args.workers)
+        overrides.update(zips=args.zips, output=args.output)
+    elif name == "count":
+        overrides.update(folder=args.folder, scan_workers=args.workers)
+    module, settings = prepare(name, config, overrides, args.import_time)
+    RUNNERS[name](module, settings, getattr(args, "once", False))
+    return 0
+
+
+def common_options(parser, default=None):
+    parser.add_argument(
+        "--config",
+        default=default,
+        help=f"settings file (default: ${CONFIG_ENV} or {CONFIG_NAMES[0]})",
+    )
+    parser.add_argument(
+        "--import-time",
+        action="store_true",
+        default=default if default is not None else False,
+        help="report the time spent importing each module",
+    )
+    return parser
+
+
+def build_parser():
+    common = common_options(argparse.ArgumentParser(add_help=False), argparse.SUPPRESS)
+    parser = common_options(
+        argparse.ArgumentParser(description="Run the VIT resource pipeline")
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    vtop = sub.add_parser("scrape-vtop", parents=[common], help="download VTOP files")
+    vtop.add_argument("--root", help="download root (BASE_DOWNLOAD_ROOT)")
+    vtop.add_argument("--once", action="store_true", help="stop after one subject")
+    unibud = sub.add_parser("scrape-unibud", parents=[common], help="download PYQs")
+    unibud.add_argument("--subject", help="prompted for if omitted")
+    unibud.add_argument("--out", help="download folder (DOWNLOAD_DIR)")
+    convert = sub.add_parser("convert", parents=[common], help="convert Office files")
+    convert.add_argument("folder", nargs="?")
+    convert.add_argument("--backend", choices=("com", "libreoffice"))
+    convert.add_argument("--workers", type=int)
+    convert.add_argument(
+        "--zips",
+        action=argparse.BooleanOptionalAction,
+        help="convert the Office files inside the folder's ZIPs into --output "
+        "(default: when the folder holds a VTOP material store)",
+    )
+    convert.add_argument("--output", help="--zips output (default: '<folder> PDFs')")
+    count = sub.add_parser("count", parents=[common], help="write Folder_Details.csv")
+    count.add_argument("folder", nargs="?")
+    count.add_argument("--workers", type=int)
+    run = sub.add_parser("run-all", parents=[common], help="run the stages as a DAG")
+    run.add_argument("--root", help="folder shared by scrape-vtop, convert and count")
+    run.add_argument("--subject", help="UniBud subject")
+    run.add_argument("--stages", nargs="+", choices=list(STAGES))
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.import_time:
+        track_imports()
+    try:
+        config_path = find_config(args.config)
+        if config_path:
+            print(f"Using settings from {config_path}")
+        config = load_config(config_path)
+        if args.command == "run-all":
+            return run_all(config, args)
+        return run_one(args.command, config, args)
+    finally:
+        if args.import_time:
+            print_import_times()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
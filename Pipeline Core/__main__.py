@@ -0,0 +1,4 @@
+import sys
+from Pipeline_CLI import main
+
+sys.exit(main())
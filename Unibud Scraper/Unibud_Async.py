@@ -0,0 +1,266 @@
+import time, asyncio, argparse
+from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
+from Unibud_Scraper import (
+    URL,
+    STATE_FILE,
+    DOWNLOAD_DIR,
+    HEADLESS,
+    USE_JOURNAL,
+    BLOCK_REQUESTS,
+    XP_SUBJECT_BUTTON,
+    XP_INCLUDE_ANSWERS,
+    XP_SEARCH_QUESTIONS,
+    XP_GENERATE_PDF,
+    LOC_MODULE_BUTTONS,
+    LOC_Q_CHECKBOXES,
+    LOC_QUESTION_CARD,
+    LOC_NEXT_BTN,
+    CSS_Q_CHECKBOXES,
+    CSS_QUESTION_CARD,
+    JS_FIRST_QUESTION_CHANGED,
+    JS_CHECK_ALL,
+    login,
+    question_id,
+    module_label,
+    module_target,
+    session_is_fresh,
+    is_blocked,
+    JobJournal,
+    span,
+    traced,
+    file_bytes,
+)
+
+CONTEXTS = 3
+
+
+async def safe_click(page, selector, timeout_ms=20000):
+    loc = page.locator(selector)
+    await loc.first.wait_for(state="visible", timeout=timeout_ms)
+    await loc.first.click()
+
+
+async def block_requests(context):
+    async def route_request(route):
+        request = route.request
+        if is_blocked(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.fallback()
+
+    await context.route("**/*", route_request)
+
+
+async def select_subject(page, subject_name):
+    await safe_click(page, f"xpath={XP_SUBJECT_BUTTON}")
+    await page.get_by_text(subject_name).first.click(timeout=15000)
+
+
+async def click_include_answers(page):
+    try:
+        await safe_click(page, f"xpath={XP_INCLUDE_ANSWERS}", timeout_ms=5000)
+    except PWTimeoutError:
+        pass
+
+
+@traced("unibud.search")
+async def click_search_and_wait_for_results(page):
+    await safe_click(page, f"xpath={XP_SEARCH_QUESTIONS}")
+    await page.locator(LOC_Q_CHECKBOXES).first.wait_for(state="visible", timeout=20000)
+
+
+async def extract_first_question_id(page):
+    card = page.locator(LOC_QUESTION_CARD).first
+    await card.wait_for(state="visible", timeout=20000)
+    return question_id(await card.inner_text() or "")
+
+
+async def wait_until_first_question_changes(page, before_id, timeout_ms=20000):
+    await page.wait_for_function(
+        JS_FIRST_QUESTION_CHANGED,
+        arg=[CSS_QUESTION_CARD, before_id],
+        polling="mutation",
+        timeout=timeout_ms,
+    )
+
+
+async def check_all_questions_on_current_page(page):
+    n, _ = await page.evaluate(JS_CHECK_ALL, CSS_Q_CHECKBOXES)
+    if n == 0:
+        raise RuntimeError("0 question checkboxes found on this page.")
+
+
+async def click_next_if_possible(page):
+    next_btn = page.locator(LOC_NEXT_BTN)
+    if await next_btn.count() == 0:
+        return False
+    if await next_btn.first.get_attribute("disabled") is not None:
+        return False
+    try:
+        await next_btn.first.scroll_into_view_if_needed(timeout=3000)
+    except Exception:
+        pass
+    try:
+        await next_btn.first.click(timeout=5000)
+    except Exception:
+        await next_btn.first.click(timeout=5000, force=True)
+    return True
+
+
+@traced("unibud.paginate")
+async def paginate_next_until_end(page):
+    while True:
+        await check_all_questions_on_current_page(page)
+        before_id = await extract_first_question_id(page)
+        moved = await click_next_if_possible(page)
+        if not moved:
+            break
+        await wait_until_first_question_changes(page, before_id, timeout_ms=20000)
+
+
+async def get_module_labels(page):
+    btns = page.locator(LOC_MODULE_BUTTONS)
+    n = await btns.count()
+    return [module_label(await btns.nth(i).inner_text(), i) for i in range(n)]
+
+
+async def download_pdf_as(page, target):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with span("unibud.download", file=target.name) as sp:
+        async with page.expect_download(timeout=60000) as dl_info:
+            await safe_click(page, f"xpath={XP_GENERATE_PDF}")
+        download = await dl_info.value
+        await download.save_as(str(target))
+        sp.add(bytes=file_bytes(target))
+
+
+@traced("unibud.module")
+async def run_one_module(page, url, subject_name, module_idx, target):
+    await page.goto(url, wait_until="domcontentloaded")
+    await select_subject(page, subject_name)
+    await page.locator(LOC_MODULE_BUTTONS).nth(module_idx).click()
+    await click_include_answers(page)
+    await click_search_and_wait_for_results(page)
+    await paginate_next_until_end(page)
+    await download_pdf_as(page, target)
+
+
+async def list_modules(pages, url, subject_name):
+    page = await pages.get()
+    try:
+        await page.goto(url, wait_until="domcontentloaded")
+        await select_subject(page, subject_name)
+        return await get_module_labels(page)
+    finally:
+        pages.put_nowait(page)
+
+
+async def module_job(
+    pages, url, subject_name, module_idx, label, target, journal=None
+):
+    page = await pages.get()
+    start = time.perf_counter()
+    try:
+        print(f"Processing: {subject_name} / {label}")
+        if journal:
+            journal.start(label)
+        await run_one_module(page, url, subject_name, module_idx, target)
+        print(f"Saved: {target} ({time.perf_counter() - start:.1f}s)")
+        if journal:
+            journal.finish(label, str(target))
+        return True
+    except Exception as e:
+        print(f"Failed: {subject_name} / {label}: {e}")
+        if journal:
+            journal.fail(label, e)
+        return False
+    finally:
+        pages.put_nowait(page)
+
+
+async def scrape_subjects(
+    subjects,
+    url=URL,
+    contexts=CONTEXTS,
+    state_file=STATE_FILE,
+    download_dir=DOWNLOAD_DIR,
+    headless=HEADLESS,
+):
+    if not session_is_fresh(state_file):
+        await asyncio.to_thread(login, url, state_file)
+    results = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        pages = asyncio.Queue()
+        open_contexts = []
+        journals = {}
+        for _ in range(contexts):
+            context = await browser.new_context(
+                accept_downloads=True, storage_state=str(state_file)
+            )
+            if BLOCK_REQUESTS:
+                await block_requests(context)
+            open_contexts.append(context)
+            pages.put_nowait(await context.new_page())
+        try:
+            all_labels = await asyncio.gather(
+                *(list_modules(pages, url, s) for s in subjects), return_exceptions=True
+            )
+            jobs = []
+            for subject_name, labels in zip(subjects, all_labels):
+                if isinstance(labels, Exception):
+                    print(f"Could not list modules for {subject_name}: {labels}")
+                    results.append(False)
+                    continue
+                journal = None
+                if USE_JOURNAL:
+                    journal = journals[subject_name] = JobJournal("unibud", subject_name)
+                for idx, label in enumerate(labels):
+                    target = module_target(subject_name, label, download_dir)
+                    if journal and journal.is_done(label) and target.exists():
+                        print(f"Already downloaded: {subject_name} / {label}")
+                        continue
+                    jobs.append(
+                        module_job(pages, url, subject_name, idx, label, target, journal)
+                    )
+            results += await asyncio.gather(*jobs)
+            for journal in journals.values():
+                print(journal.report())
+                if not journal.counts()["failed"]:
+                    journal.complete()
+        finally:
+            for journal in journals.values():
+                journal.close()
+            for context in open_contexts:
+                await context.close()
+            await browser.close()
+    return sum(results), len(results) - sum(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download UniBud modules concurrently")
+    parser.add_argument("subjects", nargs="*", help="subject names (prompted if omitted)")
+    parser.add_argument("--contexts", type=int, default=CONTEXTS)
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--state", default=str(STATE_FILE))
+    parser.add_argument("--out", default=str(DOWNLOAD_DIR))
+    parser.add_argument(
+        "--headless", action=argparse.BooleanOptionalAction, default=HEADLESS
+    )
+    args = parser.parse_args(argv)
+    subjects = args.subjects
+    if not subjects:
+        from Unibud_Scraper import ask_subject_name
+
+        subjects = [ask_subject_name()]
+    start = time.perf_counter()
+    ok, failed = asyncio.run(
+        scrape_subjects(
+            subjects, args.url, args.contexts, args.state, args.out, args.headless
+        )
+    )
+    print(f"Done: {ok} modules saved, {failed} failed in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import re, json, time, sqlite3, argparse, textwrap
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from playwright.sync_api import sync_playwright
+import Unibud_Scraper as ub
+from Unibud_Scraper import (
+    LOC_MODULE_BUTTONS,
+    ask_subject_name,
+    ensure_login_state,
+    session_is_fresh,
+    block_requests,
+    select_subject,
+    click_include_answers,
+    click_search_and_wait_for_results,
+    extract_first_question_id,
+    wait_until_first_question_changes,
+    click_next_if_possible,
+    get_module_labels,
+)
+
+STORE_FILE = Path("unibud_questions.sqlite3")
+CAPTURE_URL_PATTERN = re.compile(r"question", re.I)
+PAGE_PARAM = "page"
+MAX_API_PAGES = 500
+NEWEST_FIRST = False
+QUESTION_ID_KEYS = ("id", "questionId", "question_id", "qid")
+QUESTION_TEXT_KEYS = ("question", "text", "questionText", "body", "content")
+ANSWER_KEYS = ("answer", "solution", "answerText")
+
+
+def find_questions(data):
+    if isinstance(data, list):
+        found = []
+        for item in data:
+            found.extend(find_questions(item))
+        return found
+    if isinstance(data, dict):
+        qid = next((data[k] for k in QUESTION_ID_KEYS if k in data), None)
+        has_text = any(k in data for k in QUESTION_TEXT_KEYS)
+        if qid is not None and has_text:
+            return [(str(qid), data)]
+        found = []
+        for value in data.values():
+            if isinstance(value, (list, dict)):
+                found.extend(find_questions(value))
+        return found
+    return []
+
+
+class QuestionStore:
+    def __init__(self, path=STORE_FILE):
+        self.db = sqlite3.connect(str(path))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id TEXT NOT NULL, subject TEXT NOT NULL, module TEXT NOT NULL, "
+            "payload TEXT NOT NULL, first_seen REAL NOT NULL, last_seen REAL NOT NULL, "
+            "PRIMARY KEY (subject, module, id))"
+        )
+        self.db.commit()
+
+    def add(self, subject, module, questions):
+        now = time.time()
+        new = 0
+        for qid, payload in questions:
+            cur = self.db.execute(
+                "UPDATE questions SET payload = ?, last_seen = ? "
+                "WHERE subject = ? AND module = ? AND id = ?",
+                (json.dumps(payload), now, subject, module, qid),
+            )
+            if cur.rowcount == 0:
+                self.db.execute(
+                    "INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?)",
+                    (qid, subject, module, json.dumps(payload), now, now),
+                )
+                new += 1
+        self.db.commit()
+        return new
+
+    def ids(self, subject, module):
+        rows = self.db.execute(
+            "SELECT id FROM questions WHERE subject = ? AND module = ?",
+            (subject, module),
+        )
+        return {qid for (qid,) in rows}
+
+    def questions(self, subject, module):
+        rows = self.db.execute(
+            "SELECT id, payload FROM questions WHERE subject = ? AND module = ? "
+            "ORDER BY CAST(id AS INTEGER), id",
+            (subject, module),
+        )
+        return [(qid, json.loads(payload)) for qid, payload in rows]
+
+    def export_jsonl(self, path, subject=None):
+        query = "SELECT subject, module, id, payload FROM questions"
+        args = ()
+        if subject:
+            query += " WHERE subject = ?"
+            args = (subject,)
+        with open(path, "w", encoding="utf-8") as f:
+            for subj, module, qid, payload in self.db.execute(query, args):
+                row = {"subject": subj, "module": module, "id": qid}
+                row["question"] = json.loads(payload)
+                f.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.db.close()
+
+
+class ResponseCapture:
+    def __init__(self):
+        self.urls = []
+        self.questions = []
+
+    def __call__(self, response):
+        if not CAPTURE_URL_PATTERN.search(response.url):
+            return
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            data = response.json()
+        except Exception:
+            return
+        found = find_questions(data)
+        if found:
+            self.urls.append(response.url)
+            self.questions.extend(found)
+
+
+def with_page_param(url, n):
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query[PAGE_PARAM] = [str(n)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def all_known(questions, known):
+    return bool(known) and all(qid in known for qid, _ in questions)
+
+
+def fetch_api_pages(page, first_url, seen, known=()):
+    questions = []
+    seen = set(seen)
+    for n in range(2, MAX_API_PAGES + 1):
+        resp = page.request.get(with_page_param(first_url, n))
+        if not resp.ok:
+            break
+        found = [q for q in find_questions(resp.json()) if q[0] not in seen]
+        if not found:
+            break
+        seen.update(qid for qid, _ in found)
+        questions.extend(found)
+        if all_known(found, known):
+            break
+    return questions
+
+
+def click_through_pages(page, capture=None, known=()):
+    while True:
+        before_id = extract_first_question_id(page)
+        before = len(capture.questions) if capture else 0
+        if not click_next_if_possible(page):
+            return
+        wait_until_first_question_changes(page, before_id, timeout_ms=20000)
+        if capture and all_known(capture.questions[before:], known):
+            return
+
+
+def capture_module(page, subject_name, module_idx, known=()):
+    capture = ResponseCapture()
+    page.on("response", capture)
+    try:
+        page.goto(ub.URL, wait_until="domcontentloaded")
+        select_subject(page, subject_name)
+        page.locator(LOC_MODULE_BUTTONS).nth(module_idx).click()
+        click_include_answers(page)
+        click_search_and_wait_for_results(page)
+        page.wait_for_load_state("networkidle")
+        first_url = capture.urls[0] if capture.urls else None
+        if all_known(capture.questions, known):
+            questions = capture.questions
+        elif first_url and PAGE_PARAM in parse_qs(urlparse(first_url).query):
+            seen = {qid for qid, _ in capture.questions}
+            more = fetch_api_pages(page, first_url, seen, known)
+            questions = capture.questions + more
+        else:
+            click_through_pages(page, capture, known)
+            questions = capture.questions
+    finally:
+        page.remove_listener("response", capture)
+    return questions
+
+
+def _pdf_text(s):
+    s = s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return s.encode("cp1252", errors="replace")
+
+
+def _field(payload, keys):
+    for key in keys:
+        value = payload.get(key)
+        if value:
+            return re.sub(r"<[^>]+>", " ", str(value)).strip()
+    return ""
+
+
+def question_lines(questions, width=95):
+    lines = []
+    for qid, payload in questions:
+        lines.append(f"Question ID: {qid}")
+        for para in _field(payload, QUESTION_TEXT_KEYS).splitlines() or [""]:
+            lines.extend(textwrap.wrap(para, width) or [""])
+        answer = _field(payload, ANSWER_KEYS)
+        if answer:
+            for para in ("Answer: " + answer).splitlines():
+                lines.extend(textwrap.wrap(para, width) or [""])
+        lines.append("")
+    return lines
+
+
+def write_questions_pdf(path, title, questions, lines_per_page=60):
+    lines = [title, ""] + question_lines(questions)
+    chunks = [
+        lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)
+    ] or [[]]
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    objs.append(
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>"
+    )
+    kids = []
+    for chunk in chunks:
+        content = bytearray(b"BT /F1 10 Tf 12 TL 40 800 Td\n")
+        for line in chunk:
+            content += b"(" + _pdf_text(line) + b") Tj T*\n"
+        content += b"ET"
+        objs.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_num = len(objs)
+        objs.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_num
+        )
+        kids.append(b"%d 0 R" % len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objs) + 1,
+        xref,
+    )
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_bytes(bytes(out))
+
+
+def capture_subject(subject_name, store, force_pdf=False, newest_first=NEWEST_FIRST):
+    with sync_playwright() as p:
+        if not session_is_fresh():
+            ensure_login_state(p)
+        browser = p.chromium.launch(headless=ub.HEADLESS)
+        context = browser.new_context(storage_state=str(ub.STATE_FILE))
+        if ub.BLOCK_REQUESTS:
+            block_requests(context)
+        page = context.new_page()
+        page.goto(ub.URL, wait_until="domcontentloaded")
+        select_subject(page, subject_name)
+        module_labels = get_module_labels(page)
+        for idx, label in enumerate(module_labels):
+            start = time.perf_counter()
+            known = store.ids(subject_name, label)
+            stop_at = known if newest_first else ()
+            questions = capture_module(page, subject_name, idx, stop_at)
+            new = store.add(
+                subject_name, label, [q for q in questions if q[0] not in known]
+            )
+            target = ub.module_target(subject_name, label)
+            print(
+                f"{label}: {len(questions)} questions captured, {new} new "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+            if new or force_pdf or not target.exists():
+                write_questions_pdf(
+                    target,
+                    f"{subject_name} - {label}",
+                    store.questions(subject_name, label),
+                )
+                print(f"Built: {target}")
+        context.close()
+        browser.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture UniBud questions via the API")
+    parser.add_argument("subjects", nargs="*", help="subject names (prompted if omitted)")
+    parser.add_argument("--store", default=str(STORE_FILE))
+    parser.add_argument("--url", default=ub.URL)
+    parser.add_argument("--state", default=str(ub.STATE_FILE))
+    parser.add_argument("--out", default=str(ub.DOWNLOAD_DIR))
+    parser.add_argument(
+        "--headless", action=argparse.BooleanOptionalAction, default=ub.HEADLESS
+    )
+    parser.add_argument("--jsonl", help="also export the store to this JSONL file")
+    parser.add_argument("--force-pdf", action="store_true")
+    parser.add_argument(
+        "--newest-first",
+        action=argparse.BooleanOptionalAction,
+        default=NEWEST_FIRST,
+        help="the API lists the newest questions first: stop paging at the first "
+        "page of questions that are already stored",
+    )
+    args = parser.parse_args(argv)
+    ub.URL, ub.STATE_FILE, ub.DOWNLOAD_DIR = args.url, Path(args.state), Path(args.out)
+    ub.HEADLESS = args.headless
+    subjects = args.subjects or [ask_subject_name()]
+    store = QuestionStore(args.store)
+    try:
+        for subject_name in subjects:
+            capture_subject(subject_name, store, args.force_pdf, args.newest_first)
+        if args.jsonl:
+            store.export_jsonl(args.jsonl)
+            print(f"Exported: {args.jsonl}")
+    finally:
+        store.close()
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
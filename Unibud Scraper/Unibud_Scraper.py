@@ -1,12 +1,34 @@
-import re
+import re, sys, json, time
 from pathlib import Path
+from urllib.parse import urlparse
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Job_Journal import JobJournal
+from Instrumentation import span, traced, file_bytes
+
 URL = "https://unibud.in/VITQuestionBank"
 STATE_FILE = Path("unibud_state.json")
 DOWNLOAD_DIR = Path.cwd() / "downloads"
-DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
-HEADLESS = False
+HEADLESS = True
+USE_JOURNAL = True
+IN_PLACE_MODULES = False
+MERGE_MODULES = False
+SESSION_CHECK_TIMEOUT = 15000
+BLOCK_REQUESTS = True
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "mixpanel.com",
+    "segment.io",
+)
+BLOCKED_PATH_PATTERN = re.compile(r"analytics|gtag|tracking|pixel", re.I)
 XP_SUBJECT_BUTTON = (
     "/html/body/div[1]/main/div/div/div/aside/div[2]/form/div[1]/div/button"
 )
@@ -22,6 +44,34 @@ LOC_Q_CHECKBOXES = "css=div.checkboxContainer input[name='selected_questions']"
 LOC_QUESTION_CARD = "css=main[role='main'] div.mb-4.rounded-lg"
 LOC_PAGINATION_BAR = "css=main[role='main'] div.flex-shrink-0.p-4.border-t div.flex.justify-center.items-center"
 LOC_NEXT_BTN = f"{LOC_PAGINATION_BAR} > button:last-child"
+CSS_Q_CHECKBOXES = LOC_Q_CHECKBOXES[len("css=") :]
+CSS_QUESTION_CARD = LOC_QUESTION_CARD[len("css=") :]
+JS_FIRST_QUESTION_CHANGED = """([selector, beforeId]) => {
+    const card = document.querySelector(selector);
+    if (!card) return false;
+    const txt = card.innerText || "";
+    const m = txt.match(/Question ID:\\s*(\\d+)/);
+    const id = m ? m[1] : txt.slice(0, 80).trim();
+    return Boolean(id) && id !== beforeId;
+}"""
+JS_FIRST_QUESTION_ID = """(selector) => {
+    const card = document.querySelector(selector);
+    if (!card) return "";
+    const txt = card.innerText || "";
+    const m = txt.match(/Question ID:\\s*(\\d+)/);
+    return m ? m[1] : txt.slice(0, 80).trim();
+}"""
+JS_CHECK_ALL = """(selector) => {
+    const boxes = Array.from(document.querySelectorAll(selector));
+    let changed = 0;
+    for (const cb of boxes) {
+        if (!cb.checked) {
+            cb.click();
+            changed++;
+        }
+    }
+    return [boxes.length, changed];
+}"""
 
 
 def ask_subject_name():
@@ -38,17 +88,126 @@ def safe_click(page, selector, timeout_ms=20000):
     loc.first.click()
 
 
-def ensure_login_state(browser):
+def ensure_login_state(p, url=None, state_file=None):
+    url, state_file = url or URL, state_file or STATE_FILE
+    browser = p.chromium.launch(headless=False)
     context = browser.new_context()
     page = context.new_page()
-    page.goto(URL, wait_until="domcontentloaded")
+    page.goto(url, wait_until="domcontentloaded")
     print("\nOne-time login required.")
     print("1) Complete login in the opened browser window.")
     print("2) When you can access the Question Bank page, press Enter here.\n")
     input("Press Enter after login is complete...")
-    context.storage_state(path=str(STATE_FILE))
+    context.storage_state(path=str(state_file))
     context.close()
-    print(f"Saved session to: {STATE_FILE}\n")
+    browser.close()
+    print(f"Saved session to: {state_file}\n")
+
+
+def login(url=None, state_file=None):
+    with sync_playwright() as p:
+        ensure_login_state(p, url, state_file)
+
+
+def session_is_fresh(state_file=None):
+    try:
+        state = json.loads(Path(state_file or STATE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    cookies = state.get("cookies", [])
+    expiries = [c["expires"] for c in cookies if c.get("expires", -1) > 0]
+    return not expiries or max(expiries) > time.time()
+
+
+def session_active(page):
+    try:
+        page.locator(f"xpath={XP_SUBJECT_BUTTON}").first.wait_for(
+            state="visible", timeout=SESSION_CHECK_TIMEOUT
+        )
+        return True
+    except PWTimeoutError:
+        return False
+
+
+def is_blocked(resource_type, url):
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    parts = urlparse(url)
+    host = parts.hostname or ""
+    if any(host == h or host.endswith("." + h) for h in BLOCKED_HOSTS):
+        return True
+    return bool(BLOCKED_PATH_PATTERN.search(parts.path))
+
+
+def new_traffic():
+    return {"bytes": 0, "requests": 0, "blocked": 0}
+
+
+def block_requests(context, traffic=None):
+    def route_request(route):
+        request = route.request
+        if is_blocked(request.resource_type, request.url):
+            if traffic is not None:
+                traffic["blocked"] += 1
+            route.abort()
+        else:
+            route.fallback()
+
+    context.route("**/*", route_request)
+
+
+def track_traffic(page, traffic):
+    cdp = page.context.new_cdp_session(page)
+
+    def finished(event):
+        traffic["bytes"] += event.get("encodedDataLength") or 0
+        traffic["requests"] += 1
+
+    cdp.on("Network.loadingFinished", finished)
+    cdp.send("Network.enable")
+
+
+def open_session(p, subject_name):
+    browser = p.chromium.launch(headless=HEADLESS)
+    for _ in range(2):
+        if not session_is_fresh():
+            ensure_login_state(p)
+        traffic = new_traffic()
+        context = browser.new_context(
+            accept_downloads=True, storage_state=str(STATE_FILE)
+        )
+        if BLOCK_REQUESTS:
+            block_requests(context, traffic)
+        page = context.new_page()
+        track_traffic(page, traffic)
+        page.goto(URL, wait_until="domcontentloaded")
+        if session_active(page):
+            select_subject(page, subject_name)
+            return browser, context, page, traffic
+        print("Saved session has expired, logging in again.")
+        context.close()
+        STATE_FILE.unlink(missing_ok=True)
+    browser.close()
+    raise RuntimeError("Could not open a logged-in UniBud session")
+
+
+def check_session():
+    with sync_playwright() as p:
+        if session_is_fresh():
+            browser = p.chromium.launch(headless=HEADLESS)
+            try:
+                context = browser.new_context(storage_state=str(STATE_FILE))
+                if BLOCK_REQUESTS:
+                    block_requests(context)
+                page = context.new_page()
+                page.goto(URL, wait_until="domcontentloaded")
+                if session_active(page):
+                    return
+            finally:
+                browser.close()
+            print("Saved session has expired, logging in again.")
+            STATE_FILE.unlink(missing_ok=True)
+        ensure_login_state(p)
 
 
 def select_subject(page, subject_name):
@@ -63,45 +222,43 @@ def click_include_answers(page):
         pass
 
 
+@traced("unibud.search")
 def click_search_and_wait_for_results(page):
+    before_id = page.evaluate(JS_FIRST_QUESTION_ID, CSS_QUESTION_CARD)
     safe_click(page, f"xpath={XP_SEARCH_QUESTIONS}")
+    if before_id:
+        wait_until_first_question_changes(page, before_id, timeout_ms=20000)
     page.locator(LOC_Q_CHECKBOXES).first.wait_for(state="visible", timeout=20000)
 
 
 def extract_first_question_id(page):
     card = page.locator(LOC_QUESTION_CARD).first
     card.wait_for(state="visible", timeout=20000)
-    txt = card.inner_text() or ""
+    return question_id(card.inner_text() or "")
+
+
+def question_id(txt):
     m = re.search("Question ID:\\s*(\\d+)", txt)
     return m.group(1) if m else txt[:80].strip()
 
 
 def wait_until_first_question_changes(page, before_id, timeout_ms=20000):
-    deadline = page.evaluate("() => Date.now()") + timeout_ms
-    while True:
-        if page.evaluate("() => Date.now()") > deadline:
-            raise PWTimeoutError("Timed out waiting for next page content to change.")
-        after_id = extract_first_question_id(page)
-        if after_id and after_id != before_id:
-            return
-        page.wait_for_timeout(200)
+    page.wait_for_function(
+        JS_FIRST_QUESTION_CHANGED,
+        arg=[CSS_QUESTION_CARD, before_id],
+        polling="mutation",
+        timeout=timeout_ms,
+    )
+
+
+def checked_question_count(page):
+    return page.locator(f"{LOC_Q_CHECKBOXES}:checked").count()
 
 
 def check_all_questions_on_current_page(page):
-    boxes = page.locator(LOC_Q_CHECKBOXES)
-    n = boxes.count()
+    n, _ = page.evaluate(JS_CHECK_ALL, CSS_Q_CHECKBOXES)
     if n == 0:
         raise RuntimeError("0 question checkboxes found on this page.")
-    for i in range(n):
-        cb = boxes.nth(i)
-        try:
-            if not cb.is_checked():
-                cb.check()
-        except Exception:
-            try:
-                cb.click()
-            except Exception:
-                pass
 
 
 def click_next_if_possible(page):
@@ -121,6 +278,7 @@ def click_next_if_possible(page):
     return True
 
 
+@traced("unibud.paginate")
 def paginate_next_until_end(page):
     while True:
         check_all_questions_on_current_page(page)
@@ -140,50 +298,128 @@ def sanitize_filename(s):
 def get_module_labels(page):
     btns = page.locator(LOC_MODULE_BUTTONS)
     n = btns.count()
-    labels = []
-    for i in range(n):
-        t = (btns.nth(i).inner_text() or "").strip()
-        labels.append(t if t else f"Module_{i+1}")
-    return labels
+    return [module_label(btns.nth(i).inner_text(), i) for i in range(n)]
 
 
-def download_pdf_as(page, module_label):
-    safe_name = sanitize_filename(module_label)
-    target = DOWNLOAD_DIR / f"{safe_name}.pdf"
-    with page.expect_download(timeout=60000) as dl_info:
-        safe_click(page, f"xpath={XP_GENERATE_PDF}")
-    dl_info.value.save_as(str(target))
+def module_label(text, i):
+    return (text or "").strip() or f"Module_{i+1}"
 
 
-def run_one_module(page, subject_name, module_idx, module_label):
-    page.goto(URL, wait_until="domcontentloaded")
-    select_subject(page, subject_name)
+def module_target(subject_name, module_label, download_dir=None):
+    subject_dir = Path(download_dir or DOWNLOAD_DIR) / sanitize_filename(subject_name)
+    return subject_dir / f"{sanitize_filename(module_label)}.pdf"
+
+
+def download_pdf_as(page, target):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with span("unibud.download", file=target.name) as sp:
+        with page.expect_download(timeout=60000) as dl_info:
+            safe_click(page, f"xpath={XP_GENERATE_PDF}")
+        dl_info.value.save_as(str(target))
+        sp.add(bytes=file_bytes(target))
+
+
+@traced("unibud.module")
+def run_one_module(
+    page, subject_name, module_idx, module_label, in_place=False, include_answers=None
+):
+    if include_answers is None:
+        include_answers = not in_place
+    if not in_place:
+        page.goto(URL, wait_until="domcontentloaded")
+        select_subject(page, subject_name)
     page.locator(LOC_MODULE_BUTTONS).nth(module_idx).click()
-    click_include_answers(page)
+    if include_answers:
+        click_include_answers(page)
     click_search_and_wait_for_results(page)
+    if in_place and checked_question_count(page):
+        print("Questions are still selected from the last module, reloading the page")
+        return run_one_module(page, subject_name, module_idx, module_label)
     paginate_next_until_end(page)
-    download_pdf_as(page, module_label)
+    download_pdf_as(page, module_target(subject_name, module_label))
+
+
+def merge_modules(subject_name, module_labels):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "PDF Converter"))
+    from PDF_Optimize import merge_pdfs, mb
+
+    target = DOWNLOAD_DIR / f"{sanitize_filename(subject_name)}.pdf"
+    paths = [str(module_target(subject_name, label)) for label in module_labels]
+    _, before, after, _, error = merge_pdfs(paths, str(target))
+    if error:
+        print(f"Could not merge the modules into {target.name}: {error}")
+    else:
+        print(
+            f"Merged {len(paths)} modules into {target.name}: "
+            f"{mb(before)} -> {mb(after)}"
+        )
 
 
-def main():
-    subject_name = ask_subject_name()
+def main(subject_name=None):
+    subject_name = subject_name or ask_subject_name()
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-        if not STATE_FILE.exists():
-            ensure_login_state(browser)
-        context = browser.new_context(
-            accept_downloads=True, storage_state=str(STATE_FILE)
-        )
-        page = context.new_page()
-        page.goto(URL, wait_until="domcontentloaded")
-        select_subject(page, subject_name)
+        browser, context, page, traffic = open_session(p, subject_name)
         module_labels = get_module_labels(page)
-        for idx, label in enumerate(module_labels):
-            print(f"Processing: {label}")
-            run_one_module(page, subject_name, idx, label)
+        journal = JobJournal("unibud", subject_name) if USE_JOURNAL else None
+        in_place = True
+        answers_set = False
+        failed = []
+        started = time.perf_counter()
+        try:
+            for idx, label in enumerate(module_labels):
+                target = module_target(subject_name, label)
+                if journal and journal.is_done(label) and target.exists():
+                    print(f"Already downloaded in an earlier run: {label}")
+                    continue
+                print(f"Processing: {label}")
+                if journal:
+                    journal.start(label)
+                start = time.perf_counter()
+                before = dict(traffic)
+                try:
+                    run_one_module(
+                        page, subject_name, idx, label, in_place,
+                        include_answers=not (in_place and answers_set),
+                    )
+                except Exception as e:
+                    print(f"Failed: {label}: {type(e).__name__}: {e}")
+                    if journal:
+                        journal.fail(label, e)
+                    failed.append(label)
+                    in_place = False
+                    continue
+                in_place = IN_PLACE_MODULES
+                answers_set = True
+                if journal:
+                    journal.finish(label, str(target))
+                print(
+                    f"Saved: {target.name} in "
+                    f"{time.perf_counter() - start:.1f}s, "
+                    f"{(traffic['bytes'] - before['bytes']) / 1e6:.2f} MB over "
+                    f"{traffic['requests'] - before['requests']} requests, "
+                    f"{traffic['blocked'] - before['blocked']} blocked"
+                )
+            if journal:
+                print(journal.report())
+                if not failed:
+                    journal.complete()
+        finally:
+            if journal:
+                journal.close()
+        print(
+            f"Traffic: {traffic['bytes'] / 1e6:.2f} MB over {traffic['requests']} "
+            f"requests, {traffic['blocked']} blocked, "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+        context.storage_state(path=str(STATE_FILE))
         context.close()
         browser.close()
-        print("Done.")
+    if failed:
+        print(f"{len(failed)} modules failed, run again to retry: {', '.join(failed)}")
+    elif MERGE_MODULES:
+        merge_modules(subject_name, module_labels)
+    print("Done.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+import os, sys, time, select, struct, shutil, tempfile, ctypes, ctypes.util
+from pathlib import Path
+
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp", ".download")
+STABLE_FOR = 0.3
+POLL_INTERVAL = 0.2
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatch:
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        pos = 0
+        while pos < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, pos)
+            start = pos + EVENT_HEADER.size
+            names.append(os.fsdecode(data[start : start + length].rstrip(b"\0")))
+            pos = start + length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatch:
+    def __init__(self, directory, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(max(min(self.interval, timeout), 0))
+        return []
+
+    def close(self):
+        pass
+
+
+def open_watch(directory):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatch(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatch(directory)
+
+
+def completed_download(directory, ext):
+    names = os.listdir(directory)
+    if any(n.lower().endswith(PARTIAL_SUFFIXES) for n in names):
+        return None
+    for name in names:
+        if name.lower().endswith(ext):
+            return Path(directory) / name
+    return None
+
+
+def is_stable(path, stable_for=STABLE_FOR):
+    try:
+        before = path.stat()
+        time.sleep(stable_for)
+        after = path.stat()
+    except FileNotFoundError:
+        return False
+    return before.st_size == after.st_size and before.st_mtime_ns == after.st_mtime_ns
+
+
+def wait_for_download(directory, ext, timeout, stable_for=STABLE_FOR):
+    end_time = time.monotonic() + timeout
+    watch = open_watch(directory)
+    try:
+        while True:
+            candidate = completed_download(directory, ext)
+            if candidate is not None and is_stable(candidate, stable_for):
+                return candidate
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for a {ext} file in {directory}")
+            watch.wait(min(remaining, 1.0))
+    finally:
+        watch.close()
+
+
+def new_download_dir(root):
+    staging = Path(root) / ".downloads"
+    staging.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix="dl_", dir=staging))
+
+
+def remove_download_dir(path):
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,206 @@
+import os, sys, shutil, sqlite3, hashlib, zipfile, tempfile
+from pathlib import Path, PurePosixPath
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Instrumentation import traced
+
+STORE_DIR_NAME = ".material_store"
+LINK_MODE = "hardlink"
+KEEP_ZIPS = True
+CHUNK_SIZE = 1024 * 1024
+DB_TIMEOUT = 120
+
+
+def safe_member_path(name):
+    parts = []
+    for part in PurePosixPath(name.replace("\\", "/")).parts:
+        if part in ("", ".", "..", "/") or part.endswith(":"):
+            continue
+        parts.append(part.strip() or "_")
+    return Path(*parts) if parts else None
+
+
+def default_store_dir(root):
+    return Path(root) / STORE_DIR_NAME
+
+
+class MaterialStore:
+    def __init__(self, store_dir, link_mode=LINK_MODE):
+        self.store_dir = Path(store_dir)
+        self.objects_dir = self.store_dir / "objects"
+        self.tmp_dir = self.store_dir / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.link_mode = link_mode
+        self.files = 0
+        self.bytes_in = 0
+        self.bytes_new = 0
+        self.db = sqlite3.connect(
+            str(self.store_dir / "store.sqlite3"), timeout=DB_TIMEOUT
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "hash TEXT PRIMARY KEY, size INTEGER NOT NULL, ext TEXT NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            "path TEXT PRIMARY KEY, hash TEXT NOT NULL)"
+        )
+        self.db.commit()
+
+    def _object_path(self, digest, ext):
+        return self.objects_dir / digest[:2] / f"{digest}{ext}"
+
+    def _put_stream(self, stream, ext):
+        h = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    h.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            digest = h.hexdigest()
+            obj = self._object_path(digest, ext)
+            new = not obj.is_file()
+            if new:
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, obj)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO objects VALUES (?, ?, ?)", (digest, size, ext)
+                )
+            else:
+                os.remove(tmp)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return digest, obj, size, new
+
+    def _link(self, obj, dest, digest):
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.is_symlink() or dest.exists():
+            dest.unlink()
+        mode = self.link_mode
+        if mode == "hardlink":
+            try:
+                os.link(obj, dest)
+            except OSError:
+                mode = "symlink"
+        if mode == "symlink":
+            try:
+                os.symlink(obj.resolve(), dest)
+            except OSError:
+                mode = "copy"
+        if mode == "copy":
+            shutil.copyfile(obj, dest)
+        self.db.execute(
+            "INSERT OR REPLACE INTO links VALUES (?, ?)", (os.path.abspath(dest), digest)
+        )
+
+    def add_file(self, path):
+        path = Path(path)
+        with open(path, "rb") as f:
+            digest, obj, _, _ = self._put_stream(f, path.suffix.lower())
+        self._link(obj, path, digest)
+        self.db.commit()
+        return digest
+
+    @traced("store.ingest_zip", path_arg=1)
+    def ingest_zip(self, zip_path, dest_dir=None):
+        zip_path = Path(zip_path)
+        dest_dir = Path(dest_dir) if dest_dir else zip_path.with_suffix("")
+        files = bytes_in = bytes_new = 0
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                rel = safe_member_path(info.filename)
+                if rel is None:
+                    continue
+                with zf.open(info) as member:
+                    digest, obj, size, new = self._put_stream(member, rel.suffix.lower())
+                self._link(obj, dest_dir / rel, digest)
+                files += 1
+                bytes_in += size
+                bytes_new += size if new else 0
+        if KEEP_ZIPS:
+            self.add_file(zip_path)
+        else:
+            zip_path.unlink()
+        self.db.commit()
+        self.files += files
+        self.bytes_in += bytes_in
+        self.bytes_new += bytes_new
+        print(
+            f"Stored {zip_path.name}: {files} files, {bytes_in} bytes, "
+            f"{bytes_new} new -> {dest_dir}"
+        )
+        return dest_dir
+
+    def stored_bytes(self):
+        row = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return row[0]
+
+    def linked_bytes(self):
+        row = self.db.execute(
+            "SELECT COALESCE(SUM(o.size), 0) FROM links l JOIN objects o ON o.hash = l.hash"
+        ).fetchone()
+        return row[0]
+
+    def prune_links(self):
+        gone = [
+            (p,) for (p,) in self.db.execute("SELECT path FROM links")
+            if not os.path.lexists(p)
+        ]
+        self.db.executemany("DELETE FROM links WHERE path = ?", gone)
+        self.db.commit()
+        return len(gone)
+
+    def report(self):
+        lines = []
+        if self.files:
+            ratio = self.bytes_in / self.bytes_new if self.bytes_new else float("inf")
+            lines.append(
+                f"This run: {self.files} files, {self.bytes_in} bytes, "
+                f"{self.bytes_new} new bytes stored (dedupe ratio {ratio:.2f}x)"
+            )
+        stored, linked = self.stored_bytes(), self.linked_bytes()
+        ratio = linked / stored if stored else 1.0
+        lines.append(
+            f"Store: {linked} bytes in folders backed by {stored} unique bytes "
+            f"(dedupe ratio {ratio:.2f}x)"
+        )
+        return "\n".join(lines)
+
+    def close(self):
+        self.db.close()
+
+
+def ingest_folder(folder, store_dir=None, link_mode=LINK_MODE):
+    folder = Path(folder)
+    store = MaterialStore(store_dir or default_store_dir(folder), link_mode)
+    try:
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in files:
+                path = Path(root) / name
+                if name.lower().endswith(".zip") and not path.with_suffix("").exists():
+                    try:
+                        store.ingest_zip(path)
+                    except (zipfile.BadZipFile, OSError) as e:
+                        print(f"Error storing {path}: {e}")
+        store.prune_links()
+        print(store.report())
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python Material_Store.py <download folder>")
+        sys.exit(1)
+    ingest_folder(sys.argv[1])
@@ -0,0 +1,284 @@
+import csv, time, argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, Future
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support import expected_conditions as EC
+import VTOP_Scraper as vs
+from VTOP_Http import collect_rows, plan_downloads, session_headers, download_all
+from VTOP_Http import NotAZipError
+
+VTOP_URL = "https://vtop.vit.ac.in/vtop/content"
+COURSE_PAGE_MENU_XPATH = '//a[contains(@data-url, "StudentCoursePage")]'
+SEMESTER_SELECT_ID = "semesterSubId"
+COURSE_SELECT_ID = "courseId"
+LOGIN_TIMEOUT = 600
+SUBJECT_PIPELINE = 2
+SUMMARY_FILE = "vtop_batch_summary.csv"
+SUMMARY_COLUMNS = [
+    "Course Code",
+    "Subject Folder",
+    "Rows",
+    "Downloaded",
+    "Failed",
+    "Bytes",
+    "Parse Seconds",
+    "Download Seconds",
+    "Errors",
+]
+
+
+def load_manifest(path):
+    path = Path(path)
+    if path.suffix.lower() in (".yaml", ".yml"):
+        import yaml
+
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or []
+        if isinstance(data, dict):
+            data = data.get("courses", [])
+        rows = [{"code": item} if isinstance(item, str) else item for item in data]
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+    courses = []
+    for row in rows:
+        row = {
+            str(k).strip().lower(): "" if v is None else str(v).strip()
+            for k, v in row.items()
+        }
+        code = row.get("code") or row.get("course_code") or row.get("course code")
+        if code:
+            courses.append({"code": code.upper(), "semester": row.get("semester", "")})
+    return courses
+
+
+def starts_with_word(text, prefix):
+    return text.startswith(prefix) and not text[len(prefix) : len(prefix) + 1].isalnum()
+
+
+def select_matching(select_el, wanted):
+    wanted = wanted.strip().lower()
+    exact, prefixed = [], []
+    for option in select_el.options:
+        value = (option.get_attribute("value") or "").lower()
+        text = option.text.strip().lower()
+        if wanted in (value, text):
+            exact.append(option)
+        elif starts_with_word(text, wanted):
+            prefixed.append(option)
+    matches = exact or prefixed
+    if len(matches) > 1:
+        names = ", ".join(option.text.strip() for option in matches)
+        raise ValueError(f"{wanted!r} matches more than one option: {names}")
+    if not matches:
+        return False
+    if not matches[0].is_selected():
+        select_el.select_by_value(matches[0].get_attribute("value"))
+    return True
+
+
+def table_shows_course(driver, code):
+    cells = driver.find_elements(By.XPATH, vs.FACULTY_ROWS_XPATH + "[2]/td[3]")
+    return bool(cells) and cells[0].text.strip().upper() == code
+
+
+def wait_for_login(driver):
+    print(f"Waiting up to {LOGIN_TIMEOUT}s for VTOP login in the browser...")
+    WebDriverWait(driver, LOGIN_TIMEOUT).until(
+        EC.presence_of_element_located((By.XPATH, COURSE_PAGE_MENU_XPATH))
+    )
+
+
+def open_course_page(driver, course):
+    wait = WebDriverWait(driver, vs.PAGE_LOAD_TIMEOUT)
+    if not driver.find_elements(By.ID, COURSE_SELECT_ID):
+        menu = wait.until(
+            EC.presence_of_element_located((By.XPATH, COURSE_PAGE_MENU_XPATH))
+        )
+        driver.execute_script("arguments[0].click();", menu)
+    if course["semester"]:
+        semester = wait.until(EC.presence_of_element_located((By.ID, SEMESTER_SELECT_ID)))
+        if not select_matching(Select(semester), course["semester"]):
+            raise ValueError(f"Semester not found: {course['semester']}")
+    code = course["code"]
+    wait.until(
+        lambda d: any(
+            o.text.strip().upper().startswith(code)
+            for o in Select(d.find_element(By.ID, COURSE_SELECT_ID)).options
+        )
+    )
+    if not select_matching(Select(driver.find_element(By.ID, COURSE_SELECT_ID)), code):
+        raise ValueError(f"Course not found: {code}")
+    wait.until(lambda d: table_shows_course(d, code))
+
+
+def download_subject(
+    course, subject_dir, jobs, base_url, headers, workers, parse_seconds, journal
+):
+    start = time.perf_counter()
+    finished = False
+    try:
+        done, failed = download_all(
+            jobs, base_url, headers, workers, vs.journal_recorder(journal, jobs)
+        )
+        finished = True
+    finally:
+        vs.close_journal(journal, finished)
+    download_seconds = time.perf_counter() - start
+    size = sum(p.stat().st_size for p in done)
+    vs.store_downloads(done, subject_dir)
+    result = {
+        "Course Code": course["code"],
+        "Subject Folder": subject_dir,
+        "Rows": len(jobs),
+        "Downloaded": len(done),
+        "Failed": len(failed),
+        "Bytes": size,
+        "Parse Seconds": round(parse_seconds, 2),
+        "Download Seconds": round(download_seconds, 2),
+        "Errors": error_summary(failed),
+    }
+    if any(isinstance(e, NotAZipError) for _, e in failed):
+        result["Retry"] = (jobs, failed)
+    return result
+
+
+def error_summary(failed):
+    return "; ".join(f"{t.name}: {e}" for t, e in failed)
+
+
+def retry_subject_in_browser(driver, course, result, jobs, failed):
+    subject_dir = result["Subject Folder"]
+    journal = None
+    finished = False
+    try:
+        open_course_page(driver, course)
+        journal = vs.open_journal(subject_dir)
+        done, failed = vs.retry_in_browser(driver, subject_dir, jobs, failed, journal)
+        finished = True
+    except Exception as e:
+        print(f"Could not retry {course['code']} in the browser: {e}")
+        return
+    finally:
+        vs.close_journal(journal, finished)
+    vs.store_downloads(done, subject_dir)
+    result["Downloaded"] += len(done)
+    result["Failed"] = len(failed)
+    result["Bytes"] += sum(p.stat().st_size for p in done)
+    result["Errors"] = error_summary(failed)
+
+
+def failed_subject(course, parse_seconds, error):
+    return {
+        "Course Code": course["code"],
+        "Subject Folder": "",
+        "Rows": 0,
+        "Downloaded": 0,
+        "Failed": 0,
+        "Bytes": 0,
+        "Parse Seconds": round(parse_seconds, 2),
+        "Download Seconds": 0,
+        "Errors": str(error),
+    }
+
+
+def subject_result(course, future):
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"Course {course['code']} failed: {type(e).__name__}: {e}")
+        return failed_subject(course, 0, f"{type(e).__name__}: {e}")
+
+
+def run_batch(driver, courses, workers=vs.HTTP_WORKERS, pipeline=SUBJECT_PIPELINE):
+    results = []
+    with ThreadPoolExecutor(max_workers=pipeline) as executor:
+        for course in courses:
+            print("=" * 50)
+            print(f"Course: {course['code']}")
+            start = time.perf_counter()
+            journal = None
+            try:
+                open_course_page(driver, course)
+                subject_dir = vs.build_subject_download_dir(driver)
+                journal = vs.open_journal(subject_dir)
+                collected = vs.pending_rows(
+                    collect_rows(driver, vs.FACULTY_ROWS_XPATH), journal
+                )
+                jobs = plan_downloads(
+                    collected,
+                    subject_dir,
+                    vs.sanitize_filename,
+                    vs.normalize_slot,
+                    vs.ZIP_EXT,
+                )
+                headers = session_headers(driver)
+            except Exception as e:
+                print(f"Could not open course {course['code']}: {e}")
+                if journal:
+                    journal.close()
+                elapsed = time.perf_counter() - start
+                result = Future()
+                result.set_result(failed_subject(course, elapsed, e))
+                results.append((course, result))
+                continue
+            print(f"Queued {len(jobs)} downloads for {course['code']}")
+            future = executor.submit(
+                download_subject,
+                course,
+                subject_dir,
+                jobs,
+                collected["url"],
+                headers,
+                workers,
+                time.perf_counter() - start,
+                journal,
+            )
+            results.append((course, future))
+        rows = [subject_result(course, future) for course, future in results]
+    for (course, _), row in zip(results, rows):
+        retry = row.pop("Retry", None)
+        if retry:
+            retry_subject_in_browser(driver, course, row, *retry)
+    return rows
+
+
+def write_summary(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print("=" * 50)
+    for row in rows:
+        print(
+            f"{row['Course Code']}: {row['Downloaded']}/{row['Rows']} ZIPs, "
+            f"{row['Bytes'] / 1e6:.1f} MB, parse {row['Parse Seconds']}s, "
+            f"download {row['Download Seconds']}s, {row['Failed']} failed"
+        )
+    print(f"Summary written to: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download VTOP materials for a list of courses")
+    parser.add_argument("manifest", help="CSV (code,semester columns) or YAML course list")
+    parser.add_argument("--out", default=vs.BASE_DOWNLOAD_ROOT)
+    parser.add_argument("--url", default=VTOP_URL)
+    parser.add_argument("--workers", type=int, default=vs.HTTP_WORKERS)
+    parser.add_argument("--pipeline", type=int, default=SUBJECT_PIPELINE)
+    parser.add_argument("--summary", help=f"defaults to {SUMMARY_FILE} in --out")
+    args = parser.parse_args(argv)
+    vs.BASE_DOWNLOAD_ROOT = args.out
+    courses = load_manifest(args.manifest)
+    print(f"Loaded {len(courses)} courses from {args.manifest}")
+    driver = vs.setup_driver()
+    try:
+        driver.get(args.url)
+        wait_for_login(driver)
+        rows = run_batch(driver, courses, args.workers, args.pipeline)
+    finally:
+        driver.quit()
+    write_summary(rows, args.summary or str(Path(args.out) / SUMMARY_FILE))
+
+
+if __name__ == "__main__":
+    main()
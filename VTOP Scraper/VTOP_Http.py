@@ -0,0 +1,210 @@
+import re, sys, time, random
+from pathlib import Path
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import urllib3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Instrumentation import span, traced, file_bytes
+
+MATERIAL_URL = "/vtop/materialDownload"
+MATERIAL_FIELDS = ("classId", "courseId")
+ROW_ARGS_PATTERN = re.compile(r"'([^']*)'")
+HIDDEN_FIELDS = ("_csrf", "authorizedID")
+FACULTY_NAME_COL = 7
+SLOT_COL = 6
+HTTP_WORKERS = 6
+HTTP_RETRIES = 4
+HTTP_BACKOFF = 1.0
+HTTP_TIMEOUT = 120
+CHUNK_SIZE = 256 * 1024
+ZIP_MAGIC = b"PK\x03\x04"
+ZIP_CONTENT_TYPES = (
+    "application/zip",
+    "application/x-zip-compressed",
+    "application/octet-stream",
+)
+
+JS_COLLECT_ROWS = """
+const rows = document.evaluate(arguments[0], document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const hidden = {};
+for (const name of arguments[1]) {
+    const el = document.querySelector(`input[name="${name}"]`);
+    if (el) hidden[name] = el.value;
+}
+const records = [];
+for (let i = 0; i < rows.snapshotLength; i++) {
+    const tr = rows.snapshotItem(i);
+    const cells = Array.from(tr.querySelectorAll("td")).map(td => td.innerText.trim());
+    const btn = tr.querySelector("td:nth-of-type(9) button");
+    records.push({
+        index: i,
+        cells: cells,
+        onclick: btn ? (btn.getAttribute("onclick") || "") : null,
+        text: tr.innerText.trim(),
+    });
+}
+return {rows: records, hidden: hidden, url: location.href};
+"""
+
+
+class NotAZipError(Exception):
+    pass
+
+
+@traced("vtop.collect_rows")
+def collect_rows(driver, faculty_selector):
+    return driver.execute_script(JS_COLLECT_ROWS, faculty_selector, list(HIDDEN_FIELDS))
+
+
+def session_headers(driver):
+    cookies = "; ".join(f"{c['name']}={c['value']}" for c in driver.get_cookies())
+    return {
+        "Cookie": cookies,
+        "User-Agent": driver.execute_script("return navigator.userAgent"),
+        "Referer": driver.current_url,
+    }
+
+
+def row_label(row, sanitize_filename, normalize_slot):
+    cells = row["cells"]
+    raw_name = cells[FACULTY_NAME_COL - 1] if len(cells) >= FACULTY_NAME_COL else ""
+    raw_slot = cells[SLOT_COL - 1] if len(cells) >= SLOT_COL else ""
+    parts = [p.strip() for p in raw_name.split("-")]
+    name_only = parts[1] if len(parts) >= 2 else raw_name
+    return sanitize_filename(f"{name_only} {normalize_slot(raw_slot)}".strip())
+
+
+def row_fields(row, hidden):
+    args = ROW_ARGS_PATTERN.findall(row["onclick"] or "")
+    fields = dict(zip(MATERIAL_FIELDS, args))
+    fields.update(hidden)
+    return fields
+
+
+def plan_downloads(collected, subject_dir, sanitize_filename, normalize_slot, ext):
+    subject_dir = Path(subject_dir)
+    taken = set()
+    jobs = []
+    for row in collected["rows"]:
+        if row["onclick"] is None:
+            continue
+        safe_name = row_label(row, sanitize_filename, normalize_slot)
+        target = subject_dir / (safe_name + ext)
+        counter = 1
+        while target in taken or target.exists():
+            target = subject_dir / f"{safe_name}_{counter}{ext}"
+            counter += 1
+        taken.add(target)
+        jobs.append((row, row_fields(row, collected["hidden"]), target))
+    return jobs
+
+
+def check_content_type(resp):
+    content_type = resp.headers.get("Content-Type") or ""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in ZIP_CONTENT_TYPES:
+        raise NotAZipError(f"server sent {media_type or 'no Content-Type'}")
+
+
+def check_zip_magic(part):
+    with open(part, "rb") as f:
+        magic = f.read(len(ZIP_MAGIC))
+    if magic != ZIP_MAGIC:
+        part.unlink()
+        raise NotAZipError("response does not start with the ZIP signature")
+
+
+def make_pool(workers=HTTP_WORKERS):
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=workers,
+        block=True,
+        retries=False,
+        timeout=urllib3.Timeout(connect=20, read=HTTP_TIMEOUT),
+    )
+
+
+def download_one(pool, url, fields, headers, target, retries=HTTP_RETRIES):
+    with span("vtop.http_download", file=target.name) as sp:
+        part = target.with_name(target.name + ".part")
+        for attempt in range(retries + 1):
+            have = part.stat().st_size if part.exists() else 0
+            req_headers = dict(headers)
+            if have:
+                req_headers["Range"] = f"bytes={have}-"
+            try:
+                resp = pool.request_encode_body(
+                    "POST",
+                    url,
+                    fields=fields,
+                    headers=req_headers,
+                    encode_multipart=False,
+                    preload_content=False,
+                    enforce_content_length=False,
+                )
+                try:
+                    if resp.status == 416:
+                        check_zip_magic(part)
+                        part.replace(target)
+                        sp.add(bytes=file_bytes(target), attempts=attempt + 1)
+                        return target
+                    if resp.status not in (200, 206):
+                        raise urllib3.exceptions.HTTPError(f"HTTP {resp.status}")
+                    check_content_type(resp)
+                    if resp.status == 200:
+                        have = 0
+                    expected = int(resp.headers.get("Content-Length") or -1)
+                    written = 0
+                    with open(part, "ab" if have else "wb") as f:
+                        for chunk in resp.stream(CHUNK_SIZE):
+                            f.write(chunk)
+                            written += len(chunk)
+                    if expected >= 0 and written < expected:
+                        raise urllib3.exceptions.ProtocolError(
+                            f"connection closed after {have + written} bytes"
+                        )
+                finally:
+                    resp.release_conn()
+                check_zip_magic(part)
+                part.replace(target)
+                sp.add(bytes=file_bytes(target), attempts=attempt + 1)
+                return target
+            except (urllib3.exceptions.HTTPError, OSError) as e:
+                if attempt == retries:
+                    raise
+                delay = HTTP_BACKOFF * 2**attempt * (1 + random.random())
+                print(f"Retrying {target.name} in {delay:.1f}s ({e})")
+                time.sleep(delay)
+
+
+def download_all(jobs, base_url, headers, workers=HTTP_WORKERS, on_result=None):
+    url = urljoin(base_url, MATERIAL_URL)
+    pool = make_pool(workers)
+    done, failed = [], []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_one, pool, url, fields, headers, target): target
+            for _, fields, target in jobs
+        }
+        for fut in as_completed(futures):
+            target = futures[fut]
+            error = None
+            try:
+                fut.result()
+                done.append(target)
+                print(f"Downloaded: {target} ({target.stat().st_size} bytes)")
+            except Exception as e:
+                error = e
+                failed.append((target, e))
+                print(f"Download failed for {target.name}: {e}")
+            if on_result is not None:
+                on_result(target, error)
+    print(
+        f"{len(done)} downloaded, {len(failed)} failed "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    pool.clear()
+    return done, failed
@@ -1,11 +1,19 @@
-import os, time, glob, re
+import time, re, sys, sqlite3, zipfile, threading
 from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+from Download_Watcher import wait_for_download, new_download_dir, remove_download_dir
+from VTOP_Http import collect_rows, plan_downloads, session_headers, download_all
+from VTOP_Http import FACULTY_NAME_COL, SLOT_COL, NotAZipError
+from Material_Store import MaterialStore, default_store_dir
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Pipeline Core"))
+from Job_Journal import JobJournal
+from Instrumentation import span, file_bytes
 
 BASE_DOWNLOAD_ROOT = "D:\\Downloads"
 CHROME_DRIVER_PATH = None
@@ -15,6 +23,48 @@ PAGE_LOAD_TIMEOUT = 20
 DOWNLOAD_TIMEOUT = 120
 ZIP_EXT = ".zip"
 DOWNLOAD_DIR = None
+DOWNLOAD_MODE = "browser"
+HTTP_WORKERS = 6
+DEDUPE_DOWNLOADS = True
+USE_JOURNAL = True
+STORE_LOCK = threading.Lock()
+FACULTY_ROWS_XPATH = '//*[@id="getFacultyForCoursePage"]/div[2]/table/tbody/tr'
+DETAIL_HEADER_XPATH = '//*[@id="CoursePageLectureDetail"]/div[2]/div/table/tbody/tr[2]'
+DETAIL_MATCH_COLS = (1, FACULTY_NAME_COL - 1)
+ROW_PHASES = ("open", "download", "back", "total")
+
+JS_OPEN_ROW = """
+const [xpath, index, onclick] = arguments;
+const rows = document.evaluate(xpath, document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const buttonOf = tr => tr.querySelector("td:nth-of-type(9) button");
+let btn = null;
+for (let i = 0; onclick && i < rows.snapshotLength && !btn; i++) {
+    const b = buttonOf(rows.snapshotItem(i));
+    if (b && b.getAttribute("onclick") === onclick) btn = b;
+}
+if (!btn && index < rows.snapshotLength) btn = buttonOf(rows.snapshotItem(index));
+if (!btn) return false;
+btn.scrollIntoView({block: "center"});
+btn.click();
+return true;
+"""
+
+JS_DETAIL_HEADER = """
+const [xpath, expected] = arguments;
+const tr = document.evaluate(xpath, document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!tr || tr.getClientRects().length === 0) return null;
+const cells = Array.from(tr.querySelectorAll("td")).map(td => td.innerText.trim());
+if (cells.length < 7 || !cells[6]) return null;
+if (expected.length && !expected.some(v => cells.includes(v))) return null;
+return cells;
+"""
+
+JS_SHOWN = """
+const el = document.getElementById(arguments[0]);
+return !!el && el.getClientRects().length > 0;
+"""
 
 
 def sanitize_filename(name):
@@ -93,28 +143,22 @@ def set_subject_download_dir(subject_dir):
     print(f"DOWNLOAD_DIR for final files: {DOWNLOAD_DIR}")
 
 
-def wait_for_new_zip(before_files, timeout=DOWNLOAD_TIMEOUT):
-    end_time = time.time() + timeout
-    before_files = set(before_files)
-    base_dir = Path(BASE_DOWNLOAD_ROOT)
-    while time.time() < end_time:
-        zips = glob.glob(str(base_dir / f"*{ZIP_EXT}"))
-        current_files = set(os.path.basename(z) for z in zips)
-        new_files = [f for f in current_files if f not in before_files]
-        if new_files:
-            candidate = new_files[0]
-            full_path = base_dir / candidate
-            temp_path = str(full_path) + ".crdownload"
-            if not os.path.exists(temp_path):
-                return full_path
-        time.sleep(1)
-    raise TimeoutException("Timed out waiting for new ZIP download")
-
-
-def get_current_zip_files():
-    base_dir = Path(BASE_DOWNLOAD_ROOT)
-    zips = glob.glob(str(base_dir / f"*{ZIP_EXT}"))
-    return set(os.path.basename(z) for z in zips)
+def set_browser_download_dir(driver, download_dir):
+    params = {"behavior": "allow", "downloadPath": str(download_dir)}
+    try:
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior", params)
+    except Exception:
+        driver.execute_cdp_cmd("Page.setDownloadBehavior", params)
+
+
+def wait_for_new_zip(download_dir, timeout=DOWNLOAD_TIMEOUT):
+    with span("vtop.wait_zip") as sp:
+        try:
+            path = wait_for_download(download_dir, ZIP_EXT, timeout)
+        except TimeoutError:
+            raise TimeoutException("Timed out waiting for new ZIP download") from None
+        sp.add(bytes=file_bytes(path))
+        return path
 
 
 def normalize_slot(slot_text):
@@ -125,62 +169,174 @@ def normalize_slot(slot_text):
     return parts[0] if parts else slot_text.strip()
 
 
+def row_key(row_text):
+    return " ".join(row_text.split())
+
+
+def open_journal(subject_dir):
+    return JobJournal("vtop", str(Path(subject_dir).resolve())) if USE_JOURNAL else None
+
+
+def already_downloaded(journal, key):
+    if not journal or not journal.is_done(key):
+        return False
+    output = Path(journal.output(key))
+    return output.exists() or output.with_suffix("").is_dir()
+
+
+def close_journal(journal, finished):
+    if not journal:
+        return
+    print(journal.report())
+    if finished and not journal.counts()["failed"]:
+        journal.complete()
+    journal.close()
+
+
+def pending_rows(collected, journal):
+    rows = []
+    for row in collected["rows"]:
+        if already_downloaded(journal, row_key(row["text"])):
+            print(f"Already downloaded in an earlier run: {row['text'][:60]}")
+        else:
+            rows.append(row)
+    return dict(collected, rows=rows)
+
+
+def journal_recorder(journal, jobs):
+    if not journal:
+        return None
+    keys = {target: row_key(row["text"]) for row, _, target in jobs}
+
+    def record(target, error):
+        if error is None:
+            journal.finish(keys[target], str(target))
+        else:
+            journal.fail(keys[target], error)
+
+    return record
+
+
+def unstored_zips(subject_dir):
+    return [
+        p for p in Path(subject_dir).glob(f"*{ZIP_EXT}") if not p.with_suffix("").exists()
+    ]
+
+
+def store_downloads(zip_paths, subject_dir=None):
+    if not DEDUPE_DOWNLOADS:
+        return
+    if subject_dir:
+        zip_paths = list(dict.fromkeys([*zip_paths, *unstored_zips(subject_dir)]))
+    if not zip_paths:
+        return
+    with STORE_LOCK:
+        try:
+            store = MaterialStore(default_store_dir(BASE_DOWNLOAD_ROOT))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not open the material store: {e}")
+            return
+        try:
+            for path in zip_paths:
+                try:
+                    store.ingest_zip(path)
+                except (zipfile.BadZipFile, OSError, sqlite3.Error) as e:
+                    print(f"Could not store {path}: {e}")
+            print(store.report())
+        finally:
+            store.close()
+
+
+def open_row(driver, wait, row):
+    found = driver.execute_script(
+        JS_OPEN_ROW, FACULTY_ROWS_XPATH, row["index"], row["onclick"]
+    )
+    if not found:
+        raise TimeoutException("View button for this row is gone")
+    cells = row["cells"]
+    expected = [cells[i] for i in DETAIL_MATCH_COLS if i < len(cells) and cells[i]]
+    return wait.until(
+        lambda d: d.execute_script(JS_DETAIL_HEADER, DETAIL_HEADER_XPATH, expected)
+    )
+
+
+def click_download(driver, wait):
+    button = wait.until(EC.element_to_be_clickable((By.ID, "allMaterialDownload")))
+    try:
+        button.click()
+    except Exception as e:
+        print(f"'allMaterialDownload' normal click failed ({e}), trying JS click")
+        driver.execute_script("arguments[0].click();", button)
+
+
+def go_back(driver, wait):
+    with span("vtop.back"):
+        wait.until(EC.element_to_be_clickable((By.ID, "backButton"))).click()
+        wait.until(lambda d: d.execute_script(JS_SHOWN, "getFacultyForCoursePage"))
+
+
+def print_row_timings(timings):
+    if not timings:
+        return
+    print(f"Row timings over {len(timings)} rows (seconds):")
+    for phase in ROW_PHASES:
+        values = [t[phase] for t in timings if phase in t]
+        if values:
+            print(
+                f"  {phase:<9} mean {sum(values) / len(values):6.2f}  "
+                f"max {max(values):6.2f}  total {sum(values):7.2f}"
+            )
+
+
 def process_all_faculties(driver):
-    wait = WebDriverWait(driver, 20)
     subject_dir = build_subject_download_dir(driver)
     set_subject_download_dir(subject_dir)
-    faculty_selector = '//*[@id="getFacultyForCoursePage"]/div[2]/table/tbody/tr'
-    faculties = wait.until(
-        EC.presence_of_all_elements_located((By.XPATH, faculty_selector))
-    )
-    faculty_count = len(faculties)
-    print(f"Found {faculty_count} faculty rows (including any header/extra rows)")
-    for index in range(faculty_count):
-        print("=" * 50)
-        print(f"Processing row {index+1}/{faculty_count}")
-        faculties = wait.until(
-            EC.presence_of_all_elements_located((By.XPATH, faculty_selector))
+    rows = collect_rows(driver, FACULTY_ROWS_XPATH)["rows"]
+    print(f"Found {len(rows)} faculty rows (including any header/extra rows)")
+    journal = open_journal(subject_dir)
+    finished = False
+    try:
+        downloaded, _, timings = download_rows_in_browser(
+            driver, subject_dir, rows, journal
         )
-        fac = faculties[index]
-        try:
-            print("Row text:", fac.text)
-        except StaleElementReferenceException:
-            faculties = wait.until(
-                EC.presence_of_all_elements_located((By.XPATH, faculty_selector))
-            )
-            fac = faculties[index]
-            print("Row text (after re-find):", fac.text)
-        try:
-            open_button = fac.find_element(By.XPATH, ".//td[9]/button")
-        except Exception:
+        finished = True
+    finally:
+        close_journal(journal, finished)
+    print_row_timings(timings)
+    store_downloads(downloaded, subject_dir)
+    return timings
+
+
+def download_rows_in_browser(driver, subject_dir, rows, journal):
+    wait = WebDriverWait(driver, PAGE_LOAD_TIMEOUT)
+    downloaded = []
+    missed = []
+    timings = []
+    for n, row in enumerate(rows, 1):
+        print("=" * 50)
+        print(f"Processing row {n}/{len(rows)}")
+        print("Row text:", row["text"])
+        key = row_key(row["text"])
+        if already_downloaded(journal, key):
+            print("Already downloaded in an earlier run, skipping it.")
+            continue
+        if row["onclick"] is None:
             print("No td[9]/button in this row, skipping it.")
             continue
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", fac)
-        time.sleep(0.5)
+        timing = {}
+        start = time.perf_counter()
         try:
-            wait.until(EC.element_to_be_clickable(open_button))
-            open_button.click()
-        except Exception as e:
-            print(f"Normal click on row View button failed ({e}), trying JS click")
-            driver.execute_script("arguments[0].click();", open_button)
-        name_cell = wait.until(
-            EC.presence_of_element_located(
-                (
-                    By.XPATH,
-                    '//*[@id="CoursePageLectureDetail"]/div[2]/div/table/tbody/tr[2]/td[7]',
-                )
-            )
-        )
-        slot_cell = wait.until(
-            EC.presence_of_element_located(
-                (
-                    By.XPATH,
-                    '//*[@id="CoursePageLectureDetail"]/div[2]/div/table/tbody/tr[2]/td[6]',
-                )
-            )
-        )
-        raw_name = name_cell.text.strip()
-        raw_slot = slot_cell.text.strip()
+            with span("vtop.open_row"):
+                header = open_row(driver, wait, row)
+        except TimeoutException as e:
+            print(f"Lecture detail did not open for this row: {e}")
+            if journal:
+                journal.fail(key, "lecture detail did not open")
+            missed.append((row, "lecture detail did not open"))
+            continue
+        timing["open"] = time.perf_counter() - start
+        raw_name = header[FACULTY_NAME_COL - 1].strip()
+        raw_slot = header[SLOT_COL - 1].strip()
         slot_text = normalize_slot(raw_slot)
         parts = [p.strip() for p in raw_name.split("-")]
         if len(parts) >= 2:
@@ -192,32 +348,25 @@ def process_all_faculties(driver):
         print(
             f"Raw: {raw_name} | Slot raw: {raw_slot} | Slot norm: {slot_text} -> {combined_label} -> {safe_name}{ZIP_EXT}"
         )
-        download_all_btn = wait.until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="allMaterialDownload"]'))
-        )
-        driver.execute_script(
-            "arguments[0].scrollIntoView({block: 'center'});", download_all_btn
-        )
-        time.sleep(0.5)
-        before_files = get_current_zip_files()
-        try:
-            download_all_btn.click()
-        except Exception as e:
-            print(f"'allMaterialDownload' normal click failed ({e}), trying JS click")
-            driver.execute_script("arguments[0].click();", download_all_btn)
+        download_dir = new_download_dir(BASE_DOWNLOAD_ROOT)
+        set_browser_download_dir(driver, download_dir)
+        mark = time.perf_counter()
+        click_download(driver, wait)
         try:
-            new_zip_path = wait_for_new_zip(before_files)
+            new_zip_path = wait_for_new_zip(download_dir)
             print(f"Downloaded ZIP (raw): {new_zip_path}")
         except TimeoutException:
             print(f"Download timed out for: {raw_name}")
+            remove_download_dir(download_dir)
+            if journal:
+                journal.fail(key, "download timed out")
+            missed.append((row, "download timed out"))
             try:
-                back_btn = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, '//*[@id="backButton"]'))
-                )
-                back_btn.click()
+                go_back(driver, wait)
             except TimeoutException:
-                print("Could not click backButton after timeout.")
+                print("Could not go back to the faculty table after timeout.")
             continue
+        timing["download"] = time.perf_counter() - mark
         subject_dir_path = Path(subject_dir)
         target_path = subject_dir_path / (safe_name + ZIP_EXT)
         counter = 1
@@ -225,23 +374,89 @@ def process_all_faculties(driver):
             target_path = subject_dir_path / f"{safe_name}_{counter}{ZIP_EXT}"
             counter += 1
         new_zip_path.replace(target_path)
+        remove_download_dir(download_dir)
+        downloaded.append(target_path)
+        if journal:
+            journal.finish(key, str(target_path))
         print(f"Moved & renamed to: {target_path}")
-        back_btn = wait.until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="backButton"]'))
+        mark = time.perf_counter()
+        go_back(driver, wait)
+        timing["back"] = time.perf_counter() - mark
+        timing["total"] = time.perf_counter() - start
+        timings.append(timing)
+        print(
+            f"Row took {timing['total']:.2f}s (open {timing['open']:.2f}s, "
+            f"download {timing['download']:.2f}s, back {timing['back']:.2f}s)"
         )
-        back_btn.click()
+    return downloaded, missed, timings
+
+
+def retry_in_browser(driver, subject_dir, jobs, failed, journal):
+    rejected = {target for target, e in failed if isinstance(e, NotAZipError)}
+    if not rejected:
+        return [], failed
+    targets = {row["index"]: target for row, _, target in jobs if target in rejected}
+    rows = [row for row, _, target in jobs if target in rejected]
+    print(f"{len(rows)} responses were not ZIP files, downloading them in the browser")
+    done, missed, timings = download_rows_in_browser(driver, subject_dir, rows, journal)
+    print_row_timings(timings)
+    failed = [(target, e) for target, e in failed if target not in rejected]
+    failed += [(targets[row["index"]], reason) for row, reason in missed]
+    return done, failed
 
 
-def main():
+def download_all_faculties_http(driver, workers=HTTP_WORKERS):
+    subject_dir = build_subject_download_dir(driver)
+    set_subject_download_dir(subject_dir)
+    journal = open_journal(subject_dir)
+    finished = False
+    try:
+        collected = pending_rows(collect_rows(driver, FACULTY_ROWS_XPATH), journal)
+        jobs = plan_downloads(
+            collected, subject_dir, sanitize_filename, normalize_slot, ZIP_EXT
+        )
+        print(f"Found {len(jobs)} faculty rows with a View button")
+        done, failed = download_all(
+            jobs,
+            collected["url"],
+            session_headers(driver),
+            workers,
+            journal_recorder(journal, jobs),
+        )
+        retried, failed = retry_in_browser(driver, subject_dir, jobs, failed, journal)
+        done += retried
+        finished = True
+    finally:
+        close_journal(journal, finished)
+    store_downloads(done, subject_dir)
+    return done, failed
+
+
+def login():
     driver = setup_driver()
     try:
         driver.get("https://vtop.vit.ac.in")
         input(
             "Login to VTOP, open the desired subject page (where faculty table is visible), then press Enter here..."
         )
+    except BaseException:
+        driver.quit()
+        raise
+    return driver
+
+
+def main(once=False, driver=None):
+    driver = driver or login()
+    if DOWNLOAD_MODE == "http":
+        run = download_all_faculties_http
+    else:
+        run = process_all_faculties
+    try:
         while True:
-            process_all_faculties(driver)
+            run(driver)
             print("Finished processing this subject.")
+            if once:
+                break
             again_same = (
                 input("Run again on the current subject page? (y/n): ").strip().lower()
             )
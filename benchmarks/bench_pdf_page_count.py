@@ -0,0 +1,46 @@
+import os, sys, time, argparse, tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Folder Details"))
+from pypdf import PdfReader
+from Fast_Page_Count import fast_pdf_page_count
+from corpus import make_pdf_corpus
+
+
+def full_count(path):
+    return len(PdfReader(path).pages)
+
+
+def run(label, counter, corpus):
+    start = time.perf_counter()
+    mismatches = 0
+    for path, expected in corpus:
+        if counter(path) != expected:
+            mismatches += 1
+    elapsed = time.perf_counter() - start
+    rate = len(corpus) / elapsed if elapsed else float("inf")
+    print(
+        f"{label:>6}: {elapsed:8.3f}s  {rate:10.1f} files/s  {mismatches} mismatches"
+    )
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PDF page counters")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--max-pages", type=int, default=300)
+    parser.add_argument("--filler-bytes", type=int, default=20000)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as root:
+        corpus = make_pdf_corpus(
+            root, args.files, max_pages=args.max_pages, filler_bytes=args.filler_bytes
+        )
+        total = sum(os.path.getsize(p) for p, _ in corpus)
+        print(f"Corpus: {len(corpus)} PDFs, {total / 1e6:.1f} MB")
+        full = run("full", full_count, corpus)
+        fast = run("fast", fast_pdf_page_count, corpus)
+        print(f"Speedup: {full / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
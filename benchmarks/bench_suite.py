@@ -0,0 +1,538 @@
+import io, os, sys, csv, json, time, shutil, platform, argparse, tempfile, statistics
+import contextlib
+import multiprocessing as mp
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for folder in ("Pipeline Core", "Folder Details", "PDF Converter", "VTOP Scraper"):
+    sys.path.insert(0, str(ROOT / folder))
+from corpus import (
+    pdf_bytes,
+    make_pdf_corpus,
+    make_office_corpus,
+    make_folder_corpus,
+    make_zip_corpus,
+    make_text_corpus,
+)
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+THRESHOLD = 0.15
+HIGHER_IS_BETTER = ("_per_s",)
+LOWER_IS_BETTER = ("_ms", "_kb", "seconds")
+SEARCH_QUERIES = [
+    "kernel",
+    "kernel deadlock",
+    '"operating system"',
+    "term17*",
+    "kernel -deadlock",
+    "term3 OR term200",
+]
+
+
+class Skipped(Exception):
+    pass
+
+
+def latency(samples):
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {}
+    return {
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "mean_ms": round(statistics.mean(ms), 3),
+    }
+
+
+def rate(count, seconds):
+    return round(count / seconds, 2) if seconds else 0.0
+
+
+def tree_bytes(root, exts=None):
+    total = 0
+    for folder, _, files in os.walk(root):
+        for name in files:
+            if exts is None or name.lower().endswith(exts):
+                total += os.path.getsize(os.path.join(folder, name))
+    return total
+
+
+def per_file(counter, corpus):
+    samples = []
+    mismatches = 0
+    for path, expected in corpus:
+        start = time.perf_counter()
+        count = counter(path)
+        samples.append(time.perf_counter() - start)
+        mismatches += count != expected
+    seconds = sum(samples)
+    size = sum(os.path.getsize(p) for p, _ in corpus)
+    return {
+        "files": len(corpus),
+        "seconds": round(seconds, 3),
+        "files_per_s": rate(len(corpus), seconds),
+        "mb_per_s": rate(size / 1e6, seconds),
+        "mismatches": mismatches,
+        **latency(samples),
+    }
+
+
+def bench_pdf_page_count(work, scale):
+    from Folder_Details import get_pdf_page_count
+
+    corpus = make_pdf_corpus(work, 100 * scale, max_pages=200, filler_bytes=20000)
+    return per_file(get_pdf_page_count, corpus)
+
+
+def bench_pdf_search(work, scale):
+    sys.path.insert(0, str(ROOT / "PDF Search"))
+    from PDF_Search import build_index
+    from Search_Index import SearchIndex, default_index_path
+
+    corpus = make_text_corpus(work, 2, 20 * scale, max_pages=30)
+    pages = sum(n for _, n in corpus)
+    start = time.perf_counter()
+    build_index(work)
+    index_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    build_index(work)
+    warm_seconds = time.perf_counter() - start
+    db_path = default_index_path(work)
+    index = SearchIndex(db_path)
+    try:
+        if index.stats()["pages"] != pages:
+            raise RuntimeError(f"Indexed {index.stats()['pages']} of {pages} pages")
+        samples = []
+        for query in SEARCH_QUERIES * 5:
+            start = time.perf_counter()
+            index.search(query)
+            samples.append(time.perf_counter() - start)
+    finally:
+        index.close()
+    stats = latency(samples)
+    return {
+        "files": len(corpus),
+        "pages": pages,
+        "index_seconds": round(index_seconds, 3),
+        "index_pages_per_s": rate(pages, index_seconds),
+        "warm_index_seconds": round(warm_seconds, 3),
+        "index_size_kb": round(os.path.getsize(db_path) / 1024, 1),
+        "query_p50_ms": stats["p50_ms"],
+        "query_p95_ms": stats["p95_ms"],
+    }
+
+
+def bench_pdf_optimize(work, scale):
+    import PDF_Optimize as po
+    from pypdf import PdfReader
+
+    corpus = make_text_corpus(work, 4, 10 * scale, max_pages=20)
+    pages = sum(n for _, n in corpus)
+    source_kb = tree_bytes(work, (".pdf",)) / 1024
+    start = time.perf_counter()
+    merged = po.merge_subjects(work, workers=mp.cpu_count())
+    merge_seconds = time.perf_counter() - start
+    targets = [
+        os.path.join(work, name, f"{name}.pdf") for name in sorted(os.listdir(work))
+    ]
+    merged_pages = sum(len(PdfReader(t).pages) for t in targets)
+    if merged["failed"] or merged_pages != pages:
+        raise RuntimeError(f"Merged {merged_pages} of {pages} pages")
+    saved = po.USE_JOURNAL
+    po.USE_JOURNAL = False
+    try:
+        start = time.perf_counter()
+        optimized = po.optimize_tree(work, workers=mp.cpu_count())
+        optimize_seconds = time.perf_counter() - start
+    finally:
+        po.USE_JOURNAL = saved
+    return {
+        "files": len(corpus),
+        "pages": pages,
+        "merge_seconds": round(merge_seconds, 3),
+        "merge_pages_per_s": rate(pages, merge_seconds),
+        "merged_kb": round(merged["after"] / 1024, 1),
+        "source_kb": round(source_kb, 1),
+        "optimize_seconds": round(optimize_seconds, 3),
+        "optimize_mb_per_s": rate(optimized["before"] / 1e6, optimize_seconds),
+        "optimized_kb": round(optimized["after"] / 1024, 1),
+    }
+
+
+def bench_office_page_count(work, scale):
+    from Office_Page_Count import office_metadata_count
+
+    corpus = []
+    for ext in (".docx", ".pptx"):
+        corpus += [
+            (path, pages, ext)
+            for path, pages in make_office_corpus(
+                os.path.join(work, ext[1:]), 50 * scale, ext, filler_bytes=20000
+            )
+        ]
+    kinds = {path: ext for path, _, ext in corpus}
+    return per_file(
+        lambda path: office_metadata_count(path, kinds[path]),
+        [(path, pages) for path, pages, _ in corpus],
+    )
+
+
+def check_folder_csv(csv_path, expected):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = {row["Subfolder Name"]: row for row in csv.DictReader(f)}
+    mismatches = 0
+    for name, pages in expected.items():
+        row = rows.get(name)
+        if row is None or int(float(row["Total Pages/Slides"])) != sum(pages):
+            mismatches += 1
+    return mismatches
+
+
+def bench_folder_details(work, scale):
+    import Folder_Details as fd
+
+    root = os.path.join(work, "corpus")
+    expected = make_folder_corpus(
+        root, 4, 40 * scale, 5 * scale, 5 * scale, filler_bytes=20000
+    )
+    files = sum(len(pages) for pages in expected.values())
+    size = tree_bytes(root)
+    index_path = os.path.join(work, "index.sqlite3")
+    saved = fd.USE_INDEX, fd.USE_JOURNAL
+    fd.USE_INDEX, fd.USE_JOURNAL = False, False
+    try:
+        start = time.perf_counter()
+        fd.get_folder_details_to_csv(root)
+        cold = time.perf_counter() - start
+        csv_path = os.path.join(root, "Folder_Details.csv")
+        mismatches = check_folder_csv(csv_path, expected)
+        fd.USE_INDEX = True
+        fd.get_folder_details_to_csv(root, index_path)
+        start = time.perf_counter()
+        fd.get_folder_details_to_csv(root, index_path)
+        warm = time.perf_counter() - start
+    finally:
+        fd.USE_INDEX, fd.USE_JOURNAL = saved
+    return {
+        "files": files,
+        "seconds": round(cold, 3),
+        "files_per_s": rate(files, cold),
+        "mb_per_s": rate(size / 1e6, cold),
+        "indexed_seconds": round(warm, 3),
+        "indexed_files_per_s": rate(files, warm),
+        "mismatches": mismatches,
+    }
+
+
+class StubBackend:
+    name = "stub"
+
+    def convert(self, src, pdf_path, timeout=None):
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_bytes(1))
+
+    def close(self):
+        pass
+
+
+def conversion_backend(allow_stub):
+    import Convert_Pool as cp
+
+    name = cp.default_backend_name()
+    try:
+        if name == "com":
+            import comtypes.client  # noqa: F401
+        else:
+            cp.find_soffice()
+        return name
+    except (ImportError, FileNotFoundError):
+        pass
+    if allow_stub and mp.get_start_method() == "fork":
+        cp.BACKENDS["stub"] = StubBackend
+        return "stub"
+    raise Skipped("no Office or LibreOffice backend available")
+
+
+def bench_convert(work, scale):
+    from Convert_Pool import convert_all
+
+    backend = conversion_backend(allow_stub=False)
+    files = []
+    for ext in (".docx", ".pptx"):
+        files += [
+            path
+            for path, _ in make_office_corpus(
+                os.path.join(work, ext[1:]), 5 * scale, ext, max_pages=10
+            )
+        ]
+    size = sum(os.path.getsize(p) for p in files)
+    start = time.perf_counter()
+    converted, failed = convert_all(files, backend, os.cpu_count(), delete_source=True)
+    seconds = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "files": len(files),
+        "failed": len(failed),
+        "seconds": round(seconds, 3),
+        "files_per_s": rate(len(converted), seconds),
+        "mb_per_s": rate(size / 1e6, seconds),
+    }
+
+
+def bench_zip_pipeline(work, scale):
+    from Zip_Pipeline import ZipPipeline
+
+    backend = conversion_backend(allow_stub=True)
+    src = os.path.join(work, "zips")
+    zips = make_zip_corpus(src, 2, 5 * scale, 8, 2, filler_bytes=20000, shared=2)
+    size = sum(os.path.getsize(p) for p in zips)
+    pipeline = ZipPipeline(src, os.path.join(work, "out"), backend, use_cache=False)
+    start = time.perf_counter()
+    pipeline.run()
+    seconds = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "zips": pipeline.zips,
+        "files": pipeline.members,
+        "failed": pipeline.failed,
+        "seconds": round(seconds, 3),
+        "zips_per_s": rate(pipeline.zips, seconds),
+        "files_per_s": rate(pipeline.members, seconds),
+        "mb_per_s": rate(size / 1e6, seconds),
+    }
+
+
+def bench_vtop_http(work, scale):
+    import VTOP_Http as vh
+    from mock_vtop import MockVtop, start_server
+    from bench_vtop_http import run
+
+    site = MockVtop(20 * scale, latency_ms=50)
+    server, url = start_server(site)
+    try:
+        seconds, done, failed = run(site, url, vh.HTTP_WORKERS, Path(work))
+    finally:
+        server.shutdown()
+    size = tree_bytes(work, (".zip",))
+    return {
+        "zips": done,
+        "failed": failed,
+        "seconds": round(seconds, 3),
+        "zips_per_s": rate(done, seconds),
+        "mb_per_s": rate(size / 1e6, seconds),
+    }
+
+
+def bench_vtop_browser(work, scale):
+    from selenium import webdriver
+    import VTOP_Scraper as vs
+    from mock_vtop import MockVtop, start_server
+
+    site = MockVtop(5 * scale, latency_ms=50)
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_experimental_option("prefs", {"download.default_directory": work})
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        raise Skipped(f"Chrome unavailable: {str(e).splitlines()[0]}")
+    server, url = start_server(site)
+    saved = vs.BASE_DOWNLOAD_ROOT, vs.USE_JOURNAL, vs.DEDUPE_DOWNLOADS
+    vs.BASE_DOWNLOAD_ROOT, vs.USE_JOURNAL, vs.DEDUPE_DOWNLOADS = work, False, False
+    try:
+        driver.get(url)
+        start = time.perf_counter()
+        timings = vs.process_all_faculties(driver)
+        seconds = time.perf_counter() - start
+    finally:
+        vs.BASE_DOWNLOAD_ROOT, vs.USE_JOURNAL, vs.DEDUPE_DOWNLOADS = saved
+        driver.quit()
+        server.shutdown()
+    done = len(list(Path(work).rglob("*.zip")))
+    result = {
+        "rows": len(site.rows),
+        "zips": done,
+        "seconds": round(seconds, 3),
+        "rows_per_s": rate(len(site.rows), seconds),
+        "row_mean_ms": round(seconds * 1000 / max(len(site.rows), 1), 3),
+    }
+    for phase in ("open", "download", "back"):
+        values = [t[phase] for t in timings]
+        result[f"{phase}_mean_ms"] = round(sum(values) * 1000 / max(len(values), 1), 3)
+    return result
+
+
+def bench_unibud(work, scale):
+    sys.path.insert(0, str(ROOT / "Unibud Scraper"))
+    from playwright.sync_api import sync_playwright, Error as PWError
+    import Unibud_Scraper as ub
+    from mock_unibud import MockUnibud, start_server, PAGE_SIZE
+
+    site = MockUnibud(1, 3, 40 * scale, latency_ms=50)
+    subject = next(iter(site.subjects))
+    modules = site.subjects[subject]
+    pages = sum(-(-len(ids) // PAGE_SIZE) for _, ids in modules)
+    server, url = start_server(site)
+    saved = ub.URL, ub.DOWNLOAD_DIR
+    ub.URL, ub.DOWNLOAD_DIR = url, Path(work)
+    runs = {}
+    try:
+        with sync_playwright() as p:
+            try:
+                browser = p.chromium.launch(headless=True)
+            except PWError as e:
+                raise Skipped(f"Chromium unavailable: {str(e).splitlines()[0]}")
+            for profile, lean in (("reload", False), ("lean", True)):
+                context = browser.new_context(accept_downloads=True)
+                if lean:
+                    ub.block_requests(context)
+                page = context.new_page()
+                samples = []
+                sent = site.bytes_sent
+                start = time.perf_counter()
+                for idx, (label, _) in enumerate(modules):
+                    module_start = time.perf_counter()
+                    ub.run_one_module(page, subject, idx, label, lean and idx > 0)
+                    samples.append(time.perf_counter() - module_start)
+                runs[profile] = {
+                    "seconds": time.perf_counter() - start,
+                    "samples": samples,
+                    "kb": (site.bytes_sent - sent) / 1024 / len(modules),
+                }
+                context.close()
+            browser.close()
+    finally:
+        ub.URL, ub.DOWNLOAD_DIR = saved
+        server.shutdown()
+    lean, reload = runs["lean"], runs["reload"]
+    stats = latency(lean["samples"])
+    return {
+        "modules": len(modules),
+        "pages": pages,
+        "seconds": round(lean["seconds"], 3),
+        "pages_per_s": rate(pages, lean["seconds"]),
+        "module_p50_ms": stats["p50_ms"],
+        "module_mean_ms": stats["mean_ms"],
+        "module_kb": round(lean["kb"], 1),
+        "reload_module_mean_ms": latency(reload["samples"])["mean_ms"],
+        "reload_module_kb": round(reload["kb"], 1),
+    }
+
+
+SUITES = {
+    "pdf_page_count": bench_pdf_page_count,
+    "office_page_count": bench_office_page_count,
+    "pdf_search": bench_pdf_search,
+    "pdf_optimize": bench_pdf_optimize,
+    "folder_details": bench_folder_details,
+    "convert": bench_convert,
+    "zip_pipeline": bench_zip_pipeline,
+    "vtop_http": bench_vtop_http,
+    "vtop_browser": bench_vtop_browser,
+    "unibud": bench_unibud,
+}
+
+
+def run_suites(names, scale, verbose=False):
+    results = {}
+    for name in names:
+        work = tempfile.mkdtemp(prefix=f"bench_{name}_")
+        out = sys.stdout if verbose else io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                results[name] = SUITES[name](work, scale)
+        except Skipped as e:
+            results[name] = {"skipped": str(e)}
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+        print(f"{name:<18} {format_result(results[name])}")
+    return results
+
+
+def format_result(result):
+    if "skipped" in result:
+        return f"skipped ({result['skipped']})"
+    if "error" in result:
+        return f"ERROR {result['error']}"
+    return "  ".join(f"{k}={v}" for k, v in result.items())
+
+
+def direction(metric):
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('created', '?')}:")
+    for name, result in results.items():
+        old = baseline.get("suites", {}).get(name)
+        if not old or "skipped" in result or "error" in result:
+            continue
+        for metric, value in result.items():
+            sign = direction(metric)
+            before = old.get(metric)
+            if not sign or not isinstance(before, (int, float)) or not before:
+                continue
+            change = (value - before) / before
+            worse = -change * sign > threshold
+            flag = "REGRESSION" if worse else ""
+            print(
+                f"  {name + '.' + metric:<38} {before:>10} -> {value:>10} "
+                f"({change:+.1%}) {flag}"
+            )
+            if worse:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for all tools")
+    parser.add_argument("suites", nargs="*", help=f"any of {', '.join(SUITES)}")
+    parser.add_argument("--scale", type=int, default=1, help="multiply corpus sizes")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE))
+    parser.add_argument("--save", action="store_true", help="store as the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--check", action="store_true", help="exit 1 on regressions")
+    parser.add_argument("--verbose", action="store_true", help="show the tools' output")
+    args = parser.parse_args(argv)
+    unknown = [s for s in args.suites if s not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+    results = run_suites(args.suites or list(SUITES), args.scale, args.verbose)
+    regressions = []
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("scale") != args.scale:
+            print(f"\nBaseline uses --scale {baseline.get('scale')}, not comparing")
+        else:
+            regressions = compare(results, baseline, args.threshold)
+    if args.save:
+        record = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scale": args.scale,
+            "suites": results,
+        }
+        if baseline_path.exists():
+            old = json.loads(baseline_path.read_text(encoding="utf-8"))
+            if old.get("scale") == args.scale:
+                record["suites"] = {**old.get("suites", {}), **results}
+        baseline_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"Baseline written to: {baseline_path}")
+    if regressions:
+        print(f"{len(regressions)} regressions over {args.threshold:.0%}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
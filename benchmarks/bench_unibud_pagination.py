@@ -0,0 +1,84 @@
+import sys, time, argparse, statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Unibud Scraper"))
+from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+import Unibud_Scraper as ub
+from mock_unibud import MockUnibud, start_server
+
+
+def legacy_wait_until_first_question_changes(page, before_id, timeout_ms=20000):
+    deadline = page.evaluate("() => Date.now()") + timeout_ms
+    while True:
+        if page.evaluate("() => Date.now()") > deadline:
+            raise PWTimeoutError("Timed out waiting for next page content to change.")
+        after_id = ub.extract_first_question_id(page)
+        if after_id and after_id != before_id:
+            return
+        page.wait_for_timeout(200)
+
+
+def legacy_check_all_questions_on_current_page(page):
+    boxes = page.locator(ub.LOC_Q_CHECKBOXES)
+    n = boxes.count()
+    if n == 0:
+        raise RuntimeError("0 question checkboxes found on this page.")
+    for i in range(n):
+        cb = boxes.nth(i)
+        if not cb.is_checked():
+            cb.check()
+
+
+IMPLEMENTATIONS = {
+    "before": (
+        legacy_check_all_questions_on_current_page,
+        legacy_wait_until_first_question_changes,
+    ),
+    "after": (ub.check_all_questions_on_current_page, ub.wait_until_first_question_changes),
+}
+
+
+def timed_pagination(page, check_all, wait_change):
+    latencies = []
+    while True:
+        start = time.perf_counter()
+        check_all(page)
+        before_id = ub.extract_first_question_id(page)
+        if not ub.click_next_if_possible(page):
+            latencies.append(time.perf_counter() - start)
+            break
+        wait_change(page, before_id, timeout_ms=20000)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-page pagination latency")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    args = parser.parse_args(argv)
+    site = MockUnibud(1, 1, args.questions, args.latency_ms)
+    server, url = start_server(site)
+    subject = next(iter(site.subjects))
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            for label, (check_all, wait_change) in IMPLEMENTATIONS.items():
+                page.goto(url, wait_until="domcontentloaded")
+                ub.select_subject(page, subject)
+                page.locator(ub.LOC_MODULE_BUTTONS).nth(0).click()
+                ub.click_search_and_wait_for_results(page)
+                latencies = timed_pagination(page, check_all, wait_change)
+                ms = [x * 1000 for x in latencies]
+                print(
+                    f"{label:>6}: {len(ms)} pages, mean {statistics.mean(ms):7.1f} ms, "
+                    f"median {statistics.median(ms):7.1f} ms, max {max(ms):7.1f} ms"
+                )
+            browser.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
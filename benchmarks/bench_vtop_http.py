@@ -0,0 +1,73 @@
+import sys, time, shutil, argparse, tempfile, zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "VTOP Scraper"))
+import VTOP_Http as vh
+from VTOP_Scraper import sanitize_filename, normalize_slot
+from mock_vtop import MockVtop, start_server, SESSION_COOKIE, SESSION_ID, CSRF_TOKEN
+
+
+def collected_from_site(site, url):
+    rows = []
+    for n, cls, slot, faculty in site.rows:
+        cells = [str(n), cls, site.code, site.title, "TH", slot, faculty, f"SJT{n:03d}", "View"]
+        rows.append(
+            {
+                "index": n,
+                "cells": cells,
+                "onclick": f"viewCourse('{cls}','{site.course_id}')",
+                "text": "\t".join(cells),
+            }
+        )
+    hidden = {"_csrf": CSRF_TOKEN, "authorizedID": "21BCE0000"}
+    return {"rows": rows, "hidden": hidden, "url": url}
+
+
+def run(site, url, workers, out):
+    collected = collected_from_site(site, url)
+    jobs = vh.plan_downloads(collected, out, sanitize_filename, normalize_slot, ".zip")
+    headers = {"Cookie": f"{SESSION_COOKIE}={SESSION_ID}", "User-Agent": "bench"}
+    start = time.perf_counter()
+    done, failed = vh.download_all(jobs, url, headers, workers)
+    elapsed = time.perf_counter() - start
+    for path in done:
+        with zipfile.ZipFile(path) as zf:
+            if zf.testzip() is not None:
+                raise RuntimeError(f"Corrupt download: {path}")
+    return elapsed, len(done), len(failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serial vs concurrent VTOP downloads")
+    parser.add_argument("--faculties", type=int, default=40)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--bytes-per-sec", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, default=vh.HTTP_WORKERS)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    vh.HTTP_BACKOFF = 0.05
+    site = MockVtop(
+        args.faculties,
+        latency_ms=args.latency_ms,
+        bytes_per_sec=args.bytes_per_sec,
+        fail_rate=args.fail_rate,
+    )
+    server, url = start_server(site)
+    root = Path(tempfile.mkdtemp(prefix="bench_vtop_"))
+    try:
+        for label, workers in (("serial", 1), ("concurrent", args.workers)):
+            out = root / label
+            out.mkdir()
+            elapsed, ok, failed = run(site, url, workers, out)
+            print(
+                f"{label:>10}: {ok} ZIPs, {failed} failed in {elapsed:6.2f}s "
+                f"({workers} workers)"
+            )
+        print(f"Resumed with Range: {site.range_requests} requests")
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+import io, os, zlib, random, zipfile
+
+
+def _pdf_text(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf_objects(pages, filler_bytes, rng, texts=None):
+    objs = {1: b"<< /Type /Catalog /Pages 2 0 R >>"}
+    kids = []
+    num = 3
+    font = b""
+    if texts:
+        objs[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+        font = b" /Font << /F1 3 0 R >>"
+        num = 4
+    for i in range(pages):
+        page_num, content_num = num, num + 1
+        kids.append(f"{page_num} 0 R")
+        resources = f" /Resources <<{font.decode()} >>".encode() if font else b""
+        if filler_bytes:
+            img_num = num + 2
+            resources = (
+                f" /Resources <<{font.decode()} /XObject << /Im0 {img_num} 0 R >> >>"
+            ).encode()
+            data = rng.randbytes(filler_bytes)
+            objs[img_num] = (
+                f"<< /Type /XObject /Subtype /Image /Width {filler_bytes} /Height 1 "
+                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Length {len(data)} >>\n"
+            ).encode() + b"stream\n" + data + b"\nendstream"
+            num += 1
+        objs[page_num] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {content_num} 0 R"
+        ).encode() + resources + b" >>"
+        if texts:
+            lines = " ".join(f"({_pdf_text(line)}) Tj T*" for line in texts[i])
+            text = f"BT /F1 10 Tf 12 TL 72 740 Td {lines} ET".encode()
+        else:
+            text = f"BT /F1 24 Tf 72 700 Td (Page {i + 1}) Tj ET".encode()
+        objs[content_num] = (
+            f"<< /Length {len(text)} >>\nstream\n".encode() + text + b"\nendstream"
+        )
+        num += 2
+    objs[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+    return objs
+
+
+def pdf_bytes(pages, filler_bytes=0, xref_stream=False, rng=random, texts=None):
+    objs = _pdf_objects(pages, filler_bytes, rng, texts)
+    out = bytearray(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    packed = {}
+    if xref_stream:
+        small = [1, 2]
+        header = []
+        body = bytearray()
+        for n in small:
+            header.append(f"{n} {len(body)}")
+            body += objs.pop(n) + b"\n"
+        head = (" ".join(header) + "\n").encode()
+        stm = zlib.compress(head + bytes(body))
+        stm_num = max(list(objs) + small) + 1
+        objs[stm_num] = (
+            f"<< /Type /ObjStm /N {len(small)} /First {len(head)} "
+            f"/Filter /FlateDecode /Length {len(stm)} >>\nstream\n"
+        ).encode() + stm + b"\nendstream"
+        for i, n in enumerate(small):
+            packed[n] = (stm_num, i)
+    for n in sorted(objs):
+        offsets[n] = len(out)
+        out += f"{n} 0 obj\n".encode() + objs[n] + b"\nendobj\n"
+    size = max(list(offsets) + list(packed)) + 1
+    if xref_stream:
+        xref_num = size
+        size += 1
+        offsets[xref_num] = len(out)
+        rows = []
+        for n in range(size):
+            if n in offsets:
+                row = bytes([1]) + offsets[n].to_bytes(4, "big") + bytes([0])
+            elif n in packed:
+                stm_num, idx = packed[n]
+                row = bytes([2]) + stm_num.to_bytes(4, "big") + bytes([idx])
+            else:
+                row = bytes([0]) + bytes(4) + bytes([255])
+            rows.append(row)
+        prev = bytes(6)
+        encoded = bytearray()
+        for row in rows:
+            encoded.append(2)
+            encoded += bytes((a - b) & 0xFF for a, b in zip(row, prev))
+            prev = row
+        data = zlib.compress(bytes(encoded))
+        out += (
+            f"{xref_num} 0 obj\n<< /Type /XRef /Size {size} /W [1 4 1] /Root 1 0 R "
+            f"/Filter /FlateDecode /DecodeParms << /Predictor 12 /Columns 6 >> "
+            f"/Length {len(data)} >>\nstream\n"
+        ).encode() + data + b"\nendstream\nendobj\n"
+        out += f"startxref\n{offsets[xref_num]}\n%%EOF\n".encode()
+    else:
+        xref_pos = len(out)
+        out += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+        for n in range(1, size):
+            out += f"{offsets[n]:010d} 00000 n \n".encode()
+        out += f"trailer\n<< /Size {size} /Root 1 0 R >>\n".encode()
+        out += f"startxref\n{xref_pos}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def write_pdf(path, pages, filler_bytes=0, xref_stream=False, rng=random):
+    with open(path, "wb") as f:
+        f.write(pdf_bytes(pages, filler_bytes, xref_stream, rng))
+
+
+def make_pdf_corpus(root, count, min_pages=1, max_pages=200, filler_bytes=0, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    paths = []
+    for i in range(count):
+        pages = rng.randint(min_pages, max_pages)
+        path = os.path.join(root, f"doc_{i:05d}.pdf")
+        write_pdf(
+            path, pages, filler_bytes=filler_bytes, xref_stream=i % 2 == 1, rng=rng
+        )
+        paths.append((path, pages))
+    return paths
+
+
+def zip_bytes(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0)), data)
+    return buf.getvalue()
+
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Default Extension="bin" ContentType="application/octet-stream"/>'
+    "{overrides}</Types>"
+)
+OVERRIDE = '<Override PartName="{part}" ContentType="{ctype}"/>'
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "{rels}</Relationships>"
+)
+REL = '<Relationship Id="{id}" Type="{type}" Target="{target}"/>'
+REL_DOC = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+APP_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+    "<Application>corpus</Application><{name}>{count}</{name}></Properties>"
+)
+CT_APP = "application/vnd.openxmlformats-officedocument.extended-properties+xml"
+CT_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+CT_PRES = "application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"
+CT_SLIDE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+
+def _package(
+    root_part, root_type, app_name, count, parts, overrides, filler_bytes, rng
+):
+    overrides = [(root_part, root_type), ("/docProps/app.xml", CT_APP)] + overrides
+    rels = [
+        REL.format(id="rId1", type=f"{REL_DOC}/officeDocument", target=root_part[1:]),
+        REL.format(
+            id="rId2", type=f"{REL_DOC}/extended-properties", target="docProps/app.xml"
+        ),
+    ]
+    types = "".join(OVERRIDE.format(part=p, ctype=t) for p, t in overrides)
+    members = [
+        ("[Content_Types].xml", CONTENT_TYPES.format(overrides=types).encode()),
+        ("_rels/.rels", RELS.format(rels="".join(rels)).encode()),
+        ("docProps/app.xml", APP_XML.format(name=app_name, count=count).encode()),
+    ] + parts
+    if filler_bytes:
+        members.append(("media/filler.bin", rng.randbytes(filler_bytes)))
+    return zip_bytes(members)
+
+
+def docx_bytes(pages, filler_bytes=0, rng=random):
+    body = []
+    for i in range(pages):
+        if i:
+            body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        body.append(f"<w:p><w:r><w:t>Page {i + 1}</w:t></w:r></w:p>")
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<w:document xmlns:w="{NS_W}"><w:body>{"".join(body)}</w:body></w:document>'
+    )
+    parts = [("word/document.xml", document.encode())]
+    return _package(
+        "/word/document.xml", CT_DOCX, "Pages", pages, parts, [], filler_bytes, rng
+    )
+
+
+def pptx_bytes(slides, filler_bytes=0, rng=random):
+    ids = []
+    rels = []
+    parts = []
+    overrides = []
+    for i in range(1, slides + 1):
+        ids.append(f'<p:sldId id="{255 + i}" r:id="rId{i}"/>')
+        rels.append(
+            REL.format(
+                id=f"rId{i}", type=f"{REL_DOC}/slide", target=f"slides/slide{i}.xml"
+            )
+        )
+        slide = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<p:sld xmlns:p="{NS_P}" xmlns:a="{NS_A}"><p:cSld><p:spTree>'
+            '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+            "<p:grpSpPr/>"
+            '<p:sp><p:nvSpPr><p:cNvPr id="2" name="Title"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+            f"<p:spPr/><p:txBody><a:bodyPr/><a:p><a:r><a:t>Slide {i}</a:t></a:r></a:p>"
+            "</p:txBody></p:sp></p:spTree></p:cSld></p:sld>"
+        )
+        parts.append((f"ppt/slides/slide{i}.xml", slide.encode()))
+        overrides.append((f"/ppt/slides/slide{i}.xml", CT_SLIDE))
+    presentation = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<p:presentation xmlns:p="{NS_P}" xmlns:r="{REL_DOC}">'
+        f'<p:sldIdLst>{"".join(ids)}</p:sldIdLst>'
+        '<p:sldSz cx="9144000" cy="6858000"/><p:notesSz cx="6858000" cy="9144000"/>'
+        "</p:presentation>"
+    )
+    parts.append(("ppt/presentation.xml", presentation.encode()))
+    parts.append(
+        ("ppt/_rels/presentation.xml.rels", RELS.format(rels="".join(rels)).encode())
+    )
+    return _package(
+        "/ppt/presentation.xml",
+        CT_PRES,
+        "Slides",
+        slides,
+        parts,
+        overrides,
+        filler_bytes,
+        rng,
+    )
+
+
+OFFICE_WRITERS = {".docx": docx_bytes, ".pptx": pptx_bytes}
+
+
+def make_office_corpus(
+    root, count, ext, min_pages=1, max_pages=40, filler_bytes=0, seed=0
+):
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    paths = []
+    for i in range(count):
+        pages = rng.randint(min_pages, max_pages)
+        path = os.path.join(root, f"doc_{i:05d}{ext}")
+        with open(path, "wb") as f:
+            f.write(OFFICE_WRITERS[ext](pages, filler_bytes, rng))
+        paths.append((path, pages))
+    return paths
+
+
+def make_folder_corpus(
+    root, subfolders, pdfs, docx, pptx, max_pages=40, filler_bytes=0, seed=0
+):
+    rng = random.Random(seed)
+    expected = {}
+    for s in range(subfolders):
+        name = f"Subject_{s + 1:03d}"
+        pages = []
+        for i in range(pdfs):
+            path = os.path.join(root, name, f"Notes_{i // 10}", f"doc_{i:04d}.pdf")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            n = rng.randint(1, max_pages)
+            write_pdf(path, n, filler_bytes, xref_stream=i % 2 == 1, rng=rng)
+            pages.append(n)
+        for ext, count in ((".docx", docx), (".pptx", pptx)):
+            for i in range(count):
+                path = os.path.join(root, name, "Office", f"doc_{i:04d}{ext}")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                n = rng.randint(1, max_pages)
+                with open(path, "wb") as f:
+                    f.write(OFFICE_WRITERS[ext](n, filler_bytes, rng))
+                pages.append(n)
+        expected[name] = pages
+    return expected
+
+
+def make_zip_corpus(
+    root, subfolders, zips, pdfs, office, max_pages=20, filler_bytes=0, shared=0, seed=0
+):
+    rng = random.Random(seed)
+    def random_pdf():
+        return pdf_bytes(rng.randint(1, max_pages), filler_bytes, rng=rng)
+
+    common = [(f"Common_{i + 1}.pdf", random_pdf()) for i in range(shared)]
+    paths = []
+    for s in range(subfolders):
+        folder = os.path.join(root, f"Subject_{s + 1:03d}")
+        os.makedirs(folder, exist_ok=True)
+        for z in range(zips):
+            members = [(f"Lecture_{i + 1}.pdf", random_pdf()) for i in range(pdfs)]
+            for i in range(office):
+                ext = (".docx", ".pptx")[i % 2]
+                data = OFFICE_WRITERS[ext](rng.randint(1, max_pages), filler_bytes, rng)
+                members.append((f"Slides_{i + 1}{ext}", data))
+            path = os.path.join(folder, f"Faculty_{z + 1:03d}.zip")
+            with open(path, "wb") as f:
+                f.write(zip_bytes(members + common))
+            paths.append(path)
+    return paths
+
+
+WORDS = (
+    "algorithm array binary cache compiler database deadlock entropy function graph "
+    "hashing heap inheritance interrupt kernel latency matrix network object "
+    "operating pipeline pointer process protocol queue recursion register scheduling "
+    "semaphore sorting stack system thread transaction tree variable vector virtual"
+).split()
+
+
+def text_pages(pages, words_per_page, rng):
+    texts = []
+    for _ in range(pages):
+        words = [
+            rng.choice(WORDS)
+            if rng.random() < 0.6
+            else f"term{int(rng.paretovariate(1.2))}"
+            for _ in range(words_per_page)
+        ]
+        texts.append([" ".join(words[i : i + 12]) for i in range(0, len(words), 12)])
+    return texts
+
+
+def make_text_corpus(root, subfolders, pdfs, max_pages=40, words_per_page=150, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for s in range(subfolders):
+        folder = os.path.join(root, f"Subject_{s + 1:03d}")
+        os.makedirs(folder, exist_ok=True)
+        for i in range(pdfs):
+            pages = rng.randint(1, max_pages)
+            path = os.path.join(folder, f"Lecture_{i + 1:04d}.pdf")
+            texts = text_pages(pages, words_per_page, rng)
+            data = pdf_bytes(pages, rng=rng, texts=texts)
+            with open(path, "wb") as f:
+                f.write(data)
+            paths.append((path, pages))
+    return paths
@@ -0,0 +1,226 @@
+import json, time, argparse, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from corpus import pdf_bytes
+
+PAGE_SIZE = 10
+
+PAGE_HTML = """<!DOCTYPE html>
+<html><head><title>Mock VIT Question Bank</title>
+<link rel="stylesheet" href="/static/app.css">
+<link rel="preload" href="/static/font.woff2" as="font">
+<script src="/static/analytics.js"></script>
+</head>
+<body><div id="app"><main role="main"><div><div><div>
+<aside>
+  <div><h2>Question Bank</h2></div>
+  <div><form onsubmit="return false">
+    <div><div>
+      <button type="button" id="subjectBtn" onclick="toggleSubjects()">Select subject</button>
+      <ul id="subjectList" style="display:none"></ul>
+    </div></div>
+    <div><div id="moduleList"></div></div>
+    <div><span>Difficulty: any</span></div>
+    <div><label><div id="includeAnswers" onclick="includeAnswers=!includeAnswers">Include Answers</div></label></div>
+    <button type="button" onclick="search()">Search Questions</button>
+  </form></div>
+  <div><button type="button" onclick="generatePdf()">Generate PDF</button></div>
+</aside>
+<section>
+  <div id="questions"></div>
+  <div class="flex-shrink-0 p-4 border-t"><div class="flex justify-center items-center" id="pager"></div></div>
+</section>
+</div></div></div></main></div>
+<img src="/static/banner.png">
+<script>
+const SUBJECTS = __SUBJECTS__;
+let subject = null, moduleIdx = null, includeAnswers = false, page = 1, pages = 0;
+const selected = new Set();
+function toggleSubjects() {
+  const ul = document.getElementById("subjectList");
+  ul.innerHTML = "";
+  for (const s of Object.keys(SUBJECTS)) {
+    const li = document.createElement("li");
+    li.textContent = s;
+    li.onclick = () => pickSubject(s);
+    ul.appendChild(li);
+  }
+  ul.style.display = "block";
+}
+function pickSubject(s) {
+  subject = s;
+  moduleIdx = null;
+  document.getElementById("subjectBtn").textContent = s;
+  document.getElementById("subjectList").style.display = "none";
+  const list = document.getElementById("moduleList");
+  list.innerHTML = "";
+  SUBJECTS[s].forEach((label, i) => {
+    const b = document.createElement("button");
+    b.type = "button";
+    b.textContent = label;
+    b.onclick = () => { moduleIdx = i; selected.clear(); };
+    list.appendChild(b);
+  });
+}
+async function load(p) {
+  const r = await fetch(`/api/questions?subject=${encodeURIComponent(subject)}&module=${moduleIdx}&page=${p}`);
+  const data = await r.json();
+  page = data.page; pages = data.pages;
+  const box = document.getElementById("questions");
+  box.innerHTML = "";
+  for (const q of data.questions) {
+    const card = document.createElement("div");
+    card.className = "mb-4 rounded-lg";
+    card.innerHTML = `<div class="checkboxContainer"><input type="checkbox" name="selected_questions" value="${q.id}"></div>` +
+      `<p>Question ID: ${q.id}</p><p>${q.text}</p>`;
+    const cb = card.querySelector("input");
+    cb.checked = selected.has(q.id);
+    cb.onchange = () => cb.checked ? selected.add(q.id) : selected.delete(q.id);
+    box.appendChild(card);
+  }
+  const pager = document.getElementById("pager");
+  pager.innerHTML = "";
+  const prev = document.createElement("button");
+  prev.textContent = "Prev";
+  prev.disabled = page <= 1;
+  prev.onclick = () => load(page - 1);
+  const label = document.createElement("span");
+  label.textContent = `${page} / ${pages}`;
+  const next = document.createElement("button");
+  next.textContent = "Next";
+  if (page >= pages) next.setAttribute("disabled", "");
+  next.onclick = () => load(page + 1);
+  pager.append(prev, label, next);
+}
+function search() { if (subject !== null && moduleIdx !== null) load(1); }
+function generatePdf() {
+  const ids = Array.from(selected).join(",");
+  const a = document.createElement("a");
+  a.href = `/api/generate?subject=${encodeURIComponent(subject)}&module=${moduleIdx}&answers=${includeAnswers ? 1 : 0}&ids=${ids}`;
+  a.download = "questions.pdf";
+  document.body.appendChild(a);
+  a.click();
+  a.remove();
+}
+</script>
+</body></html>
+"""
+
+
+class MockUnibud:
+    def __init__(self, subjects=3, modules=5, questions=60, latency_ms=150):
+        self.latency = latency_ms / 1000.0
+        self.subjects = {}
+        qid = 100000
+        for s in range(subjects):
+            name = f"Subject {chr(65 + s)}"
+            mods = []
+            for m in range(modules):
+                ids = list(range(qid, qid + questions))
+                qid += questions
+                mods.append((f"Module {m + 1}", ids))
+            self.subjects[name] = mods
+        self.bytes_sent = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def page_html(self):
+        labels = {s: [label for label, _ in mods] for s, mods in self.subjects.items()}
+        return PAGE_HTML.replace("__SUBJECTS__", json.dumps(labels)).encode()
+
+    def questions(self, subject, module, page):
+        ids = self.subjects[subject][module][1]
+        pages = max(1, -(-len(ids) // PAGE_SIZE))
+        page = min(max(page, 1), pages)
+        chunk = ids[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+        return {
+            "page": page,
+            "pages": pages,
+            "total": len(ids),
+            "questions": [
+                {
+                    "id": q,
+                    "text": f"Sample question {q} for {subject} module {module + 1}?",
+                    "answer": f"Answer to question {q}.",
+                }
+                for q in chunk
+            ],
+        }
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, ctype, body, extra=None):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (extra or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with site.lock:
+                site.bytes_sent += len(body)
+                site.requests += 1
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path in ("/", "/VITQuestionBank"):
+                self.send(200, "text/html; charset=utf-8", site.page_html())
+            elif url.path == "/api/questions":
+                time.sleep(site.latency)
+                data = site.questions(
+                    q["subject"], int(q["module"]), int(q.get("page", 1))
+                )
+                self.send(200, "application/json", json.dumps(data).encode())
+            elif url.path == "/api/generate":
+                time.sleep(site.latency)
+                ids = [i for i in q.get("ids", "").split(",") if i]
+                body = pdf_bytes(max(1, -(-len(ids) // 5)))
+                self.send(
+                    200,
+                    "application/pdf",
+                    body,
+                    {"Content-Disposition": 'attachment; filename="questions.pdf"'},
+                )
+            elif url.path.startswith("/static/"):
+                self.send(200, "application/octet-stream", b"\0" * 50000)
+            else:
+                self.send(404, "text/plain", b"not found")
+
+    return Handler
+
+
+def make_server(site, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(site))
+    return server, f"http://127.0.0.1:{server.server_address[1]}/VITQuestionBank"
+
+
+def start_server(site, port=0):
+    server, url = make_server(site, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, url
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline stand-in for UniBud")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--subjects", type=int, default=3)
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=60)
+    parser.add_argument("--latency-ms", type=int, default=150)
+    args = parser.parse_args(argv)
+    site = MockUnibud(args.subjects, args.modules, args.questions, args.latency_ms)
+    server, url = make_server(site, args.port)
+    print(f"Mock UniBud at {url} (subjects: {', '.join(site.subjects)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
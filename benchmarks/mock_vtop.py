@@ -0,0 +1,307 @@
+import re, time, random, argparse, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from corpus import pdf_bytes, zip_bytes
+
+SESSION_COOKIE = "JSESSIONID"
+SESSION_ID = "mock-session"
+CSRF_TOKEN = "mock-csrf"
+
+PAGE_HTML = """<!DOCTYPE html>
+<html><head><title>Mock VTOP</title></head>
+<body>
+<input type="hidden" name="_csrf" value="__CSRF__">
+<input type="hidden" name="authorizedID" value="21BCE0000">
+<nav><a href="#" data-url="academics/common/StudentCoursePage">Course Page</a></nav>
+<select id="semesterSubId"><option value="CH20242505">Winter Semester 2024-25</option></select>
+<select id="courseId" onchange="loadCourse(this.value)">__OPTIONS__</select>
+<div id="getFacultyForCoursePage">
+  <div><h3>Course Page</h3></div>
+  <div><table><tbody id="facultyRows">
+    __ROWS__
+  </tbody></table></div>
+</div>
+__TEMPLATES__
+<div id="CoursePageLectureDetail" style="display:none">
+  <div><h3>Lecture Detail</h3></div>
+  <div><div><table><tbody>
+    <tr><th>#</th><th>Class Nbr</th><th>Course Code</th><th>Course Title</th><th>Type</th>
+      <th>Slot</th><th>Faculty</th></tr>
+    <tr><td>1</td><td id="dNbr"></td><td id="dCode"></td><td id="dTitle"></td><td>TH</td>
+      <td id="dSlot"></td><td id="dFaculty"></td></tr>
+  </tbody></table></div></div>
+  <button type="button" id="allMaterialDownload" onclick="downloadAll()">Download All</button>
+  <button type="button" id="backButton" onclick="back()">Back</button>
+</div>
+<form id="dlForm" method="POST" action="/vtop/materialDownload" style="display:none">
+  <input name="classId"><input name="courseId"><input name="_csrf" value="__CSRF__">
+</form>
+<script>
+let current = null;
+function loadCourse(courseId) {
+  document.getElementById("facultyRows").innerHTML = "";
+  setTimeout(() => {
+    const tpl = document.getElementById(`rows-${courseId}`);
+    document.getElementById("facultyRows").innerHTML = tpl.innerHTML;
+  }, __LATENCY__);
+}
+function viewCourse(classId, courseId) {
+  const tr = document.querySelector(`tr[data-class="${classId}"]`);
+  setTimeout(() => {
+    const cells = tr.querySelectorAll("td");
+    document.getElementById("dNbr").textContent = cells[1].textContent;
+    document.getElementById("dCode").textContent = cells[2].textContent;
+    document.getElementById("dTitle").textContent = cells[3].textContent;
+    document.getElementById("dSlot").textContent = cells[5].textContent;
+    document.getElementById("dFaculty").textContent = cells[6].textContent;
+    current = [classId, courseId];
+    document.getElementById("getFacultyForCoursePage").style.display = "none";
+    document.getElementById("CoursePageLectureDetail").style.display = "block";
+  }, __LATENCY__);
+}
+function downloadAll() {
+  const f = document.getElementById("dlForm");
+  f.classId.value = current[0];
+  f.courseId.value = current[1];
+  f.submit();
+}
+function back() {
+  setTimeout(() => {
+    document.getElementById("CoursePageLectureDetail").style.display = "none";
+    document.getElementById("getFacultyForCoursePage").style.display = "block";
+  }, __LATENCY__);
+}
+</script>
+</body></html>
+"""
+
+HEADER_HTML = (
+    "<tr><th>#</th><th>Class Nbr</th><th>Course Code</th><th>Course Title</th><th>Type</th>"
+    "<th>Slot</th><th>Faculty</th><th>Venue</th><th>Action</th></tr>"
+)
+
+ROW_HTML = (
+    '<tr data-class="{cls}"><td>{n}</td><td>{cls}</td><td>{code}</td><td>{title}</td>'
+    "<td>TH</td><td>{slot}</td><td>{faculty}</td><td>SJT{n:03d}</td>"
+    "<td><button type=\"button\" onclick=\"viewCourse('{cls}','{course}')\">View</button></td></tr>"
+)
+
+
+class MockVtop:
+    def __init__(
+        self,
+        faculties=40,
+        lectures=6,
+        shared=3,
+        pages=4,
+        latency_ms=200,
+        bytes_per_sec=0,
+        fail_rate=0.0,
+        courses=(("CSE2001", "Data Structures"),),
+        seed=0,
+    ):
+        rng = random.Random(seed)
+        self.latency = latency_ms / 1000.0
+        self.bytes_per_sec = bytes_per_sec
+        self.fail_rate = fail_rate
+        self.courses = {}
+        self.zips = {}
+        for c, (code, title) in enumerate(courses):
+            common = [
+                (f"Common_{i + 1}.pdf", pdf_bytes(pages, 2048, rng=rng))
+                for i in range(shared)
+            ]
+            rows = []
+            for n in range(1, faculties + 1):
+                cls = f"CH2024{c:02d}{n:04d}"
+                slot = rng.choice(["A1", "B1", "C1", "D1"])
+                slot += "+TA1" if n % 3 == 0 else ""
+                faculty = f"{10000 + n} - Dr. Faculty {n} - SCOPE"
+                own = [
+                    (f"Lecture_{i + 1}.pdf", pdf_bytes(pages, 2048, rng=rng))
+                    for i in range(lectures)
+                ]
+                rows.append((n, cls, slot, faculty))
+                self.zips[cls] = zip_bytes(own + common)
+            self.courses[code] = {"title": title, "course_id": f"CRS{code}", "rows": rows}
+        self.code = next(iter(self.courses))
+        self.title = self.courses[self.code]["title"]
+        self.course_id = self.courses[self.code]["course_id"]
+        self.rows = self.courses[self.code]["rows"]
+        self.bytes_sent = 0
+        self.requests = 0
+        self.downloads = 0
+        self.range_requests = 0
+        self.lock = threading.Lock()
+
+    def rows_html(self, code):
+        course = self.courses[code]
+        rows = [
+            ROW_HTML.format(
+                n=n,
+                cls=cls,
+                code=code,
+                title=course["title"],
+                slot=slot,
+                faculty=faculty,
+                course=course["course_id"],
+            )
+            for n, cls, slot, faculty in course["rows"]
+        ]
+        return "\n".join([HEADER_HTML] + rows)
+
+    def page_html(self):
+        options = "".join(
+            f'<option value="{c["course_id"]}">{code} - {c["title"]} - TH</option>'
+            for code, c in self.courses.items()
+        )
+        templates = "".join(
+            f'<template id="rows-{c["course_id"]}">{self.rows_html(code)}</template>'
+            for code, c in self.courses.items()
+        )
+        html = PAGE_HTML.replace("__ROWS__", self.rows_html(self.code))
+        html = html.replace("__OPTIONS__", options).replace("__TEMPLATES__", templates)
+        html = html.replace("__CSRF__", CSRF_TOKEN)
+        return html.replace("__LATENCY__", str(int(self.latency * 1000))).encode()
+
+    def expected_names(self, code=None):
+        names = []
+        for _, _, slot, faculty in self.courses[code or self.code]["rows"]:
+            name = faculty.split("-")[1].strip()
+            names.append(f"{name} {slot.split('+')[0]}")
+        return names
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, ctype, body, extra=None):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (extra or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.write_body(body)
+
+        def write_body(self, body, fail_at=None):
+            step = 64 * 1024
+            for pos in range(0, len(body), step):
+                chunk = body[pos : pos + step]
+                if fail_at is not None and pos + len(chunk) > fail_at:
+                    self.wfile.write(chunk[: fail_at - pos])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+                    return
+                self.wfile.write(chunk)
+                if site.bytes_per_sec:
+                    time.sleep(len(chunk) / site.bytes_per_sec)
+                with site.lock:
+                    site.bytes_sent += len(chunk)
+            with site.lock:
+                site.requests += 1
+
+        def logged_in(self):
+            cookies = self.headers.get("Cookie") or ""
+            return f"{SESSION_COOKIE}={SESSION_ID}" in cookies
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path in ("/", "/vtop/course"):
+                self.send(
+                    200,
+                    "text/html; charset=utf-8",
+                    site.page_html(),
+                    {"Set-Cookie": f"{SESSION_COOKIE}={SESSION_ID}; Path=/"},
+                )
+            else:
+                self.send(404, "text/plain", b"not found")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+            if url.path != "/vtop/materialDownload":
+                self.send(404, "text/plain", b"not found")
+                return
+            if not self.logged_in() or form.get("_csrf") != CSRF_TOKEN:
+                self.send(403, "text/plain", b"session expired")
+                return
+            body = site.zips.get(form.get("classId"))
+            if body is None:
+                self.send(404, "text/plain", b"unknown class")
+                return
+            time.sleep(site.latency)
+            start = 0
+            m = re.match(r"bytes=(\d+)-", self.headers.get("Range") or "")
+            headers = {
+                "Content-Disposition": f'attachment; filename="{form["classId"]}.zip"',
+                "Accept-Ranges": "bytes",
+            }
+            if m:
+                start = int(m.group(1))
+                with site.lock:
+                    site.range_requests += 1
+                if start >= len(body):
+                    self.send(416, "text/plain", b"", {"Content-Range": f"bytes */{len(body)}"})
+                    return
+                headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            part = body[start:]
+            fail_at = None
+            if site.fail_rate and random.random() < site.fail_rate:
+                fail_at = len(part) // 2
+            self.send_response(206 if m else 200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(len(part)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.write_body(part, fail_at)
+            if fail_at is None:
+                with site.lock:
+                    site.downloads += 1
+
+    return Handler
+
+
+def make_server(site, port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(site))
+    return server, f"http://127.0.0.1:{server.server_address[1]}/vtop/course"
+
+
+def start_server(site, port=0):
+    server, url = make_server(site, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, url
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline stand-in for a VTOP course page")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--faculties", type=int, default=40)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--courses", nargs="*", default=["CSE2001"])
+    args = parser.parse_args(argv)
+    courses = [(code, f"Course {code}") for code in args.courses]
+    site = MockVtop(
+        args.faculties,
+        latency_ms=args.latency_ms,
+        fail_rate=args.fail_rate,
+        courses=courses,
+    )
+    server, url = make_server(site, args.port)
+    print(f"Mock VTOP course page at {url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()